@@ -0,0 +1,80 @@
+"""Query latency and disk use of the tiered action log.
+
+Fills one guild's log with entries spread evenly over ``--months`` months, then
+times recent-entry queries (served by the hot ring buffer when they fit), a
+per-user query that has to reach the cold archives, and a one-month range
+query. The "jsonl" size is what the same entries take as plain JSONL.
+    
+    python benchmarks/bench_action_log.py --entries 1000000 --months 24
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.action_log import ActionLog
+
+USERS = 5000
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def measure(func, calls: int) -> float:
+    """Return the mean latency of `func` in microseconds"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+def run(entries: int, months: int, calls: int) -> dict:
+    start = datetime(2024, 1, 1)
+    step = timedelta(days=30 * months) / entries
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ActionLog(tmp)
+        raw_bytes = 0
+        for chunk in range(0, entries, 10_000):
+            batch = [
+                {"action": "member_join", "moderator_id": None, "target_id": i % USERS,
+                 "reason": "User joined the server", "timestamp": (start + step * i).isoformat()}
+                for i in range(chunk, min(chunk + 10_000, entries))
+            ]
+            raw_bytes += sum(len(json.dumps(entry, separators=(",", ":"))) + 1 for entry in batch)
+            log.extend(batch)
+        
+        # Reopen so the hot tier is rebuilt from disk, as after a restart
+        log.close()
+        log = ActionLog(tmp)
+        
+        middle = (start + step * (entries // 2)).isoformat()[:7]
+        results = {
+            "recent(10)": measure(lambda i: log.recent(10), calls),
+            "recent(5, user)": measure(lambda i: log.recent(5, (entries - 1 - i) % USERS), calls),
+            "recent(50, user)": measure(lambda i: log.recent(50, i % USERS), max(calls // 100, 1)),
+            "range(1 month)": measure(lambda i: log.range(f"{middle}-01", f"{middle}-31"), max(calls // 100, 1)),
+        }
+        stored_bytes = directory_size(tmp)
+        log.close()
+    
+    return {"results": results, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+    
+    result = run(args.entries, args.months, args.calls)
+    for name, value in result["results"].items():
+        print(f"{name:>18} {value:>12.1f}us")
+    print(f"{'jsonl':>18} {result['raw_bytes']:>12,} bytes")
+    print(f"{'stored':>18} {result['stored_bytes']:>12,} bytes")
+
+if __name__ == "__main__":
+    main()
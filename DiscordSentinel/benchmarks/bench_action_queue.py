@@ -0,0 +1,156 @@
+"""Message handling latency while the Discord API is slow.
+
+Feeds messages, ``--violations`` of them carrying an invite link, from
+``--guilds`` guilds through the real ``AutoModerationCog.on_message`` while
+every fake REST call (delete, DM, channel send) takes ``--latency``
+milliseconds. ``inline`` waits for a message's deletes, warnings and notices
+before taking the next message, as the cog used to; ``queued`` hands them to
+the cog's ``ActionQueue`` and moves on. Reports per-message handling time,
+the time until every action has run, REST calls made and queue counters.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_action_queue.py --messages 2000 --latency 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.automod import AutoModerationCog
+from utils.guild_config import GuildConfigEngine
+
+CHAT = [
+    "hey everyone, how is it going today?",
+    "Has anyone tried the new patch yet? Looks good so far",
+    "I'll be on later tonight if anyone wants to play",
+    "thanks for the help with the setup earlier",
+]
+
+class Rest:
+    """Counts fake REST calls; each one takes `latency` seconds"""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+    
+    async def call(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str, rest: Rest):
+        self.id = channel_id
+        self.name = name
+        self.mention = f"#{name}"
+        self.rest = rest
+    
+    async def send(self, *args, **kwargs):
+        await self.rest.call()
+    
+    async def delete_messages(self, messages, reason=None):
+        await self.rest.call()
+
+class FakeMember:
+    bot = False
+    
+    def __init__(self, user_id: int, rest: Rest):
+        self.id = user_id
+        self.rest = rest
+    
+    def __str__(self):
+        return f"member-{self.id}"
+    
+    async def send(self, *args, **kwargs):
+        await self.rest.call()
+    
+    async def timeout(self, until, reason=None):
+        await self.rest.call()
+
+class FakeGuild:
+    def __init__(self, guild_id: int, rest: Rest):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.channels = [FakeChannel(guild_id * 10 + i, name, rest) for i, name in enumerate(["general", "mod-log"])]
+    
+    def get_channel_or_thread(self, channel_id: int):
+        return next((channel for channel in self.channels if channel.id == channel_id), None)
+    
+    def get_member(self, user_id: int):
+        return None
+
+class FakeDatabase:
+    """Local storage is fast next to REST calls, so these return at once"""
+    
+    async def add_warning(self, *args):
+        return 1
+    
+    async def log_action(self, *args):
+        pass
+
+async def run(mode: str, args) -> dict:
+    rng = random.Random(args.seed)
+    rest = Rest(args.latency / 1000)
+    bot = SimpleNamespace(db=FakeDatabase(), user=SimpleNamespace(id=1), guild_config=GuildConfigEngine())
+    cog = AutoModerationCog(bot)
+    cog.actions.start()
+    guilds = [FakeGuild(i + 1, rest) for i in range(args.guilds)]
+    for guild in guilds:
+        # The same few lines from everyone would read as a raid
+        await bot.guild_config.update(guild.id, "automod", duplicate_detection=False)
+    
+    messages = []
+    for i in range(args.messages):
+        guild = rng.choice(guilds)
+        content = rng.choice(CHAT)
+        if rng.random() < args.violations:
+            content += " join discord.gg/abcdef"
+        messages.append(SimpleNamespace(
+            id=i + 1, guild=guild, channel=guild.channels[0], content=content,
+            author=FakeMember(10_000 + i, rest)
+        ))
+    
+    handled = []
+    start = time.perf_counter()
+    for message in messages:
+        began = time.perf_counter()
+        await cog.on_message(message)
+        if mode == "inline":
+            await cog.actions.join()
+        handled.append(time.perf_counter() - began)
+    await cog.actions.join()
+    total = time.perf_counter() - start
+    cog.actions.stop()
+    
+    handled.sort()
+    return {
+        "p50_ms": handled[len(handled) // 2] * 1000,
+        "p99_ms": handled[int(len(handled) * 0.99)] * 1000,
+        "seconds": total,
+        "calls": rest.calls,
+        "stats": cog.actions.stats()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--violations", type=float, default=0.2, help="share of messages with an invite link")
+    parser.add_argument("--latency", type=float, default=50.0, help="milliseconds per REST call")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f"{'mode':>7} {'p50 ms/msg':>11} {'p99 ms/msg':>11} {'drained s':>10} {'REST calls':>11} {'coalesced':>10}")
+    for mode in ("inline", "queued"):
+        result = asyncio.run(run(mode, args))
+        print(f"{mode:>7} {result['p50_ms']:>11.3f} {result['p99_ms']:>11.3f} {result['seconds']:>10.2f} "
+              f"{result['calls']:>11} {result['stats']['coalesced']:>10}")
+    print(f"queue: {result['stats']}")
+
+if __name__ == "__main__":
+    main()
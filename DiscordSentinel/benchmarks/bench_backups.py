@@ -0,0 +1,111 @@
+"""Disk use and latency of the backup store for frequent backups of a large guild.
+
+Each round snapshots a synthetic guild, then changes a few channels and roles
+before the next one, like a busy server backed up every hour. The "json" column
+is what storing each snapshot whole as JSON would take.
+    
+    python benchmarks/bench_backups.py --channels 500 --roles 250 --snapshots 48
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+def make_guild(channels: int, roles: int, categories: int) -> dict:
+    """Build a backup-shaped snapshot of a synthetic guild"""
+    def overwrites(i):
+        return {f"role_{1000 + (i + k) % roles}": {"allow": 1024 << k, "deny": 2048} for k in range(4)}
+    
+    return {
+        "guild_id": 1,
+        "guild_name": "Benchmark Guild",
+        "timestamp": datetime(2024, 1, 1).isoformat(),
+        "categories": [
+            {"id": 10_000 + i, "name": f"category-{i}", "position": i, "overwrites": overwrites(i)}
+            for i in range(categories)
+        ],
+        "channels": [
+            {"id": 20_000 + i, "name": f"channel-{i}", "type": "text", "position": i,
+             "topic": f"Topic for channel {i} " * 4, "slowmode_delay": 0, "nsfw": False,
+             "category_id": 10_000 + i % categories, "overwrites": overwrites(i)}
+            for i in range(channels)
+        ],
+        "roles": [
+            {"id": 1000 + i, "name": f"role-{i}", "color": i * 997 % 0xffffff, "hoist": i % 7 == 0,
+             "mentionable": False, "position": i, "permissions": 104_324_673}
+            for i in range(roles)
+        ]
+    }
+
+def mutate(guild: dict, rng: random.Random, changes: int):
+    """Rename a few channels and roles, as happens between backups"""
+    for _ in range(changes):
+        channel = rng.choice(guild["channels"])
+        channel["name"] = f"{channel['name'].split('~')[0]}~{rng.randrange(1_000_000)}"
+        role = rng.choice(guild["roles"])
+        role["color"] = rng.randrange(0xffffff)
+
+def run(channels: int, roles: int, categories: int, snapshots: int, changes: int) -> dict:
+    rng = random.Random(42)
+    guild = make_guild(channels, roles, categories)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_file=os.path.join(tmp, "bench.db"), data_dir=tmp)
+        
+        json_bytes = 0
+        store_time = 0.0
+        backup_ids = []
+        for number in range(snapshots):
+            guild["timestamp"] = (datetime(2024, 1, 1) + timedelta(hours=number)).isoformat()
+            json_bytes += len(json.dumps(guild))
+            
+            start = time.perf_counter()
+            backup_ids.append(db.store_backup(guild))
+            store_time += time.perf_counter() - start
+            mutate(guild, rng, changes)
+        
+        start = time.perf_counter()
+        listed = db.get_backups(1)
+        list_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        restored = db.get_backup(backup_ids[-1])
+        load_time = time.perf_counter() - start
+        
+        assert len(listed) == snapshots and len(restored["channels"]) == channels
+        stats = db.backups.stats()
+        db.close()
+    
+    return {
+        "json_bytes": json_bytes,
+        "stored_bytes": stats["stored_bytes"],
+        "store_ms": store_time / snapshots * 1000,
+        "list_ms": list_time * 1000,
+        "load_ms": load_time * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=500)
+    parser.add_argument("--roles", type=int, default=250)
+    parser.add_argument("--categories", type=int, default=25)
+    parser.add_argument("--snapshots", type=int, default=48)
+    parser.add_argument("--changes", type=int, default=3, help="channels and roles changed between snapshots")
+    args = parser.parse_args()
+    
+    result = run(args.channels, args.roles, args.categories, args.snapshots, args.changes)
+    print(f"{'json':>12} {'stored':>12} {'ratio':>8} {'store':>10} {'list':>10} {'load':>10}")
+    print(f"{result['json_bytes']:>12,} {result['stored_bytes']:>12,} "
+          f"{result['json_bytes'] / result['stored_bytes']:>7.1f}x "
+          f"{result['store_ms']:>8.1f}ms {result['list_ms']:>8.2f}ms {result['load_ms']:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
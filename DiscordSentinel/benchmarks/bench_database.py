@@ -0,0 +1,179 @@
+"""Storage benchmark suite for utils.database.
+
+Drives the persistence paths every moderation action goes through over
+synthetic datasets of increasing size and reports, per operation, throughput,
+p50/p99 latency and bytes written per call, plus the peak RSS of each dataset
+size. Each size runs in a fresh process so peak RSS is not inherited from the
+previous one. ``--json`` writes the results in a stable, machine-readable form
+so regressions can be tracked between releases.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_database.py --rows 1000 10000 100000 1000000 --json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+USERS = 5000
+GUILDS = 50
+FORMAT_VERSION = 1
+
+def prefill(db: Database, rows: int):
+    """Bulk load `rows` warnings, logs and quarantine records"""
+    timestamp = datetime.utcnow().isoformat()
+    with db._lock:
+        db.conn.execute("BEGIN")
+        db.conn.executemany(
+            "INSERT INTO warnings (id, guild_id, user_id, moderator_id, reason, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            ((i, i % GUILDS, i % USERS, 1, "Benchmark warning", timestamp) for i in range(1, rows + 1))
+        )
+        db.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_warning_id', ?)", (rows + 1,))
+        db.conn.executemany(
+            "INSERT INTO quarantine (guild_id, user_id, data) VALUES (?, ?, ?)",
+            (
+                (i % GUILDS, i, f'{{"guild_id": {i % GUILDS}, "user_id": {i}, "original_roles": []}}')
+                for i in range(rows)
+            )
+        )
+        db.conn.execute("COMMIT")
+    
+    for guild_id in range(GUILDS):
+        db.action_log(guild_id).extend([
+            {"action": "member_join", "moderator_id": None, "target_id": i % USERS,
+             "reason": "User joined the server", "timestamp": timestamp}
+            for i in range(guild_id, rows, GUILDS)
+        ])
+    
+    # Drop any partitions cached before the prefill
+    db.load()
+
+def bytes_written() -> int:
+    """Bytes this process has passed to write() so far, including background threads"""
+    try:
+        with open("/proc/self/io", 'r') as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def measure(db: Database, func, calls: int) -> dict:
+    """Time `calls` calls of `func` one by one, then flush so writes are counted"""
+    db.flush()
+    written = bytes_written()
+    samples = []
+    
+    start = time.perf_counter()
+    for i in range(calls):
+        call_start = time.perf_counter_ns()
+        func(i)
+        samples.append((time.perf_counter_ns() - call_start) / 1000)
+    db.flush()
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "calls": calls,
+        "ops_per_sec": calls / elapsed,
+        "p50_us": percentile(samples, 0.50),
+        "p99_us": percentile(samples, 0.99),
+        "bytes_per_op": (bytes_written() - written) / calls
+    }
+
+def make_backup(guild_id: int) -> dict:
+    return {
+        "guild_id": guild_id, "guild_name": "bench", "timestamp": datetime.utcnow().isoformat(),
+        "channels": [{"id": i, "name": f"channel-{i}", "overwrites": {}} for i in range(50)],
+        "roles": [{"id": i, "name": f"role-{i}"} for i in range(20)],
+        "categories": []
+    }
+
+# name -> (call, share of --calls); reads that reach the cold log tier run fewer times
+OPERATIONS = {
+    "add_warning": (lambda db, rows, i: db.add_warning(i % USERS, 1, "bench", i % GUILDS), 1),
+    "log_action": (lambda db, rows, i: db.log_action("bench", 1, i % USERS, "bench", i % GUILDS), 1),
+    "get_recent_logs": (lambda db, rows, i: db.get_recent_logs(i % GUILDS, 10), 1),
+    "get_recent_logs_user": (lambda db, rows, i: db.get_recent_logs(i % GUILDS, 5, i % USERS), 0.1),
+    "get_user_stats": (lambda db, rows, i: db.get_user_stats(i % USERS, i % GUILDS), 0.1),
+    "add_quarantine": (
+        lambda db, rows, i: db.add_quarantine({"guild_id": i % GUILDS, "user_id": rows + i, "original_roles": []}), 1
+    ),
+    "get_quarantine": (lambda db, rows, i: db.get_quarantine(i % rows, i % GUILDS), 1),
+    "store_backup": (lambda db, rows, i: db.store_backup(make_backup(i % GUILDS)), 0.1),
+    "set_setting": (lambda db, rows, i: db.set_setting(f"key_{i % 100}", i), 1),
+}
+
+def run(rows: int, calls: int) -> dict:
+    """Benchmark every operation against a dataset of `rows` records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_file=os.path.join(tmp, "bench.db"), data_dir=tmp)
+        prefill(db, rows)
+        
+        operations = {}
+        for name, (call, share) in OPERATIONS.items():
+            operations[name] = measure(db, lambda i: call(db, rows, i), max(int(calls * share), 1))
+        db.close()
+    
+    return {"rows": rows, "peak_rss_kb": peak_rss_kb(), "operations": operations}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON to FILE")
+    args = parser.parse_args()
+    
+    results = []
+    print(f"{'rows':>10} {'operation':>22} {'ops/s':>10} {'p50':>12} {'p99':>12} {'bytes/op':>10}")
+    for rows in args.rows:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run, rows, args.calls).result()
+        results.append(result)
+        
+        for name, stats in result["operations"].items():
+            print(f"{rows:>10} {name:>22} {stats['ops_per_sec']:>10.0f} {stats['p50_us']:>10.1f}us "
+                  f"{stats['p99_us']:>10.1f}us {stats['bytes_per_op']:>10.0f}")
+        print(f"{rows:>10} {'peak RSS':>22} {result['peak_rss_kb'] / 1024:>9.1f}M")
+    
+    if args.json:
+        report = {
+            "format": FORMAT_VERSION,
+            "created": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calls": args.calls,
+            "results": results
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
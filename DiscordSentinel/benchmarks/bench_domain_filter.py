@@ -0,0 +1,85 @@
+"""Link whitelist cost as the domain list grows.
+
+Compares the old check, ``domain in link`` for every whitelisted domain, with
+``utils.domain_filter.DomainFilter`` on the same seeded links, for domain lists
+of increasing size. ``cold`` is the first sight of each host (parse plus label
+suffix lookups), ``warm`` is a repeated host served from the host cache. Also
+counts look-alike links (``github.com.evil.xyz``, ``github.com@evil.xyz``,
+``evil.xyz\\@github.com``, ``evil.xyz\\.github.com``) that each one lets
+through.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_domain_filter.py --sizes 8 1000 100000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.domain_filter import ALLOWED, DomainFilter
+
+def random_domain(rng: random.Random) -> str:
+    name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+    return f"{name}.{rng.choice(['com', 'net', 'org', 'io', 'gg'])}"
+
+def legacy_allowed(domains: list, link: str) -> bool:
+    return any(domain in link for domain in domains)
+
+def per_link_us(check, links: list) -> float:
+    start = time.perf_counter()
+    for link in links:
+        check(link)
+    return (time.perf_counter() - start) / len(links) * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 1000, 10000, 100000])
+    parser.add_argument("--links", type=int, default=5000)
+    parser.add_argument("--hosts", type=int, default=500, help="distinct hosts among the links")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    print(f"{'domains':>8} {'legacy us/link':>15} {'cold us/link':>13} {'warm us/link':>13} {'look-alikes passed':>19}")
+    for size in args.sizes:
+        domains = [random_domain(rng) for _ in range(size)]
+        hosts = [
+            f"{rng.choice(['', 'www.', 'cdn.'])}{rng.choice(domains)}" if rng.random() < 0.5 else random_domain(rng)
+            for _ in range(args.hosts)
+        ]
+        links = [f"https://{rng.choice(hosts)}/{rng.randint(0, 9999)}" for _ in range(args.links)]
+        lookalike_forms = [
+            lambda domain, evil: f"https://{domain}.{evil}/login",
+            lambda domain, evil: f"https://{domain}@{evil}/login",
+            # Browsers treat "\\" as "/", so these go to the evil host
+            lambda domain, evil: f"https://{evil}\\@{domain}/login",
+            lambda domain, evil: f"https://{evil}\\.{domain}/login",
+        ]
+        lookalikes = [
+            form(domain, random_domain(rng))
+            for form, domain in zip(lookalike_forms * 50, rng.choices(domains, k=200))
+        ]
+        
+        # The legacy loop is slow enough at large sizes to time a sample of the links
+        sample = links[:max(20, args.links * 100 // max(size, 100))]
+        legacy_us = per_link_us(lambda link: legacy_allowed(domains, link), sample)
+        
+        domain_filter = DomainFilter(domains)
+        cold_us = per_link_us(domain_filter.classify, links[:args.hosts])
+        domain_filter = DomainFilter(domains)
+        for link in links:
+            domain_filter.classify(link)
+        warm_us = per_link_us(domain_filter.classify, links)
+        
+        legacy_passed = sum(1 for link in lookalikes if legacy_allowed(domains, link))
+        filter_passed = sum(1 for link in lookalikes if domain_filter.classify(link) == ALLOWED)
+        passed = f"{legacy_passed} vs {filter_passed} of {len(lookalikes)}"
+        print(f"{size:>8} {legacy_us:>15.2f} {cold_us:>13.2f} {warm_us:>13.2f} {passed:>19}")
+
+if __name__ == "__main__":
+    main()
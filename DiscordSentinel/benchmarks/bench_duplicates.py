@@ -0,0 +1,105 @@
+"""Cost and accuracy of cross-member duplicate detection.
+
+Feeds ``utils.duplicate_detector.DuplicateDetector`` seeded chat traffic (words
+drawn from a Zipf-like distribution, so ordinary messages overlap a lot) with
+a raid mixed in: ``--raid`` members posting the same message, each copy
+lightly mutated (case, leetspeak, a changed word, padding). Compares per
+message cost with the naive approach of comparing every new message against
+every message in the window. Reports how many ordinary messages were flagged
+(false positives) and how many raid copies were caught.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_duplicates.py --messages 20000 --raid 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.duplicate_detector import DuplicateDetector
+
+VOCABULARY = (
+    "the a to and is it you i that of in for on this be are have with just so was but not "
+    "what my can do we lol like get if they at your know yeah think no all one up out about "
+    "game play server time good now new patch anyone here today tonight help thanks people "
+    "really going want see make me would when there how then also got some more well back"
+).split()
+
+RAID = "FREE NITRO for everyone who joins right now, claim yours at the link before it runs out"
+
+def chat_message(rng: random.Random) -> str:
+    words = rng.choices(VOCABULARY, weights=[1 / (rank + 1) for rank in range(len(VOCABULARY))],
+                        k=rng.randint(4, 25))
+    return " ".join(words)
+
+def raid_copy(rng: random.Random) -> str:
+    words = RAID.split()
+    words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    text = " ".join(words)
+    if rng.random() < 0.5:
+        text = text.lower()
+    if rng.random() < 0.5:
+        text = text.replace("e", "3").replace("o", "0")
+    return text + rng.choice(["", "!!", " @everyone", " :)"])
+
+def traffic(rng: random.Random, messages: int, raid: int) -> list:
+    """(author ID, content, is raid) tuples; the raid starts halfway through"""
+    posts = [(rng.randint(1, 2000), chat_message(rng), False) for _ in range(messages)]
+    start = messages // 2
+    for i in range(raid):
+        posts.insert(start + i * 3, (100_000 + i, raid_copy(rng), True))
+    return posts
+
+def run_detector(posts: list, args) -> tuple:
+    clock = [0.0]
+    detector = DuplicateDetector(clock=lambda: clock[0])
+    flagged = set()
+    began = time.perf_counter()
+    for message_id, (author_id, content, _) in enumerate(posts, 1):
+        clock[0] += args.interval
+        for copy in detector.check(1, author_id, 10, message_id, content, 60, 4, 0.5, 30):
+            flagged.add(copy.message_id)
+    per_message = (time.perf_counter() - began) / len(posts) * 1_000_000
+    return per_message, flagged, detector.stats()
+
+def run_naive(posts: list, args) -> float:
+    """Every new message against every message still in the window, on exact shingle sets"""
+    window = []
+    sample = posts[:min(len(posts), 3000)]
+    began = time.perf_counter()
+    for message_id, (author_id, content, _) in enumerate(sample, 1):
+        text = content.lower()
+        shingles = {text[i:i + 4] for i in range(len(text) - 3)}
+        now = message_id * args.interval
+        window = [(stamp, other) for stamp, other in window if now - stamp < 60]
+        for _, other in window:
+            len(shingles & other) / (len(shingles | other) or 1)
+        window.append((now, shingles))
+    return (time.perf_counter() - began) / len(sample) * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--raid", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between messages")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    posts = traffic(rng, args.messages, args.raid)
+    raid_ids = {message_id for message_id, (_, _, is_raid) in enumerate(posts, 1) if is_raid}
+    
+    naive_us = run_naive(posts, args)
+    detector_us, flagged, stats = run_detector(posts, args)
+    print(f"window holds ~{60 / args.interval:,.0f} messages")
+    print(f"naive    {naive_us:>9.1f}us per message")
+    print(f"detector {detector_us:>9.1f}us per message, {stats['candidates'] / max(stats['checked'], 1):.1f} candidates each")
+    print(f"raid copies caught: {len(flagged & raid_ids)} of {len(raid_ids)}")
+    print(f"ordinary messages flagged: {len(flagged - raid_ids)} of {len(posts) - len(raid_ids)}")
+
+if __name__ == "__main__":
+    main()
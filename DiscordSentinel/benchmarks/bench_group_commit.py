@@ -0,0 +1,78 @@
+"""Logged events per second during an event storm, with and without group commit.
+
+Many coroutines log actions and add warnings through AsyncDatabase at the same
+time, like the cogs do during a raid. "single" commits every record on its own
+(batch size 1); "group" uses the default group-commit settings.
+    
+    python benchmarks/bench_group_commit.py --events 20000 --producers 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database, AsyncDatabase
+
+GUILD_ID = 1
+
+async def storm(db: AsyncDatabase, events: int, producers: int, warn_every: int):
+    """Log `events` actions from `producers` coroutines; every warn_every-th is also a warning"""
+    per_producer = events // producers
+    
+    async def producer(number):
+        for i in range(per_producer):
+            user_id = number * per_producer + i
+            await db.log_action("message_delete", None, user_id, "Spam detected", GUILD_ID)
+            if warn_every and i % warn_every == 0:
+                await db.add_warning(user_id, 1, "Spamming", GUILD_ID)
+            else:
+                await asyncio.sleep(0)
+    
+    await asyncio.gather(*(producer(number) for number in range(producers)))
+    await db.flush()
+    return per_producer * producers
+
+async def run(mode: str, events: int, producers: int, warn_every: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "single":
+            db = Database(db_file=os.path.join(tmp, "bench.db"), data_dir=tmp, commit_delay=0, commit_batch=1)
+        else:
+            db = Database(db_file=os.path.join(tmp, "bench.db"), data_dir=tmp)
+        async_db = AsyncDatabase(db)
+        
+        start = time.perf_counter()
+        logged = await storm(async_db, events, producers, warn_every)
+        elapsed = time.perf_counter() - start
+        
+        batches = db.writer.batches + db.log_writer.batches
+        records = db.writer.records + db.log_writer.records
+        await async_db.close()
+        
+        return {
+            "mode": mode,
+            "events": logged,
+            "elapsed": elapsed,
+            "rate": logged / elapsed,
+            "batch": records / max(batches, 1)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--producers", type=int, default=200)
+    parser.add_argument("--warn-every", type=int, default=20, help="add a warning every N events per producer (0 = never)")
+    parser.add_argument("--modes", nargs="+", default=["single", "group"])
+    args = parser.parse_args()
+    
+    print(f"{'mode':>10} {'events':>8} {'elapsed':>10} {'events/s':>10} {'avg batch':>10}")
+    for mode in args.modes:
+        result = asyncio.run(run(mode, args.events, args.producers, args.warn_every))
+        print(f"{result['mode']:>10} {result['events']:>8} {result['elapsed']:>9.2f}s "
+              f"{result['rate']:>10.0f} {result['batch']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Linear scans vs the GuildPartition hash indexes at increasing dataset sizes.
+
+The scan functions are the list-based lookups Database used before the
+indexes; the indexed ones go through GuildPartition.
+    
+    python benchmarks/bench_indexes.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import GuildPartition
+
+USERS_PER_SIZE = 0.05  # users = 5% of records, so each user has ~20 warnings
+
+def build(size: int):
+    """Build the same warnings and quarantine records as lists and as a partition"""
+    users = max(int(size * USERS_PER_SIZE), 1)
+    warnings = [
+        {"id": i, "guild_id": 1, "user_id": i % users, "moderator_id": 1, "reason": "bench", "timestamp": ""}
+        for i in range(1, size + 1)
+    ]
+    quarantined = [{"guild_id": 1, "user_id": i, "original_roles": []} for i in range(size)]
+    
+    partition = GuildPartition(1)
+    for warning in warnings:
+        partition.add_warning(dict(warning))
+    for record in quarantined:
+        partition.quarantined[record["user_id"]] = dict(record)
+    return users, warnings, quarantined, partition
+
+def measure(func, calls: int) -> float:
+    """Return the mean latency of `func` in microseconds"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+def run(size: int, calls: int) -> dict:
+    users, warnings, quarantined, partition = build(size)
+    
+    def scan_remove_warning(i):
+        # Remove and re-add so the dataset keeps its size
+        nonlocal warnings
+        warning_id = i % size + 1
+        removed = [w for w in warnings if w["id"] == warning_id]
+        warnings = [w for w in warnings if w["id"] != warning_id]
+        warnings.extend(removed)
+    
+    def index_remove_warning(i):
+        warning = partition.remove_warning(i % size + 1)
+        partition.warnings[warning["id"]] = warning
+        partition.warnings_by_user.setdefault(warning["user_id"], []).append(warning)
+    
+    def spread(i):
+        # Spread lookups across the dataset so scans do not stop early
+        return i * 7919 % size
+    
+    def scan_get_quarantine(i):
+        user_id = spread(i)
+        for record in quarantined:
+            if record["user_id"] == user_id and record["guild_id"] == 1:
+                return record
+    
+    return {
+        "get_warnings": (
+            measure(lambda i: [w for w in warnings if w["user_id"] == i % users], calls),
+            measure(lambda i: partition.user_warnings(i % users), calls)
+        ),
+        "remove_warning": (
+            measure(scan_remove_warning, calls),
+            measure(index_remove_warning, calls)
+        ),
+        "get_quarantine": (
+            measure(scan_get_quarantine, calls),
+            measure(lambda i: partition.quarantined.get(spread(i)), calls)
+        ),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    
+    print(f"{'size':>10} {'lookup':>16} {'scan':>14} {'indexed':>12} {'speedup':>10}")
+    for size in args.sizes:
+        for name, (scan, indexed) in run(size, args.calls).items():
+            print(f"{size:>10} {name:>16} {scan:>12.1f}us {indexed:>10.2f}us {scan / indexed:>9.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Event loop lag during a synthetic raid, blocking vs AsyncDatabase calls.
+
+Each simulated member join logs two actions, like LoggingCog and AntiRaidCog
+do. "blocking" writes each entry to the action log from the handler, as the
+cogs did before AsyncDatabase; "async" goes through AsyncDatabase and the
+group-commit writer. ``--disk-delay-ms`` adds a sleep to every fsync to model
+a slow disk.
+    
+    python benchmarks/bench_loop_lag.py --joins 500 --disk-delay-ms 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database, AsyncDatabase
+from utils.metrics import LoopLagMonitor
+
+GUILD_ID = 1
+
+def slow_disk(delay: float):
+    """Make every fsync take at least `delay` seconds"""
+    fsync = os.fsync
+    
+    def delayed_fsync(fd):
+        time.sleep(delay)
+        fsync(fd)
+    
+    os.fsync = delayed_fsync
+
+async def raid(joins: int, rate: float, log_join):
+    """Fire `joins` member-join handlers at `rate` joins per second"""
+    tasks = []
+    for user_id in range(joins):
+        tasks.append(asyncio.create_task(log_join(user_id)))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+
+async def run(mode: str, joins: int, rate: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_file=os.path.join(tmp, "bench.db"), data_dir=tmp)
+        async_db = AsyncDatabase(db)
+        
+        if mode == "blocking":
+            def entry(action, moderator_id, target_id, reason):
+                return {"action": action, "moderator_id": moderator_id, "target_id": target_id,
+                        "reason": reason, "timestamp": datetime.utcnow().isoformat()}
+            
+            async def log_join(user_id):
+                db.action_log(GUILD_ID).append(entry("member_join", None, user_id, "User joined the server"))
+                db.action_log(GUILD_ID).append(entry("raid_kick", 1, user_id, "Kicked during raid protection"))
+        else:
+            async def log_join(user_id):
+                await async_db.log_action("member_join", None, user_id, "User joined the server", GUILD_ID)
+                await async_db.log_action("raid_kick", 1, user_id, "Kicked during raid protection", GUILD_ID)
+        
+        monitor = LoopLagMonitor(interval=0.003, window=100_000)
+        monitor.start()
+        start = time.perf_counter()
+        await raid(joins, rate, log_join)
+        elapsed = time.perf_counter() - start
+        monitor.stop()
+        await async_db.close()
+    
+    return {"elapsed_s": elapsed, **monitor.snapshot()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0, help="joins per second")
+    parser.add_argument("--disk-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    slow_disk(args.disk_delay_ms / 1000)
+    
+    print(f"{'mode':>10} {'elapsed':>10} {'p50 lag':>10} {'p99 lag':>10} {'max lag':>10}")
+    for mode in ("blocking", "async"):
+        result = asyncio.run(run(mode, args.joins, args.rate))
+        print(
+            f"{mode:>10} {result['elapsed_s']:>9.2f}s {result['p50_ms']:>8.1f}ms "
+            f"{result['p99_ms']:>8.1f}ms {result['max_ms']:>8.1f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""AutoModerationCog.on_message throughput for clean messages.
+
+Feeds messages that trip no filter through the real ``on_message`` handler,
+so the cost measured is the per-message overhead every guild message pays:
+the spam tracker and the prefilter. Clean messages no longer reach the
+immunity check, so it is also timed on its own. Each mode adds one
+optimization:
+    
+    uncached  config.json read and parsed on every check, role names scanned
+    cached    ConfigCache snapshot, role names scanned
+    indexed   ConfigCache snapshot, RoleIndex role-ID sets
+    memoized  as indexed, behind the PermissionCache LRU (current code)
+
+Messages come from ``--authors`` distinct members in turn, so the memoized
+mode sees the hit rate of a channel where the same people keep talking.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_on_message.py --messages 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from cogs.automod import AutoModerationCog
+from utils import permissions
+from utils.guild_config import GuildConfigEngine
+
+class FakeRole:
+    """Stands in for discord.Role: the attributes Member.roles and guild_permissions read"""
+    
+    def __init__(self, role_id: int, name: str, guild, permissions: int = 0):
+        self.id = role_id
+        self.name = name
+        self.guild = guild
+        self.position = role_id
+        self.permissions = discord.Permissions(permissions)
+    
+    def __lt__(self, other):
+        return self.position < other.position
+
+class FakeGuild:
+    def __init__(self, guild_id: int, role_names: list):
+        self.id = guild_id
+        self.owner_id = 0
+        self.name = "bench"
+        self.default_role = FakeRole(guild_id, "@everyone", self, discord.Permissions.general().value)
+        self.roles = [self.default_role] + [
+            FakeRole(guild_id + 1 + i, name, self, discord.Permissions.text().value)
+            for i, name in enumerate(role_names)
+        ]
+        self._roles_by_id = {role.id: role for role in self.roles}
+    
+    def get_role(self, role_id: int):
+        return self._roles_by_id.get(role_id)
+
+class FakeMember(discord.Member):
+    """A discord.Member without a connection state; roles and guild_permissions are the real properties"""
+    
+    def __init__(self, user_id: int, guild: FakeGuild, roles: list):
+        self.guild = guild
+        self.timed_out_until = None
+        self._fake_id = user_id
+        self._roles = discord.utils.SnowflakeList([role.id for role in roles])
+    
+    id = property(lambda self: self._fake_id)
+    bot = property(lambda self: False)
+    mention = property(lambda self: f"<@{self._fake_id}>")
+
+CLEAN_MESSAGES = [
+    "hey everyone, how is it going today?",
+    "Has anyone tried the new patch yet? Looks good so far",
+    "I'll be on later tonight if anyone wants to play",
+    "thanks for the help with the setup earlier",
+    "Does anyone know when the event starts on Saturday?",
+]
+
+def read_config_every_call():
+    """The old load_config: open and parse config.json on every call"""
+    try:
+        with open(permissions.CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    except:
+        return permissions.DEFAULT_CONFIG
+
+def scan_role_names(user) -> bool:
+    """The old is_immune: compare every role name against the configured names"""
+    config = permissions.load_config()
+    perms = config.get("permissions", {})
+    if user.guild.owner_id == user.id or user.guild_permissions.administrator:
+        return True
+    immune_roles = perms.get("immune_roles", [])
+    user_roles = [role.name for role in user.roles]
+    return any(role in user_roles for role in immune_roles)
+
+IS_IMMUNE = permissions.is_immune
+
+MODES = {
+    "uncached": (read_config_every_call, scan_role_names),
+    "cached": (permissions.config_cache.get, scan_role_names),
+    "indexed": (permissions.config_cache.get, lambda user: permissions.compute_member_permissions(user)[2]),
+    "memoized": (permissions.config_cache.get, IS_IMMUNE),
+}
+
+async def run(mode: str, messages: int, authors: int) -> float:
+    permissions.load_config, permissions.is_immune = MODES[mode]
+    permissions.permission_cache.clear()
+    
+    bot = SimpleNamespace(db=None, user=SimpleNamespace(id=1), guild_config=GuildConfigEngine())
+    cog = AutoModerationCog(bot)
+    guild = FakeGuild(1_000_000, [f"role-{i}" for i in range(50)] + ["Moderator", "Admin"])
+    # Members here talk at a normal pace, and five lines on repeat from every
+    # member would be a raid; spam and raid handling are not what is measured
+    await bot.guild_config.update(guild.id, "automod", spam_threshold=messages + 1, duplicate_detection=False)
+    channel = SimpleNamespace(id=1, name="general", mention="#general")
+    roles = guild.roles[1:6]
+    
+    members = [FakeMember(1000 + i, guild, roles) for i in range(authors)]
+    batch = [
+        SimpleNamespace(
+            id=i + 1, author=members[i % authors], guild=guild, channel=channel,
+            content=CLEAN_MESSAGES[i % len(CLEAN_MESSAGES)]
+        )
+        for i in range(messages)
+    ]
+    
+    start = time.perf_counter()
+    for message in batch:
+        await cog.on_message(message)
+    rate = messages / (time.perf_counter() - start)
+    
+    # The immunity check on its own, since clean messages skip it in on_message
+    is_immune = permissions.is_immune
+    start = time.perf_counter()
+    for message in batch:
+        is_immune(message.author)
+    check_us = (time.perf_counter() - start) / messages * 1_000_000
+    return rate, check_us
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="report the best of this many runs")
+    parser.add_argument("--modes", nargs="+", default=list(MODES))
+    args = parser.parse_args()
+    
+    print(f"{'mode':>10} {'messages/s':>12} {'is_immune':>12}")
+    for mode in args.modes:
+        runs = [asyncio.run(run(mode, args.messages, args.authors)) for _ in range(args.repeat)]
+        rate = max(rate for rate, _ in runs)
+        check_us = min(check_us for _, check_us in runs)
+        print(f"{mode:>10} {rate:>12.0f} {check_us:>10.2f}us")
+
+if __name__ == "__main__":
+    main()
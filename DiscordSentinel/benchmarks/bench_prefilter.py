@@ -0,0 +1,70 @@
+"""Content scanning cost with and without the prefilter fast path.
+
+Scans the seeded chat corpus of ``bench_scanner`` (mostly clean, with the
+usual share of links, invites, shouting, zalgo, stretched words and forbidden
+words) two ways: ``full`` runs every stage of ``MessageScanner.scan`` on every
+message, as ``on_message`` used to; ``prefilter`` runs
+``MessageScanner.prefilter`` and only scans messages that fire a stage, with
+just the stages that fired. Both must reach the same verdicts, which is
+checked before timing. Reports microseconds per message, the share of
+messages that took the fast path and how often each stage fired.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_prefilter.py --messages 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scanner import CONFIG, make_corpus
+from utils import message_scanner
+from utils.message_scanner import CONTENT_STAGES, scanner_for
+
+def full(scanner, corpus: list) -> list:
+    return [scanner.scan(content).verdicts for content in corpus]
+
+def prefiltered(scanner, corpus: list) -> list:
+    verdicts = []
+    for content in corpus:
+        stages, repeat = scanner.prefilter(content)
+        stages &= CONTENT_STAGES
+        verdicts.append(scanner.scan(content, stages, repeat).verdicts if stages else set())
+    return verdicts
+
+MODES = {"full": full, "prefilter": prefiltered}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="report the best of this many runs")
+    args = parser.parse_args()
+    
+    corpus = make_corpus(args.messages, args.seed)
+    scanner = scanner_for(CONFIG)
+    assert full(scanner, corpus) == prefiltered(scanner, corpus), "prefilter changed a verdict"
+    
+    print(f"{'mode':>10} {'us/message':>11} {'messages/s':>12}")
+    for mode, run in MODES.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run(scanner, corpus)
+            best = min(best, time.perf_counter() - start)
+        print(f"{mode:>10} {best / len(corpus) * 1_000_000:>11.2f} {len(corpus) / best:>12.0f}")
+    
+    # Counters for one pass over the corpus
+    message_scanner.prefilter_stats.masks.clear()
+    prefiltered(scanner, corpus)
+    stats = message_scanner.prefilter_stats.stats()
+    print(f"fast path: {stats['fast_path']:,} of {stats['messages']:,} messages "
+          f"({stats['fast_path'] / stats['messages']:.1%})")
+    for name, hits in stats["hits"].items():
+        print(f"{name:>15} {hits:>8,} hits {stats['skips'][name]:>8,} skips")
+
+if __name__ == "__main__":
+    main()
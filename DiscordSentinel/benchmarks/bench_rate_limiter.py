@@ -0,0 +1,96 @@
+"""Auto-action rate limit cost and memory with many active members.
+
+Compares the old ``AutoModerationCog.can_take_action`` (an f-string key and a
+rebuilt list of datetimes per check, keys never evicted) with
+``utils.rate_limiter.RateLimiter`` on the same seeded checks from
+``--users`` members across a few action types. Reports the cost per check,
+then the keys and memory held after simulated hours of traffic on a virtual
+clock, where the limiter sweeps as it would in the bot.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_rate_limiter.py --users 100000 --hours 6
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limiter import RateLimiter
+
+ACTIONS = ("spam", "invite", "forbidden_word", "suspicious_link", "caps")
+
+class LegacyLimiter:
+    """The old can_take_action, with the clock passed in"""
+    
+    def __init__(self):
+        self.recent_actions = defaultdict(list)
+    
+    def can_take_action(self, user_id: int, action_type: str, now: datetime) -> bool:
+        key = f"{user_id}_{action_type}"
+        self.recent_actions[key] = [
+            action_time for action_time in self.recent_actions[key]
+            if (now - action_time).seconds < 60
+        ]
+        if len(self.recent_actions[key]) >= 1:
+            return False
+        self.recent_actions[key].append(now)
+        return True
+    
+    def memory_bytes(self) -> int:
+        total = sys.getsizeof(self.recent_actions)
+        for key, times in self.recent_actions.items():
+            total += sys.getsizeof(key) + sys.getsizeof(times) + sum(sys.getsizeof(stamp) for stamp in times)
+        return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--checks", type=int, default=300_000)
+    parser.add_argument("--hours", type=int, default=6)
+    parser.add_argument("--checks-per-hour", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    checks = [(rng.randrange(args.users), rng.randrange(len(ACTIONS))) for _ in range(args.checks)]
+    
+    # Cost per check on the real clocks
+    legacy = LegacyLimiter()
+    began = time.perf_counter()
+    for user_id, action in checks:
+        legacy.can_take_action(user_id, ACTIONS[action], datetime.utcnow())
+    legacy_us = (time.perf_counter() - began) / len(checks) * 1_000_000
+    limiter = RateLimiter()
+    began = time.perf_counter()
+    for user_id, action in checks:
+        limiter.allow(1, user_id, action)
+    limiter_us = (time.perf_counter() - began) / len(checks) * 1_000_000
+    print(f"check: legacy {legacy_us:.2f}us, limiter {limiter_us:.2f}us")
+    
+    # Memory over hours of traffic; new members keep arriving
+    clock = [0.0]
+    start = datetime(2024, 1, 1)
+    legacy = LegacyLimiter()
+    limiter = RateLimiter(clock=lambda: clock[0])
+    step = 3600 / args.checks_per_hour
+    print(f"{'hour':>5} {'legacy keys':>12} {'legacy KiB':>11} {'limiter keys':>13} {'limiter KiB':>12}")
+    for hour in range(1, args.hours + 1):
+        offset = hour * args.users
+        for _ in range(args.checks_per_hour):
+            clock[0] += step
+            user_id, action = offset + rng.randrange(args.users), rng.randrange(len(ACTIONS))
+            legacy.can_take_action(user_id, ACTIONS[action], start + timedelta(seconds=clock[0]))
+            limiter.allow(1, user_id, action)
+            if clock[0] % limiter.sweep_interval < step:
+                limiter.sweep()
+        print(f"{hour:>5} {len(legacy.recent_actions):>12,} {legacy.memory_bytes() / 1024:>11,.0f} "
+              f"{len(limiter):>13,} {limiter.memory_bytes() / 1024:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
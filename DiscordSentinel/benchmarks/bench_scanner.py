@@ -0,0 +1,123 @@
+"""Content filter throughput: one check per filter vs the fused MessageScanner.
+
+Scans a seeded corpus of chat messages (mostly clean, with the usual share of
+links, invites, shouting, zalgo, stretched words and forbidden words) and
+reports messages per second on one core. ``legacy`` is the old AutoModerationCog
+approach, one regex or Python loop per check over the same content; ``fused``
+is ``utils.message_scanner``. Both must reach the same verdicts, which is
+checked before timing.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_scanner.py --messages 50000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.guild_config import AutoModConfig
+from utils.message_scanner import INVITE_PATTERN, ZALGO_PATTERN, scanner_for
+
+CONFIG = AutoModConfig(
+    forbidden_words=("scamcoin", "freenitro", "slur1", "slur2", "badword"),
+    whitelisted_domains=("youtube.com", "youtu.be", "github.com", "twitter.com", "imgur.com"),
+)
+
+WORDS = (
+    "hey everyone how is it going today has anyone tried the new patch yet looks good so far "
+    "I will be on later tonight if anyone wants to play thanks for the help with setup earlier "
+    "does anyone know when the event starts on saturday lol yeah that boss fight was rough gg"
+).split()
+
+def make_corpus(messages: int, seed: int) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(messages):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))
+        roll = rng.random()
+        if roll < 0.05:
+            text += f" https://{rng.choice(CONFIG.whitelisted_domains)}/watch?v=abc{rng.randint(0, 999)}"
+        elif roll < 0.07:
+            text += f" https://free-prizes{rng.randint(0, 99)}.example.com/claim"
+        elif roll < 0.08:
+            text += f" discord.gg/{rng.randint(10000, 99999)}"
+        elif roll < 0.10:
+            text = text.upper()
+        elif roll < 0.11:
+            text = "".join(char + "\u0336\u0321" for char in text[:12])
+        elif roll < 0.13:
+            text += " no" + "o" * rng.randint(4, 12)
+        elif roll < 0.14:
+            text += " " + rng.choice(CONFIG.forbidden_words)
+        corpus.append(text)
+    return corpus
+
+invite_re = re.compile(INVITE_PATTERN)
+link_re = re.compile(r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?')
+zalgo_re = re.compile(ZALGO_PATTERN)
+repeated_re = re.compile(r'(.)\1{4,}')
+
+def legacy_scan(content: str, config: AutoModConfig) -> set:
+    """The old checks, each over the whole message"""
+    verdicts = set()
+    if invite_re.search(content):
+        verdicts.add("invite")
+    if len(content) >= config.caps_min_length:
+        caps_count = sum(1 for char in content if char.isupper())
+        if caps_count / len(content) >= config.caps_threshold:
+            verdicts.add("caps")
+    content_lower = content.lower()
+    for word in config.forbidden_words:
+        if word.lower() in content_lower:
+            verdicts.add("forbidden_word")
+            break
+    for link in link_re.findall(content):
+        if 'discord' in link:
+            continue
+        if not any(domain in link for domain in config.whitelisted_domains):
+            verdicts.add("suspicious_link")
+            break
+    if len(zalgo_re.findall(content)) > 5:
+        verdicts.add("zalgo")
+    if repeated_re.search(content):
+        verdicts.add("repeated_chars")
+    return verdicts
+
+def fused_scan(content: str, config: AutoModConfig) -> set:
+    return scanner_for(config).scan(content).verdicts
+
+MODES = {"legacy": legacy_scan, "fused": fused_scan}
+
+def run(scan, corpus: list) -> float:
+    config = CONFIG
+    start = time.perf_counter()
+    for content in corpus:
+        scan(content, config)
+    return len(corpus) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="report the best of this many runs")
+    args = parser.parse_args()
+    
+    corpus = make_corpus(args.messages, args.seed)
+    mismatches = [content for content in corpus if legacy_scan(content, CONFIG) != fused_scan(content, CONFIG)]
+    flagged = sum(1 for content in corpus if fused_scan(content, CONFIG))
+    print(f"{len(corpus)} messages, {flagged} flagged, {len(mismatches)} verdict mismatches")
+    for content in mismatches[:5]:
+        print(f"  mismatch: {content[:80]!r}")
+    
+    print(f"{'mode':>8} {'messages/s/core':>16} {'us/message':>12}")
+    for mode, scan in MODES.items():
+        rate = max(run(scan, corpus) for _ in range(args.repeat))
+        print(f"{mode:>8} {rate:>16.0f} {1_000_000 / rate:>12.2f}")
+
+if __name__ == "__main__":
+    main()
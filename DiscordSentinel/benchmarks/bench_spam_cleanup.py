@@ -0,0 +1,109 @@
+"""REST calls and time taken to remove a spammer's messages.
+
+A spammer posts ``--messages`` messages spread over ``--channels`` channels.
+``legacy`` is the old cleanup: read the last 50 messages of the channel where
+spam was detected and delete the spammer's one request at a time.
+``bulk`` is ``AutoModerationCog.bulk_delete`` fed by the spam tracker's
+remembered message IDs: up to 100 IDs per request, all channels at once.
+Each fake REST call takes ``--latency`` milliseconds.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_spam_cleanup.py --messages 60 --channels 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.automod import AutoModerationCog
+from utils.spam_tracker import SpamTracker
+
+class FakeChannel:
+    """Counts REST calls; each one takes `latency` seconds"""
+    
+    def __init__(self, channel_id: int, latency: float, stats: dict):
+        self.id = channel_id
+        self.latency = latency
+        self.stats = stats
+        self.messages = []
+    
+    async def _call(self):
+        self.stats["calls"] += 1
+        await asyncio.sleep(self.latency)
+    
+    async def history(self, limit: int):
+        await self._call()
+        for message in self.messages[-limit:][::-1]:
+            yield message
+    
+    async def delete_message(self, message):
+        await self._call()
+        self.messages.remove(message)
+        self.stats["deleted"] += 1
+    
+    async def delete_messages(self, messages, reason=None):
+        await self._call()
+        ids = {message.id for message in messages}
+        before = len(self.messages)
+        self.messages = [message for message in self.messages if message.id not in ids]
+        self.stats["deleted"] += before - len(self.messages)
+
+class FakeGuild:
+    def __init__(self, channels: list):
+        self.id = 1
+        self._channels = {channel.id: channel for channel in channels}
+    
+    def get_channel_or_thread(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+def post_spam(channels: list, messages: int, tracker: SpamTracker):
+    for i in range(messages):
+        channel = channels[i % len(channels)]
+        message = SimpleNamespace(id=i + 1, author_id=42, channel=channel)
+        channel.messages.append(message)
+        tracker.record(1, 42, 5, 10, channel.id, message.id)
+
+async def legacy(channels: list):
+    channel = channels[-1]
+    async for message in channel.history(limit=50):
+        if message.author_id == 42:
+            await channel.delete_message(message)
+
+async def bulk(cog: AutoModerationCog, guild: FakeGuild):
+    by_channel = cog.spam_tracker.take_recent(guild.id, 42, 30)
+    await cog.bulk_delete(guild, by_channel, "bench")
+
+async def run(mode: str, args) -> dict:
+    stats = {"calls": 0, "deleted": 0}
+    channels = [FakeChannel(100 + i, args.latency / 1000, stats) for i in range(args.channels)]
+    guild = FakeGuild(channels)
+    cog = AutoModerationCog(SimpleNamespace(db=None))
+    post_spam(channels, args.messages, cog.spam_tracker)
+    
+    start = time.perf_counter()
+    if mode == "legacy":
+        await legacy(channels)
+    else:
+        await bulk(cog, guild)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=60)
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=50.0, help="milliseconds per REST call")
+    args = parser.parse_args()
+    
+    print(f"{'mode':>7} {'REST calls':>11} {'deleted':>8} {'of':>4} {'seconds':>8}")
+    for mode in ("legacy", "bulk"):
+        stats = asyncio.run(run(mode, args))
+        print(f"{mode:>7} {stats['calls']:>11} {stats['deleted']:>8} {args.messages:>4} {stats['seconds']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Spam tracker memory over simulated weeks of uptime, and per-message cost.
+
+Drives the old ``defaultdict(list)`` tracker and ``utils.spam_tracker.SpamTracker``
+with the same synthetic traffic on a virtual clock: a busy guild where new
+members keep arriving and most of them go quiet after a while. Reports
+tracked keys and memory at the end of each simulated day, then the cost of
+recording one message during a flood.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_spam_tracker.py --days 21
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.spam_tracker import SpamTracker
+
+THRESHOLD = 5
+WINDOW = 10
+
+class LegacyTracker:
+    """The old AutoModerationCog tracking: a growing list of datetimes per user ID"""
+    
+    def __init__(self):
+        self.user_messages = defaultdict(list)
+    
+    def record(self, user_id: int, now: datetime) -> bool:
+        self.user_messages[user_id].append(now)
+        user_msgs = self.user_messages[user_id]
+        user_msgs[:] = [msg_time for msg_time in user_msgs if (now - msg_time).seconds < WINDOW]
+        return len(user_msgs) >= THRESHOLD
+    
+    def memory_bytes(self) -> int:
+        total = sys.getsizeof(self.user_messages)
+        for times in self.user_messages.values():
+            total += sys.getsizeof(times) + sum(sys.getsizeof(stamp) for stamp in times)
+        return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=21)
+    parser.add_argument("--messages-per-day", type=int, default=20000)
+    parser.add_argument("--new-members-per-day", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    clock = [0.0]
+    tracker = SpamTracker(clock=lambda: clock[0])
+    legacy = LegacyTracker()
+    start = datetime(2024, 1, 1)
+    members = list(range(1000))
+    
+    print(f"{'day':>4} {'legacy keys':>12} {'legacy KiB':>11} {'tracker keys':>13} {'tracker KiB':>12}")
+    for day in range(1, args.days + 1):
+        members += range(len(members), len(members) + args.new_members_per_day)
+        # Recent arrivals do most of the talking
+        active = members[-5000:]
+        step = 86400 / args.messages_per_day
+        for _ in range(args.messages_per_day):
+            clock[0] += step
+            user_id = rng.choice(active)
+            tracker.record(1, user_id, THRESHOLD, WINDOW)
+            legacy.record(user_id, start + timedelta(seconds=clock[0]))
+            if clock[0] % tracker.sweep_interval < step:
+                tracker.sweep()
+        print(f"{day:>4} {len(legacy.user_messages):>12,} {legacy.memory_bytes() / 1024:>11,.0f} "
+              f"{len(tracker):>13,} {tracker.memory_bytes() / 1024:>12,.0f}")
+    
+    # Per-message cost while 100 members flood a channel, on the real clocks
+    count = 200_000
+    tracker = SpamTracker()
+    legacy = LegacyTracker()
+    began = time.perf_counter()
+    for i in range(count):
+        legacy.record(i % 100, datetime.utcnow())
+    legacy_us = (time.perf_counter() - began) / count * 1_000_000
+    began = time.perf_counter()
+    for i in range(count):
+        tracker.record(1, i % 100, THRESHOLD, WINDOW)
+    tracker_us = (time.perf_counter() - began) / count * 1_000_000
+    print(f"record: legacy {legacy_us:.2f}us, tracker {tracker_us:.2f}us per message")
+
+if __name__ == "__main__":
+    main()
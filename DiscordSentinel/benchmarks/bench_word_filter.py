@@ -0,0 +1,105 @@
+"""Forbidden-word matching cost as the word list grows.
+
+Compares the old check, ``word.lower() in content_lower`` for every listed
+word, with ``utils.word_filter.WordMatcher`` on the same seeded chat messages,
+for word lists of increasing size. Also reports how many disguised uses of a
+listed word (leetspeak, separators, look-alike letters) each one catches,
+and how many clean messages it flags because a short listed word turns up
+inside other words (false positives). The short words are listed in double
+quotes, so the matcher only takes them as whole words; the old check gets
+them bare.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/bench_word_filter.py --sizes 10 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.word_filter import WordMatcher
+
+CHAT = (
+    "hey everyone how is it going today has anyone tried the new patch yet looks good so far "
+    "I will be on later tonight if anyone wants to play thanks for the help with setup earlier"
+).split()
+
+DISGUISES = [
+    lambda word: word.upper(),
+    lambda word: " ".join(word),
+    lambda word: ".".join(word),
+    lambda word: word.replace("o", "0").replace("e", "3").replace("a", "@"),
+    lambda word: word.replace("a", "а").replace("o", "о").replace("e", "е"),
+    lambda word: f"{word}s",
+]
+
+# Short listed words, and clean messages that hold them inside or across other words
+SHORT_WORDS = ["ass", "sex", "hell", "tit", "cum"]
+CLEAN = [
+    "its excellent work",
+    "the llama is here",
+    "pass me the salt",
+    "that was a classic match",
+    "check the title of the document",
+    "open a new shell and run it",
+    "I will be there in a sec, seriously",
+    "the class assignment is due",
+    "hello, anyone around?",
+    "what a great accumulator",
+    "is excess memory the issue",
+    "push ellipsis",
+]
+
+def legacy_findall(words: list, content: str) -> list:
+    content_lower = content.lower()
+    return [word for word in words if word.strip('"').lower() in content_lower]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 50000])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    corpus = [" ".join(rng.choices(CHAT, k=rng.randint(3, 30))) for _ in range(args.messages)]
+    
+    print(f"{'words':>7} {'build':>8} {'legacy us/msg':>14} {'matcher us/msg':>15} {'legacy caught':>14} {'matcher caught':>15} {'legacy false+':>14} {'matcher false+':>15}")
+    for size in args.sizes:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12))) for _ in range(size)]
+        words[:len(SHORT_WORDS)] = [f'"{word}"' for word in SHORT_WORDS]
+        start = time.perf_counter()
+        matcher = WordMatcher(words)
+        build = time.perf_counter() - start
+        
+        # The legacy loop is slow enough at large sizes to time a sample of the corpus
+        sample = corpus[:max(50, args.messages * 10 // max(size, 10))]
+        start = time.perf_counter()
+        for content in sample:
+            legacy_findall(words, content)
+        legacy_us = (time.perf_counter() - start) / len(sample) * 1_000_000
+        
+        start = time.perf_counter()
+        for content in corpus:
+            matcher.findall(content)
+        matcher_us = (time.perf_counter() - start) / len(corpus) * 1_000_000
+        
+        disguised = [
+            f"{content} {disguise(rng.choice(words))}"
+            for content, disguise in zip(corpus[:600], DISGUISES * 100)
+        ]
+        legacy_caught = sum(1 for content in disguised if legacy_findall(words, content))
+        matcher_caught = sum(1 for content in disguised if matcher.findall(content))
+        legacy_false = sum(1 for content in CLEAN if legacy_findall(words, content))
+        matcher_false = sum(1 for content in CLEAN if matcher.findall(content))
+        print(f"{size:>7} {build:>7.2f}s {legacy_us:>14.1f} {matcher_us:>15.1f} "
+              f"{f'{legacy_caught}/{len(disguised)}':>14} {f'{matcher_caught}/{len(disguised)}':>15} "
+              f"{f'{legacy_false}/{len(CLEAN)}':>14} {f'{matcher_false}/{len(CLEAN)}':>15}")
+
+if __name__ == "__main__":
+    main()
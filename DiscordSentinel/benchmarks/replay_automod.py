@@ -0,0 +1,453 @@
+"""Offline replay of a message corpus through the auto-moderation pipeline.
+
+Feeds a JSONL corpus through the real ``AutoModerationCog.on_message`` with
+lightweight fake guilds, channels, members and messages. A replay clock
+follows each message's timestamp, so spam windows, duplicate windows and
+rate limits behave as they would live. Queued actions run against fakes
+that return at once, and a timeout mutes the member: their later messages
+are counted as blocked instead of replayed, as Discord would refuse them.
+
+Each corpus line is one message:
+    
+    {"time": 12.5, "guild": 1, "channel": 11, "author": 1001,
+     "content": "hey all", "expected": ["invite"]}
+
+``time`` is in seconds from the start of the recording. ``expected`` is
+optional and lists the verdicts the message should get: any of
+``utils.message_scanner.VERDICTS``, "spam" or "duplicate". Without
+``--corpus`` a seeded, labelled synthetic corpus is generated, and
+``--write`` saves it for later runs.
+
+Reports messages per second through ``on_message``, time per message spent
+in each check, how many messages got each verdict and, for labelled
+messages, precision and recall per verdict. ``--config`` is a JSON object
+of ``AutoModConfig`` settings applied to every guild (without it, the
+synthetic corpus's word list is used); ``--compare`` replays the corpus
+again with a second one and lists the messages whose verdicts differ.
+A verdict whose precision falls below ``--min-precision`` (90% by default)
+is reported as a warning and the run exits with status 1, so a change that
+starts punishing innocent messages does not go unnoticed.
+Config files in the working directory are ignored, so results depend only
+on the corpus and these settings. String hashing is randomized per
+process, which can move a duplicate verdict or two between runs; set
+PYTHONHASHSEED to pin them.
+
+Run from the DiscordSentinel directory:
+    
+    python benchmarks/replay_automod.py --messages 50000
+    python benchmarks/replay_automod.py --corpus chat.jsonl --config a.json --compare b.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_duplicates import VOCABULARY, raid_copy
+from cogs.automod import AutoModerationCog
+from utils.guild_config import GuildConfigEngine
+from utils.message_scanner import VERDICTS
+from utils.permissions import ConfigCache
+
+ALL_VERDICTS = VERDICTS + ("spam", "duplicate")
+# Timed on their own; "other" is the rest of on_message (config lookup, prefilter, immunity)
+CHECKS = ("spam", "duplicates", "content")
+
+# Settings the synthetic corpus is labelled for
+SYNTHETIC_CONFIG = {"forbidden_words": ["scamcoin", "badword", "grabify"]}
+LINE_WORDS = (1, 2, 2, 3, 3, 3, 4, 4, 5, 5, 6, 7, 8, 10, 12, 16, 20)
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+# Shouted lines use longer words, so capitals clearly outweigh the spaces
+SHOUTED = [word for word in VOCABULARY if len(word) >= 3]
+
+class Replay:
+    """The replay clock, and the timeouts the fakes were given"""
+    
+    def __init__(self):
+        self.now = 0.0
+        # (guild ID, member ID) -> replay time their timeout ends
+        self.muted = {}
+    
+    def clock(self) -> float:
+        return self.now
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str):
+        self.id = channel_id
+        self.name = name
+        self.mention = f"#{name}"
+    
+    async def send(self, *args, **kwargs):
+        pass
+    
+    async def delete_messages(self, messages, reason=None):
+        pass
+
+class FakeMember:
+    bot = False
+    
+    def __init__(self, user_id: int, guild, replay: Replay):
+        self.id = user_id
+        self.guild = guild
+        self.replay = replay
+    
+    def __str__(self):
+        return f"member-{self.id}"
+    
+    async def send(self, *args, **kwargs):
+        pass
+    
+    async def timeout(self, until, reason=None):
+        # The cog passes a wall-clock deadline; keep its length on the replay clock
+        self.replay.muted[(self.guild.id, self.id)] = self.replay.now + (until - datetime.utcnow()).total_seconds()
+
+class FakeGuild:
+    def __init__(self, guild_id: int, replay: Replay):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.replay = replay
+        self.channels = [FakeChannel(0, "mod-log")]
+        self._channels = {0: self.channels[0]}
+        self._members = {}
+    
+    def channel(self, channel_id: int) -> FakeChannel:
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self._channels[channel_id] = FakeChannel(channel_id, f"channel-{channel_id}")
+            self.channels.append(channel)
+        return channel
+    
+    def member(self, user_id: int) -> FakeMember:
+        member = self._members.get(user_id)
+        if member is None:
+            member = self._members[user_id] = FakeMember(user_id, self, self.replay)
+        return member
+    
+    def get_channel_or_thread(self, channel_id: int):
+        return self._channels.get(channel_id)
+    
+    def get_member(self, user_id: int):
+        return self._members.get(user_id)
+
+class FakeDatabase:
+    async def add_warning(self, *args):
+        return 1
+    
+    async def log_action(self, *args):
+        pass
+
+def chat_line(rng: random.Random) -> str:
+    """A line of casual chat, mostly short and lowercase"""
+    text = " ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=rng.choice(LINE_WORDS)))
+    if rng.random() < 0.3:
+        text = text.capitalize()
+    if rng.random() < 0.2:
+        text += rng.choice(["?", "!", " lol", " :)"])
+    return text
+
+def labelled_line(rng: random.Random) -> tuple:
+    """(content, expected verdicts): chat with the usual share of violations"""
+    text = chat_line(rng)
+    roll = rng.random()
+    if roll < 0.010:
+        return f"{text} discord.gg/{rng.randint(10000, 99999)}", ["invite"]
+    if roll < 0.025:
+        return f"{text} https://youtube.com/watch?v=abc{rng.randint(0, 999)}", []
+    if roll < 0.035:
+        return f"{text} https://free-prizes{rng.randint(0, 99)}.example.com/claim", ["suspicious_link"]
+    if roll < 0.045:
+        return " ".join(rng.choices(SHOUTED, k=rng.randint(4, 10))).upper(), ["caps"]
+    if roll < 0.050:
+        return "".join(char + "\u0336\u0321" for char in "what is even happening"), ["zalgo"]
+    if roll < 0.060:
+        return f"{text} no" + "o" * rng.randint(4, 12), ["repeated_chars"]
+    if roll < 0.065:
+        word = rng.choice(SYNTHETIC_CONFIG["forbidden_words"])
+        if rng.random() < 0.5:
+            word = word.replace("e", "3").replace("o", "0").replace("a", "4")
+        return f"{text} {word}", ["forbidden_word"]
+    return text, []
+
+def synthetic_corpus(rng: random.Random, messages: int, guilds: int, authors: int, rate: float) -> list:
+    """Labelled chat from `guilds` guilds at `rate` messages a second, with spam bursts and raids mixed in"""
+    duration = messages / rate
+    corpus = []
+    for _ in range(messages):
+        guild = rng.randint(1, guilds)
+        content, expected = labelled_line(rng)
+        corpus.append({
+            "time": rng.uniform(0, duration), "guild": guild, "channel": guild * 10 + rng.randint(1, 3),
+            "author": guild * 10_000 + rng.randint(1, authors), "content": content, "expected": expected
+        })
+    
+    # A member posting eight lines in five seconds; they post nothing else, as the
+    # spam cleanup also deletes their earlier messages
+    for burst in range(messages // 2000):
+        guild = rng.randint(1, guilds)
+        channel = guild * 10 + rng.randint(1, 3)
+        author = 2_000_000 + burst
+        start = rng.uniform(0, duration)
+        corpus.extend(
+            {"time": start + i * 0.6, "guild": guild, "channel": channel, "author": author,
+             "content": chat_line(rng), "expected": ["spam"]}
+            for i in range(8)
+        )
+    
+    # Eight new accounts posting copies of one message within ten seconds
+    for raid in range(max(1, messages // 20_000)):
+        guild = rng.randint(1, guilds)
+        start = rng.uniform(0, duration)
+        corpus.extend(
+            {"time": start + rng.uniform(0, 10), "guild": guild, "channel": guild * 10 + rng.randint(1, 3),
+             "author": 1_000_000 + raid * 100 + i, "content": raid_copy(rng), "expected": ["duplicate"]}
+            for i in range(8)
+        )
+    
+    corpus.sort(key=lambda record: record["time"])
+    return corpus
+
+def load_corpus(path: str) -> list:
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            missing = {"time", "guild", "channel", "author", "content"} - record.keys()
+            if missing:
+                raise ValueError(f"{path}:{number}: missing {', '.join(sorted(missing))}")
+            unknown = set(record.get("expected", ())) - set(ALL_VERDICTS)
+            if unknown:
+                raise ValueError(f"{path}:{number}: unknown verdicts {', '.join(sorted(unknown))}")
+            corpus.append(record)
+    corpus.sort(key=lambda record: record["time"])
+    return corpus
+
+def write_corpus(path: str, corpus: list):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in corpus:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def load_settings(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path}: expected a JSON object of automod settings")
+    return settings
+
+async def replay(corpus: list, settings: dict) -> dict:
+    """Run the corpus through a fresh cog; returns verdicts by message ID, timings and counters"""
+    state = Replay()
+    engine = GuildConfigEngine(
+        global_config=ConfigCache(os.devnull, default={}), data_config=ConfigCache(os.devnull, default={})
+    )
+    bot = SimpleNamespace(db=FakeDatabase(), user=SimpleNamespace(id=1), guild_config=engine)
+    cog = AutoModerationCog(bot)
+    for component in (cog.spam_tracker, cog.duplicates, cog.rate_limiter, cog.actions):
+        component.clock = state.clock
+    
+    guilds = {}
+    for guild_id in dict.fromkeys(record["guild"] for record in corpus):
+        guilds[guild_id] = FakeGuild(guild_id, state)
+        await engine.update(guild_id, "automod", **settings)
+    
+    timings = Counter()
+    verdicts = {}
+    
+    def mark(message_ids, verdict: str):
+        for message_id in message_ids:
+            verdicts.setdefault(message_id, set()).add(verdict)
+    
+    def timed(owner, name: str, check: str):
+        method = getattr(owner, name)
+        
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                timings[check] += time.perf_counter() - start
+        setattr(owner, name, wrapper)
+    
+    # Verdicts are read where the cog decides them: a spammer's cleanup, a
+    # duplicate cluster (earlier copies included) and the content verdicts
+    take_recent = cog.spam_tracker.take_recent
+    check_cluster = cog.duplicates.check
+    check_content = cog.check_content
+    
+    def spam_cleanup(*args):
+        by_channel = take_recent(*args)
+        mark([message_id for message_ids in by_channel.values() for message_id in message_ids], "spam")
+        return by_channel
+    
+    def duplicate_cluster(*args):
+        cluster = check_cluster(*args)
+        mark([copy.message_id for copy in cluster], "duplicate")
+        return cluster
+    
+    def content_verdicts(message, *args):
+        found = check_content(message, *args)
+        for verdict in found:
+            mark([message.id], verdict)
+        return found
+    
+    cog.spam_tracker.take_recent = spam_cleanup
+    cog.duplicates.check = duplicate_cluster
+    cog.check_content = content_verdicts
+    timed(cog, "record_spam", "spam")
+    timed(cog, "check_spam", "spam")
+    timed(cog, "check_duplicates", "duplicates")
+    timed(cog, "check_content", "content")
+    
+    blocked = set()
+    cog.actions.start()
+    for index, record in enumerate(corpus):
+        state.now = record["time"]
+        guild = guilds[record["guild"]]
+        message_id = index + 1
+        if state.muted.get((guild.id, record["author"]), state.now) > state.now:
+            blocked.add(message_id)
+            continue
+        message = SimpleNamespace(
+            id=message_id, guild=guild, channel=guild.channel(record["channel"]),
+            author=guild.member(record["author"]), content=record["content"]
+        )
+        start = time.perf_counter()
+        await cog.on_message(message)
+        timings["on_message"] += time.perf_counter() - start
+        # Actions take effect before the next message, as with a fast API
+        await cog.actions.join()
+    cog.actions.stop()
+    
+    return {
+        "replayed": len(corpus) - len(blocked),
+        "blocked": blocked,
+        "verdicts": verdicts,
+        "timings": timings,
+        "actions": cog.actions.stats()
+    }
+
+def score(corpus: list, result: dict) -> dict:
+    """Per verdict, [true positives, false positives, false negatives] over the labelled messages replayed"""
+    scores = {verdict: [0, 0, 0] for verdict in ALL_VERDICTS}
+    for message_id, record in enumerate(corpus, 1):
+        if "expected" not in record or message_id in result["blocked"]:
+            continue
+        expected = set(record["expected"])
+        found = result["verdicts"].get(message_id, set())
+        for verdict in expected & found:
+            scores[verdict][0] += 1
+        for verdict in found - expected:
+            scores[verdict][1] += 1
+        for verdict in expected - found:
+            scores[verdict][2] += 1
+    return scores
+
+def ratio(part: int, whole: int) -> str:
+    return f"{part / whole:.1%}" if whole else "-"
+
+def report(name: str, corpus: list, result: dict, labelled: bool) -> dict:
+    """Print a run's throughput, time per check and verdicts; returns the scores of labelled runs"""
+    timings = result["timings"]
+    replayed = result["replayed"]
+    seconds = timings["on_message"]
+    if not replayed:
+        print(f"[{name}] no messages replayed\n")
+        return {}
+    print(f"[{name}] {replayed:,} messages replayed, {len(result['blocked']):,} blocked (author timed out): "
+          f"{replayed / seconds:,.0f} messages/s through on_message")
+    
+    print(f"{'check':>12} {'us/message':>11} {'share':>7}")
+    other = seconds - sum(timings[check] for check in CHECKS)
+    for check, spent in [(check, timings[check]) for check in CHECKS] + [("other", other)]:
+        print(f"{check:>12} {spent / replayed * 1_000_000:>11.2f} {ratio(spent, seconds):>7}")
+    
+    counts = Counter(verdict for found in result["verdicts"].values() for verdict in found)
+    scores = score(corpus, result) if labelled else {}
+    print(f"{'verdict':>16} {'messages':>9}" + (f" {'precision':>10} {'recall':>8}" if labelled else ""))
+    for verdict in ALL_VERDICTS:
+        line = f"{verdict:>16} {counts[verdict]:>9,}"
+        if labelled:
+            hits, false_positives, misses = scores[verdict]
+            line += f" {ratio(hits, hits + false_positives):>10} {ratio(hits, hits + misses):>8}"
+        print(line)
+    actions = result["actions"]
+    print(f"actions: {actions['completed']:,} run, {actions['coalesced']:,} coalesced, "
+          f"{actions['dropped'] + actions['shed']:,} dropped\n")
+    return scores
+
+def compare(corpus: list, first: dict, second: dict, names: tuple, show: int):
+    """List the messages the two configurations disagree on"""
+    differ = [
+        message_id for message_id in range(1, len(corpus) + 1)
+        if first["verdicts"].get(message_id, set()) != second["verdicts"].get(message_id, set())
+        or (message_id in first["blocked"]) != (message_id in second["blocked"])
+    ]
+    print(f"verdicts differ on {len(differ):,} of {len(corpus):,} messages")
+    
+    def describe(result: dict, message_id: int) -> str:
+        if message_id in result["blocked"]:
+            return "blocked"
+        return ", ".join(sorted(result["verdicts"].get(message_id, ()))) or "-"
+    
+    for message_id in differ[:show]:
+        content = corpus[message_id - 1]["content"]
+        print(f"  #{message_id} {content[:60]!r}")
+        print(f"    {names[0]}: {describe(first, message_id)} | {names[1]}: {describe(second, message_id)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="JSONL corpus to replay; a synthetic one is generated without it")
+    parser.add_argument("--write", help="save the synthetic corpus here")
+    parser.add_argument("--messages", type=int, default=20000, help="synthetic chat messages")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--authors", type=int, default=300, help="members talking in each guild")
+    parser.add_argument("--rate", type=float, default=50.0, help="synthetic messages per second, all guilds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--config", help="JSON object of automod settings for every guild")
+    parser.add_argument("--compare", help="second settings file to replay against --config")
+    parser.add_argument("--show", type=int, default=10, help="differing messages to list")
+    parser.add_argument("--min-precision", type=float, default=0.9,
+                        help="warn and exit with status 1 when a verdict's precision is lower")
+    args = parser.parse_args()
+    
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = synthetic_corpus(random.Random(args.seed), args.messages, args.guilds, args.authors, args.rate)
+        if args.write:
+            write_corpus(args.write, corpus)
+    labelled = any("expected" in record for record in corpus)
+    
+    runs = [(os.path.basename(args.config) if args.config else "default",
+             load_settings(args.config) if args.config else ({} if args.corpus else SYNTHETIC_CONFIG))]
+    if args.compare:
+        runs.append((os.path.basename(args.compare), load_settings(args.compare)))
+    
+    results = []
+    warnings = []
+    for name, settings in runs:
+        result = asyncio.run(replay(corpus, settings))
+        scores = report(name, corpus, result, labelled)
+        results.append(result)
+        for verdict, (hits, false_positives, _) in scores.items():
+            if hits + false_positives and hits / (hits + false_positives) < args.min_precision:
+                warnings.append(f"[{name}] {verdict} precision {ratio(hits, hits + false_positives)} is below "
+                                f"{args.min_precision:.0%} ({false_positives:,} false positives)")
+    if len(results) == 2:
+        compare(corpus, *results, tuple(name for name, _ in runs), args.show)
+    
+    for warning in warnings:
+        print(f"warning: {warning}", file=sys.stderr)
+    if warnings:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,42 +3,27 @@ from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta
 from collections import defaultdict
-from utils.database import Database
 from utils.permissions import has_permission
+from utils.guild_config import AntiNukeConfig
 
 class AntiNukeCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
-        # Anti-nuke settings
-        self.antinuke_enabled = True
+        # Anti-nuke state; thresholds and monitored actions are per guild (see utils.guild_config)
         self.panic_mode = False
-        self.panic_threshold = 3  # actions in 30 seconds
-        self.panic_window = 30  # seconds
         
         # Action tracking
         self.action_tracking = defaultdict(list)
         self.suspicious_users = set()
         
-        # Monitored actions
-        self.monitored_actions = {
-            'channel_delete': True,
-            'channel_create': True,
-            'role_delete': True,
-            'role_create': True,
-            'member_ban': True,
-            'member_kick': True,
-            'webhook_create': True,
-            'webhook_delete': True
-        }
-        
         # Immune users (extra owners)
         self.immune_users = set()
     
-    def is_suspicious_activity(self, user_id: int, action_type: str) -> bool:
+    def is_suspicious_activity(self, user_id: int, action_type: str, config: AntiNukeConfig) -> bool:
         """Check if user's actions are suspicious"""
-        if not self.antinuke_enabled:
+        if not config.enabled:
             return False
         
         if user_id in self.immune_users:
@@ -50,14 +35,14 @@ class AntiNukeCog(commands.Cog):
         # Clean old actions
         self.action_tracking[key] = [
             action_time for action_time in self.action_tracking[key]
-            if (now - action_time).seconds < self.panic_window
+            if (now - action_time).seconds < config.panic_window
         ]
         
         # Add current action
         self.action_tracking[key].append(now)
         
         # Check if threshold exceeded
-        return len(self.action_tracking[key]) >= self.panic_threshold
+        return len(self.action_tracking[key]) >= config.panic_threshold
     
     async def trigger_panic_mode(self, guild: discord.Guild, user: discord.Member, action_type: str):
         """Trigger panic mode and quarantine suspicious user"""
@@ -88,11 +73,12 @@ class AntiNukeCog(commands.Cog):
             await self.notify_panic_mode(guild, user, action_type)
             
             # Log the event
-            self.db.log_action(
+            await self.db.log_action(
                 "antinuke_panic", 
                 self.bot.user.id, 
                 user.id, 
-                f"Panic mode triggered by {action_type}"
+                f"Panic mode triggered by {action_type}",
+                guild.id
             )
             
             # Auto-disable panic mode after 5 minutes
@@ -154,49 +140,53 @@ class AntiNukeCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
         """Monitor channel deletions"""
-        if not self.monitored_actions['channel_delete']:
+        config = self.bot.guild_config.get(channel.guild.id).antinuke
+        if 'channel_delete' not in config.monitored_actions:
             return
         
         # Get who deleted the channel from audit log
         async for entry in channel.guild.audit_logs(action=discord.AuditLogAction.channel_delete, limit=1):
             if entry.target.id == channel.id:
-                if self.is_suspicious_activity(entry.user.id, 'channel_delete'):
+                if self.is_suspicious_activity(entry.user.id, 'channel_delete', config):
                     await self.trigger_panic_mode(channel.guild, entry.user, 'channel_delete')
                 break
     
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel):
         """Monitor channel creations"""
-        if not self.monitored_actions['channel_create']:
+        config = self.bot.guild_config.get(channel.guild.id).antinuke
+        if 'channel_create' not in config.monitored_actions:
             return
         
         async for entry in channel.guild.audit_logs(action=discord.AuditLogAction.channel_create, limit=1):
             if entry.target.id == channel.id:
-                if self.is_suspicious_activity(entry.user.id, 'channel_create'):
+                if self.is_suspicious_activity(entry.user.id, 'channel_create', config):
                     await self.trigger_panic_mode(channel.guild, entry.user, 'channel_create')
                 break
     
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role):
         """Monitor role deletions"""
-        if not self.monitored_actions['role_delete']:
+        config = self.bot.guild_config.get(role.guild.id).antinuke
+        if 'role_delete' not in config.monitored_actions:
             return
         
         async for entry in role.guild.audit_logs(action=discord.AuditLogAction.role_delete, limit=1):
             if entry.target.id == role.id:
-                if self.is_suspicious_activity(entry.user.id, 'role_delete'):
+                if self.is_suspicious_activity(entry.user.id, 'role_delete', config):
                     await self.trigger_panic_mode(role.guild, entry.user, 'role_delete')
                 break
     
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
         """Monitor member bans"""
-        if not self.monitored_actions['member_ban']:
+        config = self.bot.guild_config.get(guild.id).antinuke
+        if 'member_ban' not in config.monitored_actions:
             return
         
         async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, limit=1):
             if entry.target.id == user.id:
-                if self.is_suspicious_activity(entry.user.id, 'member_ban'):
+                if self.is_suspicious_activity(entry.user.id, 'member_ban', config):
                     await self.trigger_panic_mode(guild, entry.user, 'member_ban')
                 break
     
@@ -217,8 +207,11 @@ class AntiNukeCog(commands.Cog):
             await interaction.response.send_message("❌ You need admin permissions to configure anti-nuke.", ephemeral=True)
             return
         
+        guild_config = self.bot.guild_config
+        guild_id = interaction.guild.id
+        
         if action == "toggle" and enabled is not None:
-            self.antinuke_enabled = enabled
+            await guild_config.update(guild_id, "antinuke", enabled=enabled)
             status = "✅ Enabled" if enabled else "❌ Disabled"
             
             embed = discord.Embed(
@@ -230,16 +223,13 @@ class AntiNukeCog(commands.Cog):
             await interaction.response.send_message(embed=embed)
             
         elif action == "channels" and enabled is not None:
-            self.monitored_actions['channel_delete'] = enabled
-            self.monitored_actions['channel_create'] = enabled
+            await guild_config.update(guild_id, "antinuke", monitored_actions={'channel_delete': enabled, 'channel_create': enabled})
             
         elif action == "roles" and enabled is not None:
-            self.monitored_actions['role_delete'] = enabled
-            self.monitored_actions['role_create'] = enabled
+            await guild_config.update(guild_id, "antinuke", monitored_actions={'role_delete': enabled, 'role_create': enabled})
             
         elif action == "members" and enabled is not None:
-            self.monitored_actions['member_ban'] = enabled
-            self.monitored_actions['member_kick'] = enabled
+            await guild_config.update(guild_id, "antinuke", monitored_actions={'member_ban': enabled, 'member_kick': enabled})
             
         elif action == "status":
             embed = discord.Embed(
@@ -247,15 +237,17 @@ class AntiNukeCog(commands.Cog):
                 color=0x3498db
             )
             
-            status = "🟢 Active" if self.antinuke_enabled else "🔴 Disabled"
+            config = guild_config.get(guild_id).antinuke
+            status = "🟢 Active" if config.enabled else "🔴 Disabled"
             panic_status = "🚨 ACTIVE" if self.panic_mode else "✅ Normal"
             
             embed.add_field(name="Protection Status", value=status, inline=True)
             embed.add_field(name="Panic Mode", value=panic_status, inline=True)
-            embed.add_field(name="Threshold", value=f"{self.panic_threshold} actions/{self.panic_window}s", inline=True)
+            embed.add_field(name="Threshold", value=f"{config.panic_threshold} actions/{config.panic_window}s", inline=True)
             
             monitored = []
-            for action_name, is_enabled in self.monitored_actions.items():
+            for action_name in sorted(AntiNukeConfig.monitored_actions | config.monitored_actions):
+                is_enabled = action_name in config.monitored_actions
                 status_emoji = "✅" if is_enabled else "❌"
                 monitored.append(f"{status_emoji} {action_name.replace('_', ' ').title()}")
             
@@ -3,41 +3,31 @@ from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta
 from collections import defaultdict
-from utils.database import Database
 from utils.permissions import has_permission
+from utils.guild_config import AntiRaidConfig
 
 class AntiRaidCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
-        # Anti-raid settings
+        # Join tracking; thresholds and raid actions are per guild (see utils.guild_config)
         self.join_tracking = defaultdict(list)
-        self.raid_threshold = 5  # users
-        self.raid_window = 10  # seconds
-        self.raid_protection_enabled = True
         
         # Lockdown status
         self.locked_guilds = set()
-        
-        # Auto-actions during raids
-        self.raid_actions = {
-            'kick_new_members': True,
-            'lock_channels': True,
-            'notify_staff': True
-        }
     
-    def is_raid_detected(self, guild_id: int) -> bool:
+    def is_raid_detected(self, guild_id: int, config: AntiRaidConfig) -> bool:
         """Check if a raid is currently happening"""
         now = datetime.utcnow()
         joins = self.join_tracking[guild_id]
         
         # Remove old joins
-        joins[:] = [join_time for join_time in joins if (now - join_time).seconds < self.raid_window]
+        joins[:] = [join_time for join_time in joins if (now - join_time).seconds < config.window]
         
-        return len(joins) >= self.raid_threshold
+        return len(joins) >= config.threshold
     
-    async def handle_raid(self, guild: discord.Guild):
+    async def handle_raid(self, guild: discord.Guild, config: AntiRaidConfig):
         """Handle detected raid"""
         if guild.id in self.locked_guilds:
             return  # Already handling
@@ -46,15 +36,15 @@ class AntiRaidCog(commands.Cog):
         
         try:
             # Notify staff
-            if self.raid_actions['notify_staff']:
+            if config.notify_staff:
                 await self.notify_staff(guild, "🚨 **RAID DETECTED** - Anti-raid measures activated!")
             
             # Lock channels
-            if self.raid_actions['lock_channels']:
+            if config.lock_channels:
                 await self.emergency_lockdown(guild)
             
             # Log the event
-            self.db.log_action("raid_detected", None, None, f"Raid detected in {guild.name}")
+            await self.db.log_action("raid_detected", None, None, f"Raid detected in {guild.name}", guild.id)
             
         except Exception as e:
             print(f"Error handling raid: {e}")
@@ -133,7 +123,8 @@ class AntiRaidCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Monitor member joins for raid detection"""
-        if not self.raid_protection_enabled:
+        config = self.bot.guild_config.get(member.guild.id).antiraid
+        if not config.enabled:
             return
         
         guild_id = member.guild.id
@@ -143,18 +134,19 @@ class AntiRaidCog(commands.Cog):
         self.join_tracking[guild_id].append(now)
         
         # Check for raid
-        if self.is_raid_detected(guild_id):
-            await self.handle_raid(member.guild)
+        if self.is_raid_detected(guild_id, config):
+            await self.handle_raid(member.guild, config)
             
             # Kick new member if raid action is enabled
-            if self.raid_actions['kick_new_members']:
+            if config.kick_new_members:
                 try:
                     await member.kick(reason="Anti-raid protection - Suspicious join pattern")
-                    self.db.log_action(
+                    await self.db.log_action(
                         "raid_kick", 
                         self.bot.user.id, 
                         member.id, 
-                        "Kicked during raid protection"
+                        "Kicked during raid protection",
+                        member.guild.id
                     )
                 except:
                     pass
@@ -186,7 +178,7 @@ class AntiRaidCog(commands.Cog):
             await interaction.followup.send(embed=embed)
             
             # Log action
-            self.db.log_action("manual_lockdown", interaction.user.id, None, reason)
+            await self.db.log_action("manual_lockdown", interaction.user.id, None, reason, interaction.guild.id)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during lockdown: {str(e)}", ephemeral=True)
@@ -233,7 +225,7 @@ class AntiRaidCog(commands.Cog):
             await interaction.followup.send(embed=embed)
             
             # Log action
-            self.db.log_action("unlock", interaction.user.id, None, reason)
+            await self.db.log_action("unlock", interaction.user.id, None, reason, interaction.guild.id)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error during unlock: {str(e)}", ephemeral=True)
@@ -253,37 +245,48 @@ class AntiRaidCog(commands.Cog):
             await interaction.response.send_message("❌ You need admin permissions to configure anti-raid.", ephemeral=True)
             return
         
-        # Update settings if provided
+        # Update settings if provided; they only apply to this guild
+        changes = {}
         if enabled is not None:
-            self.raid_protection_enabled = enabled
+            changes['enabled'] = enabled
         
         if threshold is not None:
             if 1 <= threshold <= 20:
-                self.raid_threshold = threshold
+                changes['threshold'] = threshold
             else:
                 await interaction.response.send_message("❌ Threshold must be between 1 and 20.", ephemeral=True)
                 return
         
         if window is not None:
             if 5 <= window <= 60:
-                self.raid_window = window
+                changes['window'] = window
             else:
                 await interaction.response.send_message("❌ Window must be between 5 and 60 seconds.", ephemeral=True)
                 return
         
+        if changes:
+            config = (await self.bot.guild_config.update(interaction.guild.id, "antiraid", **changes)).antiraid
+        else:
+            config = self.bot.guild_config.get(interaction.guild.id).antiraid
+        
         # Show current configuration
         embed = discord.Embed(
             title="🛡️ Anti-Raid Configuration",
             color=0x3498db
         )
         
-        status = "🟢 Enabled" if self.raid_protection_enabled else "🔴 Disabled"
+        status = "🟢 Enabled" if config.enabled else "🔴 Disabled"
         embed.add_field(name="Status", value=status, inline=True)
-        embed.add_field(name="Threshold", value=f"{self.raid_threshold} joins", inline=True)
-        embed.add_field(name="Time Window", value=f"{self.raid_window} seconds", inline=True)
+        embed.add_field(name="Threshold", value=f"{config.threshold} joins", inline=True)
+        embed.add_field(name="Time Window", value=f"{config.window} seconds", inline=True)
         
+        raid_actions = {
+            'kick_new_members': config.kick_new_members,
+            'lock_channels': config.lock_channels,
+            'notify_staff': config.notify_staff
+        }
         actions_text = []
-        for action, enabled_status in self.raid_actions.items():
+        for action, enabled_status in raid_actions.items():
             status_emoji = "✅" if enabled_status else "❌"
             action_name = action.replace('_', ' ').title()
             actions_text.append(f"{status_emoji} {action_name}")
@@ -1,77 +1,71 @@
 import discord
 from discord.ext import commands
-import re
 import asyncio
+import operator
 from datetime import datetime, timedelta
-from collections import defaultdict
-from utils.database import Database
+from typing import List
+from utils.action_queue import DELETE, ENFORCE, NOTIFY, ActionQueue
+from utils.guild_config import AutoModConfig
+from utils.domain_filter import normalize_domain
+from utils.duplicate_detector import DuplicateDetector
+from utils.message_scanner import CONTENT_STAGES, DUPLICATES, VERDICTS, scanner_for
+from utils.rate_limiter import RateLimiter
+from utils.spam_tracker import SpamTracker
+from utils.word_filter import normalize, warm_matcher
+
+# Seconds of a spammer's recent messages that are deleted
+SPAM_CLEANUP_WINDOW = 30
+
+# Notification titles for the content verdicts, most serious first
+VERDICT_TITLES = {
+    "invite": "Invite Link Detected",
+    "forbidden_word": "Forbidden Word",
+    "suspicious_link": "Suspicious Link",
+    "caps": "Excessive Caps",
+    "zalgo": "Zalgo Text",
+    "repeated_chars": "Repeated Characters",
+}
+
+# Rate limiter action codes
+ACTION_CODES = {action: code for code, action in enumerate(("spam",) + VERDICTS)}
+
+def merge_message_ids(pending: dict, new: dict) -> dict:
+    """Fold message IDs waiting for deletion into a queued bulk delete"""
+    for channel_id, message_ids in new.items():
+        pending[channel_id] = list(dict.fromkeys(pending.get(channel_id, []) + message_ids))
+    return pending
+
+def merge_deletes(pending: tuple, new: tuple) -> tuple:
+    """Fold messages waiting for deletion, and the reasons for deleting them, into a queued bulk delete"""
+    by_channel, reasons = pending
+    return merge_message_ids(by_channel, new[0]), list(dict.fromkeys(reasons + new[1]))
 
 class AutoModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
-        # Spam detection
-        self.user_messages = defaultdict(list)
-        self.spam_threshold = 5  # messages
-        self.spam_window = 10  # seconds
+        # Spam detection; thresholds, word lists and the domain whitelist are
+        # per guild (see utils.guild_config)
+        self.spam_tracker = SpamTracker()
+        # Copies of the same message from different members (raids)
+        self.duplicates = DuplicateDetector()
         
-        # Rate limiting for auto-actions
-        self.recent_actions = defaultdict(list)
+        # Deletes, timeouts, warnings and notices run here, off the message path
+        self.actions = ActionQueue()
         
-        # Enhanced patterns for detection
-        self.invite_pattern = re.compile(r'discord\.gg/[a-zA-Z0-9]+|discordapp\.com/invite/[a-zA-Z0-9]+|discord\.com/invite/[a-zA-Z0-9]+')
-        self.link_pattern = re.compile(r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?')
-        self.excessive_caps_threshold = 0.7  # 70% caps
-        self.min_caps_length = 10  # minimum message length to check caps
-        
-        # Advanced automod features
-        self.forbidden_words = [
-            # Add your forbidden words here
-        ]
-        self.zalgo_pattern = re.compile(r'[\u0300-\u036F\u1AB0-\u1AFF\u1DC0-\u1DFF\u20D0-\u20FF\uFE20-\uFE2F]')
-        self.repeated_chars_pattern = re.compile(r'(.)\1{4,}')  # 5+ repeated characters
-        
-        # Whitelist for trusted domains
-        self.whitelisted_domains = [
-            'youtube.com', 'youtu.be', 'twitter.com', 'github.com',
-            'stackoverflow.com', 'reddit.com', 'tenor.com', 'giphy.com'
-        ]
+        # Rate limiting for auto-actions: one per member and action type a minute
+        self.rate_limiter = RateLimiter(interval=60.0)
     
-    def is_spam(self, user_id: int) -> bool:
-        """Check if a user is spamming"""
-        now = datetime.utcnow()
-        user_msgs = self.user_messages[user_id]
-        
-        # Remove old messages
-        user_msgs[:] = [msg_time for msg_time in user_msgs if (now - msg_time).seconds < self.spam_window]
-        
-        return len(user_msgs) >= self.spam_threshold
+    async def cog_load(self):
+        self.spam_tracker.start()
+        self.rate_limiter.start()
+        self.actions.start()
     
-    def has_excessive_caps(self, message: str) -> bool:
-        """Check if message has excessive capital letters"""
-        if len(message) < self.min_caps_length:
-            return False
-        
-        caps_count = sum(1 for char in message if char.isupper())
-        return caps_count / len(message) >= self.excessive_caps_threshold
-    
-    def can_take_action(self, user_id: int, action_type: str) -> bool:
-        """Rate limit auto-moderation actions"""
-        now = datetime.utcnow()
-        key = f"{user_id}_{action_type}"
-        
-        # Clean old actions
-        self.recent_actions[key] = [
-            action_time for action_time in self.recent_actions[key]
-            if (now - action_time).seconds < 60  # 1 minute cooldown
-        ]
-        
-        if len(self.recent_actions[key]) >= 1:  # Max 1 action per minute
-            return False
-        
-        self.recent_actions[key].append(now)
-        return True
+    async def cog_unload(self):
+        self.spam_tracker.stop()
+        self.rate_limiter.stop()
+        self.actions.stop()
     
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -80,326 +74,260 @@ class AutoModerationCog(commands.Cog):
         if message.author.bot or not message.guild:
             return
         
+        config = self.bot.guild_config.get(message.guild.id).automod
+        
+        # Every message counts towards spam, but most are not spam and fire no
+        # prefilter stage, so they stop here without the immunity lookup
+        is_spam = self.record_spam(message, config)
+        stages, repeat = scanner_for(config).prefilter(message.content)
+        if not is_spam and not stages:
+            return
+        
         # Ignore immune users
         from utils.permissions import is_immune
         if is_immune(message.author):
             return
         
-        # Track message for spam detection
-        self.user_messages[message.author.id].append(datetime.utcnow())
-        
-        # Check for various violations
-        await self.check_spam(message)
-        await self.check_invite_links(message)
-        await self.check_excessive_caps(message)
-        await self.check_forbidden_words(message)
-        await self.check_suspicious_links(message)
-        await self.check_zalgo_text(message)
-        await self.check_repeated_characters(message)
+        # Check for various violations; what to do about them is queued, so a
+        # slow Discord API never holds up the next message
+        if is_spam and self.check_spam(message):
+            return
+        if stages & DUPLICATES and self.check_duplicates(message, config):
+            return
+        if stages & CONTENT_STAGES:
+            self.check_content(message, config, stages, repeat)
     
-    async def check_spam(self, message):
-        """Check and handle spam"""
-        if self.is_spam(message.author.id):
-            if not self.can_take_action(message.author.id, "spam"):
-                return
-            
-            try:
-                # Delete recent messages from user
-                async for msg in message.channel.history(limit=50):
-                    if msg.author.id == message.author.id and (datetime.utcnow() - msg.created_at).seconds < 30:
-                        try:
-                            await msg.delete()
-                        except:
-                            pass
-                
-                # Mute user for 10 minutes
-                timeout_until = datetime.utcnow() + timedelta(minutes=10)
-                await message.author.timeout(timeout_until, reason="Auto-moderation: Spam detected")
-                
-                # Log the action
-                self.db.log_action("automod_spam", self.bot.user.id, message.author.id, "Spam detection - 10 minute timeout")
-                
-                # Send notification
-                embed = discord.Embed(
-                    title="🤖 Auto-Moderation: Spam Detected",
-                    description=f"**{message.author}** has been muted for 10 minutes due to spam.",
-                    color=0xe74c3c
-                )
-                embed.add_field(name="Action Taken", value="10-minute timeout + message deletion", inline=False)
-                
-                # Try to send to a log channel or the same channel
-                try:
-                    log_channel = discord.utils.get(message.guild.channels, name="mod-log")
-                    if log_channel:
-                        await log_channel.send(embed=embed)
-                    else:
-                        await message.channel.send(embed=embed, delete_after=10)
-                except:
-                    pass
-                
-            except discord.Forbidden:
-                pass  # Bot doesn't have permissions
-            except Exception as e:
-                print(f"Error in spam detection: {e}")
+    async def send_notification(self, message, embed: discord.Embed):
+        """Send an auto-moderation notice to the mod-log channel, or briefly to the same channel"""
+        try:
+            log_channel = discord.utils.get(message.guild.channels, name="mod-log")
+            if log_channel:
+                await log_channel.send(embed=embed)
+            else:
+                await message.channel.send(embed=embed, delete_after=10)
+        except:
+            pass
     
-    async def check_invite_links(self, message):
-        """Check and handle Discord invite links"""
-        if self.invite_pattern.search(message.content):
-            if not self.can_take_action(message.author.id, "invite"):
-                return
-            
-            try:
-                # Delete the message
-                await message.delete()
-                
-                # Warn the user
-                warning_id = self.db.add_warning(
-                    message.author.id,
-                    self.bot.user.id,
-                    "Auto-moderation: Posting Discord invite links"
-                )
-                
-                # Log the action
-                self.db.log_action(
-                    "automod_invite",
-                    self.bot.user.id,
-                    message.author.id,
-                    f"Invite link detected and deleted - Warning #{warning_id}"
-                )
-                
-                # Send notification
-                embed = discord.Embed(
-                    title="🤖 Auto-Moderation: Invite Link Detected",
-                    description=f"**{message.author}** posted a Discord invite link.",
-                    color=0xf39c12
-                )
-                embed.add_field(name="Action Taken", value="Message deleted + Warning issued", inline=False)
-                
-                # Try to notify user
-                try:
-                    await message.author.send(
-                        f"⚠️ Your message in **{message.guild.name}** was deleted for containing a Discord invite link. "
-                        f"Please ask a moderator before sharing invites."
-                    )
-                except:
-                    pass  # User has DMs disabled
-                
-                # Send to log channel or same channel
-                try:
-                    log_channel = discord.utils.get(message.guild.channels, name="mod-log")
-                    if log_channel:
-                        await log_channel.send(embed=embed)
-                    else:
-                        await message.channel.send(embed=embed, delete_after=10)
-                except:
-                    pass
-                
-            except discord.Forbidden:
-                pass  # Bot doesn't have permissions
-            except Exception as e:
-                print(f"Error in invite link detection: {e}")
+    def record_spam(self, message, config: AutoModConfig) -> bool:
+        """Count the message towards its author's spam window; returns True if it puts them over the threshold"""
+        if not config.spam_detection:
+            return False
+        
+        return self.spam_tracker.record(
+            message.guild.id, message.author.id, config.spam_threshold, config.spam_window,
+            message.channel.id, message.id
+        )
     
-    async def check_excessive_caps(self, message):
-        """Check and handle excessive capital letters"""
-        if self.has_excessive_caps(message.content):
-            if not self.can_take_action(message.author.id, "caps"):
-                return
-            
-            try:
-                # Delete the message
-                await message.delete()
-                
-                # Send warning
-                embed = discord.Embed(
-                    title="🤖 Auto-Moderation: Excessive Caps",
-                    description=f"**{message.author}**, please don't use excessive capital letters.",
-                    color=0xf39c12
-                )
-                
-                warning_msg = await message.channel.send(embed=embed, delete_after=10)
-                
-                # Log the action
-                self.db.log_action(
-                    "automod_caps",
-                    self.bot.user.id,
-                    message.author.id,
-                    "Excessive caps - message deleted"
-                )
-                
-            except discord.Forbidden:
-                pass  # Bot doesn't have permissions
-            except Exception as e:
-                print(f"Error in caps detection: {e}")
+    def check_spam(self, message) -> bool:
+        """Queue the handling of a message that went over the spam threshold; returns True if it was handled"""
+        if not self.rate_limiter.allow(message.guild.id, message.author.id, ACTION_CODES["spam"]):
+            return False
+        
+        guild, member = message.guild, message.author
+        
+        # Delete recent messages from user, in every channel
+        by_channel = self.spam_tracker.take_recent(guild.id, member.id, SPAM_CLEANUP_WINDOW)
+        deleted = sum(len(message_ids) for message_ids in by_channel.values())
+        self.queue_delete(guild, by_channel, "Spam detected")
+        
+        # Mute user for 10 minutes
+        self.queue_timeout(guild, member.id, "Spam detected", "automod_spam", "Spam detection - 10 minute timeout", member)
+        
+        # Send notification
+        embed = discord.Embed(
+            title="🤖 Auto-Moderation: Spam Detected",
+            description=f"**{member}** has been muted for 10 minutes due to spam.",
+            color=0xe74c3c
+        )
+        embed.add_field(
+            name="Action Taken",
+            value=f"10-minute timeout + {deleted} messages deleted in {len(by_channel)} channel(s)",
+            inline=False
+        )
+        self.actions.submit(guild.id, NOTIFY, lambda _: self.send_notification(message, embed))
+        return True
     
-    async def check_forbidden_words(self, message):
-        """Check and handle forbidden words"""
-        if not self.forbidden_words:
-            return
+    def check_duplicates(self, message, config: AutoModConfig) -> bool:
+        """Check for near-identical messages from several members and queue their handling; returns True if the message was handled"""
+        if not config.duplicate_detection:
+            return False
         
-        content_lower = message.content.lower()
+        cluster = self.duplicates.check(
+            message.guild.id, message.author.id, message.channel.id, message.id, message.content,
+            config.duplicate_window, config.duplicate_authors, config.duplicate_similarity, config.duplicate_min_length
+        )
+        if not cluster:
+            return False
         
-        for word in self.forbidden_words:
-            if word.lower() in content_lower:
-                if not self.can_take_action(message.author.id, "forbidden_word"):
-                    return
-                
-                try:
-                    await message.delete()
-                    
-                    warning_id = self.db.add_warning(
-                        message.author.id,
-                        self.bot.user.id,
-                        f"Auto-moderation: Used forbidden word '{word}'"
-                    )
-                    
-                    embed = discord.Embed(
-                        title="🤖 Auto-Moderation: Forbidden Word",
-                        description=f"**{message.author}** used a forbidden word.",
-                        color=0xe74c3c
-                    )
-                    embed.add_field(name="Action Taken", value="Message deleted + Warning issued", inline=False)
-                    
-                    try:
-                        log_channel = discord.utils.get(message.guild.channels, name="mod-log")
-                        if log_channel:
-                            await log_channel.send(embed=embed)
-                        else:
-                            await message.channel.send(embed=embed, delete_after=10)
-                    except:
-                        pass
-                    
-                    self.db.log_action(
-                        "automod_forbidden_word",
-                        self.bot.user.id,
-                        message.author.id,
-                        f"Forbidden word detected: {word}"
-                    )
-                    
-                except:
-                    pass
-                break
+        guild = message.guild
+        
+        # Delete every copy, in every channel
+        by_channel = {}
+        for copy in cluster:
+            by_channel.setdefault(copy.channel_id, []).append(copy.message_id)
+        self.queue_delete(guild, by_channel, "Duplicate messages")
+        
+        # Mute every author for 10 minutes
+        author_ids = list(dict.fromkeys(copy.author_id for copy in cluster))
+        for author_id in author_ids:
+            self.queue_timeout(guild, author_id, "Duplicate messages", "automod_duplicate",
+                               "Duplicate message cluster - 10 minute timeout")
+        
+        # Send notification
+        embed = discord.Embed(
+            title="🤖 Auto-Moderation: Duplicate Messages",
+            description=f"**{len(author_ids)}** members posted the same message and have been muted for 10 minutes.",
+            color=0xe74c3c
+        )
+        embed.add_field(
+            name="Action Taken",
+            value=f"10-minute timeouts + {len(cluster)} messages deleted in {len(by_channel)} channel(s)",
+            inline=False
+        )
+        self.actions.submit(guild.id, NOTIFY, lambda _: self.send_notification(message, embed))
+        return True
     
-    async def check_suspicious_links(self, message):
-        """Check for suspicious links"""
-        links = self.link_pattern.findall(message.content)
-        
-        for link in links:
-            # Skip Discord invites (handled separately)
-            if 'discord' in link:
-                continue
-            
-            # Check if domain is whitelisted
-            is_whitelisted = False
-            for domain in self.whitelisted_domains:
-                if domain in link:
-                    is_whitelisted = True
-                    break
-            
-            if not is_whitelisted:
-                if not self.can_take_action(message.author.id, "suspicious_link"):
-                    return
-                
+    def queue_delete(self, guild, by_channel: dict, reason: str):
+        """Queue message deletions; those still waiting in a guild go out together as one bulk delete, with every reason"""
+        if by_channel:
+            self.actions.submit(
+                guild.id, DELETE,
+                lambda pending: self.bulk_delete(guild, pending[0], f"Auto-moderation: {'; '.join(pending[1])}"),
+                (by_channel, [reason]), key="delete", merge=merge_deletes
+            )
+    
+    def queue_timeout(self, guild, member_id: int, reason: str, action: str, details: str, member=None):
+        """Queue a 10-minute timeout; one still waiting for the member takes on this reason, and each is logged"""
+        async def punish(entries: list):
+            target = member or guild.get_member(member_id)
+            if target is not None:
+                reasons = dict.fromkeys(entry_reason for entry_reason, _, _ in entries)
+                await self.timeout_member(target, f"Auto-moderation: {'; '.join(reasons)}")
+            for _, entry_action, entry_details in entries:
+                await self.db.log_action(entry_action, self.bot.user.id, member_id, entry_details, guild.id)
+        
+        self.actions.submit(guild.id, ENFORCE, punish, [(reason, action, details)],
+                            key=("timeout", member_id), merge=operator.add)
+    
+    async def timeout_member(self, member, reason: str):
+        """Time a member out for 10 minutes"""
+        try:
+            await member.timeout(datetime.utcnow() + timedelta(minutes=10), reason=reason)
+        except discord.Forbidden:
+            pass  # Bot doesn't have permissions
+    
+    async def bulk_delete(self, guild, by_channel: dict, reason: str) -> int:
+        """Delete messages by ID, 100 per request, in all channels at once; returns how many were deleted"""
+        async def purge(channel_id: int, message_ids: list) -> int:
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel is None or not hasattr(channel, "delete_messages"):
+                return 0
+            deleted = 0
+            for start in range(0, len(message_ids), 100):
+                chunk = [discord.Object(id=message_id) for message_id in message_ids[start:start + 100]]
                 try:
-                    await message.delete()
-                    
-                    embed = discord.Embed(
-                        title="🤖 Auto-Moderation: Suspicious Link",
-                        description=f"**{message.author}** posted a non-whitelisted link.",
-                        color=0xf39c12
-                    )
-                    embed.add_field(name="Action Taken", value="Message deleted", inline=False)
-                    
-                    try:
-                        await message.author.send(
-                            f"⚠️ Your message in **{message.guild.name}** was deleted for containing a suspicious link. "
-                            f"If this was a legitimate link, please contact a moderator."
-                        )
-                    except:
-                        pass
-                    
-                    try:
-                        log_channel = discord.utils.get(message.guild.channels, name="mod-log")
-                        if log_channel:
-                            await log_channel.send(embed=embed)
-                        else:
-                            await message.channel.send(embed=embed, delete_after=10)
-                    except:
-                        pass
-                    
-                    self.db.log_action(
-                        "automod_suspicious_link",
-                        self.bot.user.id,
-                        message.author.id,
-                        f"Suspicious link: {link[:50]}..."
-                    )
-                    
-                except:
-                    pass
-                break
+                    await channel.delete_messages(chunk, reason=reason)
+                    deleted += len(chunk)
+                except discord.HTTPException:
+                    pass  # Already deleted, or no permission in this channel
+            return deleted
+        
+        results = await asyncio.gather(*(purge(channel_id, ids) for channel_id, ids in by_channel.items()))
+        return sum(results)
     
-    async def check_zalgo_text(self, message):
-        """Check for zalgo/corrupted text"""
-        zalgo_matches = self.zalgo_pattern.findall(message.content)
+    def check_content(self, message, config: AutoModConfig, stages: int = CONTENT_STAGES, repeat=None) -> List[str]:
+        """Scan the message once and queue one combined action for every content violation; returns the verdicts acted on"""
+        result = scanner_for(config).scan(message.content, stages, repeat)
+        if not result.verdicts:
+            return []
         
-        if len(zalgo_matches) > 5:  # More than 5 zalgo characters
-            if not self.can_take_action(message.author.id, "zalgo"):
-                return
-            
-            try:
-                await message.delete()
-                
-                embed = discord.Embed(
-                    title="🤖 Auto-Moderation: Zalgo Text",
-                    description=f"**{message.author}** posted corrupted/zalgo text.",
-                    color=0xf39c12
-                )
-                embed.add_field(name="Action Taken", value="Message deleted", inline=False)
-                
-                warning_msg = await message.channel.send(
-                    f"⚠️ {message.author.mention}, please avoid using corrupted text.",
-                    delete_after=10
-                )
-                
-                self.db.log_action(
-                    "automod_zalgo",
+        enabled = {"invite": config.invite_links, "caps": config.excessive_caps}
+        verdicts = [
+            verdict for verdict in VERDICTS
+            if verdict in result.verdicts and enabled.get(verdict, True)
+            and self.rate_limiter.allow(message.guild.id, message.author.id, ACTION_CODES[verdict])
+        ]
+        if not verdicts:
+            return []
+        
+        guild, member = message.guild, message.author
+        
+        # Delete the message
+        self.queue_delete(guild, {message.channel.id: [message.id]}, "Content filter")
+        
+        # One warning covers every violation that warrants one
+        reasons = []
+        if "invite" in verdicts:
+            reasons.append("Posting Discord invite links")
+        if "forbidden_word" in verdicts:
+            reasons.append(f"Used forbidden word '{result.words[0]}'")
+        
+        async def punish(_):
+            warning_id = None
+            if reasons:
+                warning_id = await self.db.add_warning(
+                    member.id,
                     self.bot.user.id,
-                    message.author.id,
-                    "Zalgo text detected"
+                    f"Auto-moderation: {'; '.join(reasons)}",
+                    guild.id
                 )
-                
-            except:
-                pass
-    
-    async def check_repeated_characters(self, message):
-        """Check for excessive repeated characters"""
-        if self.repeated_chars_pattern.search(message.content):
-            if not self.can_take_action(message.author.id, "repeated_chars"):
-                return
             
-            try:
-                await message.delete()
-                
-                embed = discord.Embed(
-                    title="🤖 Auto-Moderation: Repeated Characters",
-                    description=f"**{message.author}** used excessive repeated characters.",
-                    color=0xf39c12
+            # Log each violation under its own action type
+            details = {
+                "invite": f"Invite link detected and deleted - Warning #{warning_id}",
+                "forbidden_word": f"Forbidden word detected: {result.words[0] if result.words else ''}",
+                "suspicious_link": f"Suspicious link: {result.suspicious_links[0][:50] if result.suspicious_links else ''}...",
+                "caps": "Excessive caps - message deleted",
+                "zalgo": "Zalgo text detected",
+                "repeated_chars": "Excessive repeated characters",
+            }
+            for verdict in verdicts:
+                await self.db.log_action(
+                    f"automod_{verdict}",
+                    self.bot.user.id,
+                    member.id,
+                    details[verdict],
+                    guild.id
                 )
-                embed.add_field(name="Action Taken", value="Message deleted", inline=False)
-                
-                warning_msg = await message.channel.send(
-                    f"⚠️ {message.author.mention}, please avoid spamming repeated characters.",
-                    delete_after=10
+        
+        self.actions.submit(guild.id, ENFORCE, punish)
+        
+        # Try to notify user, once while earlier notices are still waiting
+        if "invite" in verdicts or "suspicious_link" in verdicts:
+            if "invite" in verdicts:
+                notice = (
+                    f"⚠️ Your message in **{guild.name}** was deleted for containing a Discord invite link. "
+                    f"Please ask a moderator before sharing invites."
                 )
-                
-                self.db.log_action(
-                    "automod_repeated_chars",
-                    self.bot.user.id,
-                    message.author.id,
-                    "Excessive repeated characters"
+            else:
+                notice = (
+                    f"⚠️ Your message in **{guild.name}** was deleted for containing a suspicious link. "
+                    f"If this was a legitimate link, please contact a moderator."
                 )
-                
-            except:
-                pass
+            
+            async def send_dm(_):
+                try:
+                    await member.send(notice)
+                except:
+                    pass  # User has DMs disabled
+            
+            self.actions.submit(guild.id, NOTIFY, send_dm, key=("dm", member.id))
+        
+        # Send notification; a member's messages removed meanwhile share one
+        async def notify(removed: list):
+            titles = list(dict.fromkeys(VERDICT_TITLES[verdict] for batch in removed for verdict in batch))
+            subject = f"**{member}**'s message was" if len(removed) == 1 else f"**{len(removed)}** of **{member}**'s messages were"
+            embed = discord.Embed(
+                title=f"🤖 Auto-Moderation: {titles[0] if len(titles) == 1 else 'Multiple Violations'}",
+                description=f"{subject} removed: {', '.join(titles).lower()}.",
+                color=0xe74c3c if any("forbidden_word" in batch for batch in removed) else 0xf39c12
+            )
+            action = "Message deleted + Warning issued" if reasons else "Message deleted"
+            embed.add_field(name="Action Taken", value=action, inline=False)
+            await self.send_notification(message, embed)
+        
+        self.actions.submit(guild.id, NOTIFY, notify, [verdicts], key=("notice", member.id), merge=operator.add)
+        return verdicts
     
     @discord.app_commands.command(name="automod", description="Configure auto-moderation settings")
     @discord.app_commands.describe(
@@ -409,7 +337,8 @@ class AutoModerationCog(commands.Cog):
     @discord.app_commands.choices(feature=[
         discord.app_commands.Choice(name="Spam Detection", value="spam"),
         discord.app_commands.Choice(name="Invite Links", value="invites"),
-        discord.app_commands.Choice(name="Excessive Caps", value="caps")
+        discord.app_commands.Choice(name="Excessive Caps", value="caps"),
+        discord.app_commands.Choice(name="Duplicate Messages", value="duplicates")
     ])
     async def automod_config(self, interaction: discord.Interaction, feature: str, enabled: bool):
         """Configure auto-moderation features"""
@@ -419,13 +348,19 @@ class AutoModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You need admin permissions to configure auto-moderation.", ephemeral=True)
             return
         
-        # This would typically save to a database or config file
-        # For now, we'll just acknowledge the command
+        feature_settings = {
+            "spam": "spam_detection",
+            "invites": "invite_links",
+            "caps": "excessive_caps",
+            "duplicates": "duplicate_detection"
+        }
+        await self.bot.guild_config.update(interaction.guild.id, "automod", **{feature_settings[feature]: enabled})
         
         feature_names = {
             "spam": "Spam Detection",
             "invites": "Invite Link Detection",
-            "caps": "Excessive Caps Detection"
+            "caps": "Excessive Caps Detection",
+            "duplicates": "Duplicate Message Detection"
         }
         
         status = "✅ Enabled" if enabled else "❌ Disabled"
@@ -438,6 +373,115 @@ class AutoModerationCog(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
     
+    @discord.app_commands.command(name="automod_words", description="Manage this server's forbidden words")
+    @discord.app_commands.describe(
+        action="Add, remove or list forbidden words",
+        word="The word or phrase to add or remove; in \"quotes\" it only matches as a whole word"
+    )
+    @discord.app_commands.choices(action=[
+        discord.app_commands.Choice(name="Add", value="add"),
+        discord.app_commands.Choice(name="Remove", value="remove"),
+        discord.app_commands.Choice(name="List", value="list")
+    ])
+    async def automod_words(self, interaction: discord.Interaction, action: str, word: str = None):
+        """Edit the guild's forbidden word list"""
+        from utils.permissions import has_permission
+        
+        if not has_permission(interaction.user, 'admin'):
+            await interaction.response.send_message("❌ You need admin permissions to configure auto-moderation.", ephemeral=True)
+            return
+        
+        words = list(self.bot.guild_config.get(interaction.guild.id).automod.forbidden_words)
+        
+        if action == "list":
+            listed = ", ".join(f"`{listed_word}`" for listed_word in words[:50]) or "No forbidden words set."
+            if len(words) > 50:
+                listed += f"\n...and {len(words) - 50} more"
+            embed = discord.Embed(title="🤖 Forbidden Words", description=listed, color=0x3498db)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        if not word or not normalize(word):
+            await interaction.response.send_message("❌ Please give a word or phrase with at least one letter or digit.", ephemeral=True)
+            return
+        
+        if action == "add":
+            if word in words:
+                await interaction.response.send_message(f"❌ `{word}` is already a forbidden word.", ephemeral=True)
+                return
+            words.append(word)
+        else:
+            if word not in words:
+                await interaction.response.send_message(f"❌ `{word}` is not a forbidden word.", ephemeral=True)
+                return
+            words.remove(word)
+        
+        # Compile the new list off the event loop before messages start using it
+        await interaction.response.defer(ephemeral=True)
+        await warm_matcher(tuple(words))
+        await self.bot.guild_config.update(interaction.guild.id, "automod", forbidden_words=words)
+        
+        verb = "added to" if action == "add" else "removed from"
+        await interaction.followup.send(f"✅ `{word}` {verb} the forbidden words ({len(words)} total).", ephemeral=True)
+    
+    @discord.app_commands.command(name="automod_domains", description="Manage this server's allowed and blocked link domains")
+    @discord.app_commands.describe(
+        domain_list="The list to change or view",
+        action="Add, remove or list domains",
+        domain="The domain to add or remove; it covers all of its subdomains"
+    )
+    @discord.app_commands.choices(
+        domain_list=[
+            discord.app_commands.Choice(name="Allowed", value="whitelisted_domains"),
+            discord.app_commands.Choice(name="Blocked", value="blocked_domains")
+        ],
+        action=[
+            discord.app_commands.Choice(name="Add", value="add"),
+            discord.app_commands.Choice(name="Remove", value="remove"),
+            discord.app_commands.Choice(name="List", value="list")
+        ]
+    )
+    async def automod_domains(self, interaction: discord.Interaction, domain_list: str, action: str, domain: str = None):
+        """Edit the guild's link whitelist or blocklist"""
+        from utils.permissions import has_permission
+        
+        if not has_permission(interaction.user, 'admin'):
+            await interaction.response.send_message("❌ You need admin permissions to configure auto-moderation.", ephemeral=True)
+            return
+        
+        config = self.bot.guild_config.get(interaction.guild.id).automod
+        domains = list(getattr(config, domain_list))
+        list_name = "allowed" if domain_list == "whitelisted_domains" else "blocked"
+        
+        if action == "list":
+            listed = ", ".join(f"`{listed_domain}`" for listed_domain in domains[:50]) or f"No {list_name} domains set."
+            if len(domains) > 50:
+                listed += f"\n...and {len(domains) - 50} more"
+            embed = discord.Embed(title=f"🤖 {list_name.title()} Domains", description=listed, color=0x3498db)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        domain = normalize_domain(domain or "")
+        if "." not in domain:
+            await interaction.response.send_message("❌ Please give a domain such as `example.com`.", ephemeral=True)
+            return
+        
+        if action == "add":
+            if domain in domains:
+                await interaction.response.send_message(f"❌ `{domain}` is already {list_name}.", ephemeral=True)
+                return
+            domains.append(domain)
+        else:
+            if domain not in domains:
+                await interaction.response.send_message(f"❌ `{domain}` is not {list_name}.", ephemeral=True)
+                return
+            domains.remove(domain)
+        
+        await self.bot.guild_config.update(interaction.guild.id, "automod", **{domain_list: domains})
+        
+        verb = "added to" if action == "add" else "removed from"
+        await interaction.response.send_message(f"✅ `{domain}` {verb} the {list_name} domains.", ephemeral=True)
+    
     @discord.app_commands.command(name="automod_status", description="View auto-moderation status")
     async def automod_status(self, interaction: discord.Interaction):
         """Show current auto-moderation settings"""
@@ -447,6 +491,11 @@ class AutoModerationCog(commands.Cog):
             await interaction.response.send_message("❌ You don't have permission to view this information.", ephemeral=True)
             return
         
+        config = self.bot.guild_config.get(interaction.guild.id).automod
+        
+        def state(enabled: bool) -> str:
+            return "✅ Enabled" if enabled else "❌ Disabled"
+        
         embed = discord.Embed(
             title="🤖 Auto-Moderation Status",
             description="Current auto-moderation configuration:",
@@ -455,19 +504,25 @@ class AutoModerationCog(commands.Cog):
         
         embed.add_field(
             name="Spam Detection",
-            value=f"✅ Enabled\nThreshold: {self.spam_threshold} messages in {self.spam_window}s",
+            value=f"{state(config.spam_detection)}\nThreshold: {config.spam_threshold} messages in {config.spam_window}s",
             inline=True
         )
         
         embed.add_field(
             name="Invite Links",
-            value="✅ Enabled\nAction: Delete + Warn",
+            value=f"{state(config.invite_links)}\nAction: Delete + Warn",
             inline=True
         )
         
         embed.add_field(
             name="Excessive Caps",
-            value=f"✅ Enabled\nThreshold: {int(self.excessive_caps_threshold * 100)}%",
+            value=f"{state(config.excessive_caps)}\nThreshold: {int(config.caps_threshold * 100)}%",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="Duplicate Messages",
+            value=f"{state(config.duplicate_detection)}\nThreshold: {config.duplicate_authors} members in {config.duplicate_window}s",
             inline=True
         )
         
@@ -3,13 +3,12 @@ from discord.ext import commands
 import json
 import asyncio
 from datetime import datetime
-from utils.database import Database
 from utils.permissions import has_permission
 
 class BackupCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
     async def create_backup(self, guild: discord.Guild) -> dict:
         """Create a comprehensive server backup"""
@@ -288,7 +287,7 @@ class BackupCog(commands.Cog):
             
             if backup_data:
                 # Store backup in database
-                backup_id = self.db.store_backup(backup_data)
+                backup_id = await self.db.store_backup(backup_data)
                 
                 embed = discord.Embed(
                     title="✅ Backup Created",
@@ -311,7 +310,7 @@ class BackupCog(commands.Cog):
                 await status_msg.edit(embed=embed)
                 
                 # Log action
-                self.db.log_action("backup_create", interaction.user.id, None, f"Backup {backup_id} created")
+                await self.db.log_action("backup_create", interaction.user.id, None, f"Backup {backup_id} created", interaction.guild.id)
             else:
                 embed = discord.Embed(
                     title="❌ Backup Failed",
@@ -326,7 +325,7 @@ class BackupCog(commands.Cog):
                 return
             
             # Get backup data
-            backup_data = self.db.get_backup(backup_id)
+            backup_data = await self.db.get_backup(backup_id)
             if not backup_data:
                 await interaction.response.send_message("❌ Backup not found.", ephemeral=True)
                 return
@@ -347,7 +346,7 @@ class BackupCog(commands.Cog):
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
         
         elif action == "list":
-            backups = self.db.get_backups(interaction.guild.id)
+            backups = await self.db.get_backups(interaction.guild.id)
             
             if not backups:
                 embed = discord.Embed(
@@ -369,7 +368,7 @@ class BackupCog(commands.Cog):
                 embed.add_field(
                     name=f"📁 Backup {backup['id']}",
                     value=f"**Date:** {timestamp}\n"
-                          f"**Items:** {len(backup['channels'])} channels, {len(backup['roles'])} roles",
+                          f"**Items:** {backup['channel_count']} channels, {backup['role_count']} roles",
                     inline=True
                 )
             
@@ -421,7 +420,7 @@ class BackupConfirmView(discord.ui.View):
         await interaction.edit_original_response(embed=embed)
         
         # Log action
-        self.cog.db.log_action("backup_restore", interaction.user.id, None, f"Backup restored: {results}")
+        await self.cog.db.log_action("backup_restore", interaction.user.id, None, f"Backup restored: {results}", interaction.guild.id)
     
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
     async def cancel_restore(self, interaction: discord.Interaction, button: discord.ui.Button):
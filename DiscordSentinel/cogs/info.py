@@ -1,15 +1,14 @@
 import discord
 from discord.ext import commands
 from datetime import datetime
-from utils.database import Database
 from utils.permissions import has_permission, get_permission_level
 
 class InfoCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
     
-    def get_user_flags(self, user: discord.Member) -> list:
+    async def get_user_flags(self, user: discord.Member) -> list:
         """Get AegisGuard-style user flags"""
         flags = []
         
@@ -58,12 +57,12 @@ class InfoCog(commands.Cog):
             flags.append("🎭 Many Roles")
         
         # Check if quarantined
-        quarantine_data = self.db.get_quarantine(user.id, user.guild.id)
+        quarantine_data = await self.db.get_quarantine(user.id, user.guild.id)
         if quarantine_data:
             flags.append("🔒 Quarantined")
         
         # Check warning count
-        warning_count = self.db.get_warning_count(user.id)
+        warning_count = await self.db.get_warning_count(user.id, user.guild.id)
         if warning_count > 0:
             flags.append(f"⚠️ {warning_count} Warning(s)")
         
@@ -217,7 +216,7 @@ class InfoCog(commands.Cog):
         )
         
         # Flags
-        flags = self.get_user_flags(user)
+        flags = await self.get_user_flags(user)
         if flags:
             embed.add_field(
                 name="🏷️ Flags",
@@ -226,8 +225,8 @@ class InfoCog(commands.Cog):
             )
         
         # Moderation history
-        warning_count = self.db.get_warning_count(user.id)
-        recent_actions = self.db.get_recent_logs(5, user.id)
+        warning_count = await self.db.get_warning_count(user.id, interaction.guild.id)
+        recent_actions = await self.db.get_recent_logs(interaction.guild.id, 5, user.id)
         
         if warning_count > 0 or recent_actions:
             mod_text = f"**Warnings:** {warning_count}\n"
@@ -375,13 +374,14 @@ class InfoCog(commands.Cog):
         antinuke_cog = self.bot.get_cog('AntiNukeCog')
         antiraid_cog = self.bot.get_cog('AntiRaidCog')
         verification_cog = self.bot.get_cog('VerificationCog')
+        config = self.bot.guild_config.get(guild.id)
         
         security_status = []
-        if antinuke_cog and antinuke_cog.antinuke_enabled:
+        if antinuke_cog and config.antinuke.enabled:
             security_status.append("🛡️ Anti-Nuke Active")
-        if antiraid_cog and antiraid_cog.raid_protection_enabled:
+        if antiraid_cog and config.antiraid.enabled:
             security_status.append("🚨 Anti-Raid Active")
-        if verification_cog and verification_cog.verification_enabled:
+        if verification_cog and config.verification.enabled:
             security_status.append("✅ Verification Active")
         
         if security_status:
@@ -1,17 +1,16 @@
 import discord
 from discord.ext import commands
 from datetime import datetime
-from utils.database import Database
 
 class LoggingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Log when a member joins"""
-        self.db.log_action("member_join", None, member.id, f"User joined the server")
+        await self.db.log_action("member_join", None, member.id, f"User joined the server", member.guild.id)
         
         # Try to send to log channel
         await self.send_log(
@@ -28,7 +27,7 @@ class LoggingCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member):
         """Log when a member leaves"""
-        self.db.log_action("member_leave", None, member.id, f"User left the server")
+        await self.db.log_action("member_leave", None, member.id, f"User left the server", member.guild.id)
         
         # Try to send to log channel
         await self.send_log(
@@ -53,7 +52,7 @@ class LoggingCog(commands.Cog):
         if not message.content and not message.attachments:
             return
         
-        self.db.log_action("message_delete", None, message.author.id, f"Message deleted in #{message.channel.name}")
+        await self.db.log_action("message_delete", None, message.author.id, f"Message deleted in #{message.channel.name}", message.guild.id)
         
         # Prepare content preview
         content_preview = message.content[:100] + "..." if len(message.content) > 100 else message.content
@@ -83,7 +82,7 @@ class LoggingCog(commands.Cog):
         if not before.content and not after.content:
             return
         
-        self.db.log_action("message_edit", None, before.author.id, f"Message edited in #{before.channel.name}")
+        await self.db.log_action("message_edit", None, before.author.id, f"Message edited in #{before.channel.name}", before.guild.id)
         
         # Prepare content previews
         before_preview = before.content[:100] + "..." if len(before.content) > 100 else before.content
@@ -105,7 +104,7 @@ class LoggingCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
         """Log when a member is banned"""
-        self.db.log_action("member_ban", None, user.id, f"User was banned")
+        await self.db.log_action("member_ban", None, user.id, f"User was banned", guild.id)
         
         await self.send_log(
             guild,
@@ -120,7 +119,7 @@ class LoggingCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_unban(self, guild, user):
         """Log when a member is unbanned"""
-        self.db.log_action("member_unban", None, user.id, f"User was unbanned")
+        await self.db.log_action("member_unban", None, user.id, f"User was unbanned", guild.id)
         
         await self.send_log(
             guild,
@@ -184,7 +183,7 @@ class LoggingCog(commands.Cog):
             limit = 1
         
         try:
-            logs = self.db.get_recent_logs(limit, user.id if user else None)
+            logs = await self.db.get_recent_logs(interaction.guild.id, limit, user.id if user else None)
             
             if not logs:
                 embed = discord.Embed(
@@ -2,13 +2,12 @@ import discord
 from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta
-from utils.database import Database
 from utils.permissions import has_permission
 
 class MassModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
     
     @discord.app_commands.command(name="massban", description="Ban multiple users by ID")
     @discord.app_commands.describe(
@@ -73,7 +72,7 @@ class MassModerationCog(commands.Cog):
                 )
                 
                 banned_count += 1
-                self.db.log_action("mass_ban", interaction.user.id, user_id, reason)
+                await self.db.log_action("mass_ban", interaction.user.id, user_id, reason, interaction.guild.id)
                 
                 # Rate limiting
                 await asyncio.sleep(0.5)
@@ -159,7 +158,7 @@ class MassModerationCog(commands.Cog):
                 await member.kick(reason=f"Mass kick by {interaction.user} | {reason}")
                 
                 kicked_count += 1
-                self.db.log_action("mass_kick", interaction.user.id, user_id, reason)
+                await self.db.log_action("mass_kick", interaction.user.id, user_id, reason, interaction.guild.id)
                 
                 # Rate limiting
                 await asyncio.sleep(0.5)
@@ -211,11 +210,12 @@ class MassModerationCog(commands.Cog):
             deleted = await interaction.channel.purge(limit=amount, check=check)
             
             # Log the action
-            self.db.log_action(
+            await self.db.log_action(
                 "purge", 
                 interaction.user.id, 
                 user.id if user else None, 
-                f"Purged {len(deleted)} messages | {reason}"
+                f"Purged {len(deleted)} messages | {reason}",
+                interaction.guild.id
             )
             
             embed = discord.Embed(
@@ -278,7 +278,7 @@ class MassModerationCog(commands.Cog):
             )
             
             # Log the action
-            self.db.log_action("nuke", interaction.user.id, None, f"Nuked #{channel_name} | {reason}")
+            await self.db.log_action("nuke", interaction.user.id, None, f"Nuked #{channel_name} | {reason}", interaction.guild.id)
             
             embed = discord.Embed(
                 title="💥 Channel Nuked",
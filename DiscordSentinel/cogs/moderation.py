@@ -2,13 +2,12 @@ import discord
 from discord.ext import commands
 import json
 from datetime import datetime, timedelta
-from utils.database import Database
 from utils.permissions import has_permission, is_immune
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
     
     @discord.app_commands.command(name="kick", description="Kick a user from the server")
     @discord.app_commands.describe(
@@ -56,7 +55,7 @@ class ModerationCog(commands.Cog):
             await user.kick(reason=f"Kicked by {interaction.user} | {reason}")
             
             # Log the action
-            self.db.log_action("kick", interaction.user.id, user.id, reason)
+            await self.db.log_action("kick", interaction.user.id, user.id, reason, interaction.guild.id)
             
             # Send confirmation
             embed = discord.Embed(
@@ -126,7 +125,7 @@ class ModerationCog(commands.Cog):
             await user.ban(reason=f"Banned by {interaction.user} | {reason}", delete_message_days=delete_messages)
             
             # Log the action
-            self.db.log_action("ban", interaction.user.id, user.id, reason)
+            await self.db.log_action("ban", interaction.user.id, user.id, reason, interaction.guild.id)
             
             # Send confirmation
             embed = discord.Embed(
@@ -180,7 +179,7 @@ class ModerationCog(commands.Cog):
             await user.timeout(timeout_until, reason=f"Muted by {interaction.user} | {reason}")
             
             # Log the action
-            self.db.log_action("mute", interaction.user.id, user.id, f"{reason} | Duration: {duration} minutes")
+            await self.db.log_action("mute", interaction.user.id, user.id, f"{reason} | Duration: {duration} minutes", interaction.guild.id)
             
             # Send confirmation
             embed = discord.Embed(
@@ -220,7 +219,7 @@ class ModerationCog(commands.Cog):
             await user.timeout(None, reason=f"Unmuted by {interaction.user} | {reason}")
             
             # Log the action
-            self.db.log_action("unmute", interaction.user.id, user.id, reason)
+            await self.db.log_action("unmute", interaction.user.id, user.id, reason, interaction.guild.id)
             
             # Send confirmation
             embed = discord.Embed(
@@ -256,8 +255,8 @@ class ModerationCog(commands.Cog):
         
         try:
             # Add warning to database
-            warning_id = self.db.add_warning(user.id, interaction.user.id, reason)
-            warnings_count = self.db.get_warning_count(user.id)
+            warning_id = await self.db.add_warning(user.id, interaction.user.id, reason, interaction.guild.id)
+            warnings_count = await self.db.get_warning_count(user.id, interaction.guild.id)
             
             # Send DM to user
             try:
@@ -286,7 +285,7 @@ class ModerationCog(commands.Cog):
             embed.add_field(name="Moderator", value=interaction.user.mention, inline=False)
             
             # Check if auto-ban should be triggered
-            max_warnings = 3  # This could be loaded from config
+            max_warnings = self.bot.guild_config.get(interaction.guild.id).moderation.max_warnings
             if warnings_count >= max_warnings:
                 embed.add_field(
                     name="⚠️ Maximum Warnings Reached",
@@ -308,7 +307,7 @@ class ModerationCog(commands.Cog):
             return
         
         try:
-            warnings = self.db.get_warnings(user.id)
+            warnings = await self.db.get_warnings(user.id, interaction.guild.id)
             
             if not warnings:
                 embed = discord.Embed(
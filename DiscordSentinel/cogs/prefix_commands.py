@@ -1,13 +1,12 @@
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta
-from utils.database import Database
 from utils.permissions import has_permission, is_immune
 
 class PrefixCommandsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
     
     @commands.command(name="ban")
     async def ban_command(self, ctx, member: discord.Member, *, reason="No reason provided"):
@@ -34,7 +33,7 @@ class PrefixCommandsCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the action
-            self.db.log_action("ban", ctx.author.id, member.id, reason)
+            await self.db.log_action("ban", ctx.author.id, member.id, reason, ctx.guild.id)
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to ban this user.")
@@ -66,7 +65,7 @@ class PrefixCommandsCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the action
-            self.db.log_action("kick", ctx.author.id, member.id, reason)
+            await self.db.log_action("kick", ctx.author.id, member.id, reason, ctx.guild.id)
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to kick this user.")
@@ -85,7 +84,7 @@ class PrefixCommandsCog(commands.Cog):
             return
         
         # Add warning to database
-        warning_id = self.db.add_warning(member.id, ctx.author.id, reason)
+        warning_id = await self.db.add_warning(member.id, ctx.author.id, reason, ctx.guild.id)
         
         embed = discord.Embed(
             title="⚠️ Warning Issued",
@@ -97,7 +96,7 @@ class PrefixCommandsCog(commands.Cog):
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
         
         # Get total warnings
-        total_warnings = self.db.get_warning_count(member.id)
+        total_warnings = await self.db.get_warning_count(member.id, ctx.guild.id)
         embed.add_field(name="Total Warnings", value=total_warnings, inline=True)
         
         await ctx.send(embed=embed)
@@ -125,7 +124,7 @@ class PrefixCommandsCog(commands.Cog):
             return
         
         target = member or ctx.author
-        warnings = self.db.get_warnings(target.id)
+        warnings = await self.db.get_warnings(target.id, ctx.guild.id)
         
         if not warnings:
             embed = discord.Embed(
@@ -203,7 +202,7 @@ class PrefixCommandsCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the action
-            self.db.log_action("mute", ctx.author.id, member.id, f"{reason} | Duration: {duration}")
+            await self.db.log_action("mute", ctx.author.id, member.id, f"{reason} | Duration: {duration}", ctx.guild.id)
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to mute this user.")
@@ -231,7 +230,7 @@ class PrefixCommandsCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the action
-            self.db.log_action("unmute", ctx.author.id, member.id, reason)
+            await self.db.log_action("unmute", ctx.author.id, member.id, reason, ctx.guild.id)
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to unmute this user.")
@@ -273,8 +272,8 @@ class PrefixCommandsCog(commands.Cog):
             
             # Log the action
             target_info = f" from {member}" if member else ""
-            self.db.log_action("purge", ctx.author.id, member.id if member else None, 
-                             f"Purged {len(deleted) - 1} messages{target_info}")
+            await self.db.log_action("purge", ctx.author.id, member.id if member else None, 
+                             f"Purged {len(deleted) - 1} messages{target_info}", ctx.guild.id)
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to delete messages.")
@@ -318,7 +317,7 @@ class PrefixCommandsCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Log the action
-            self.db.log_action("lockdown", ctx.author.id, None, f"Server lockdown | {reason}")
+            await self.db.log_action("lockdown", ctx.author.id, None, f"Server lockdown | {reason}", ctx.guild.id)
             
         except Exception as e:
             await ctx.send(f"❌ An error occurred: {str(e)}")
@@ -467,18 +466,19 @@ class PrefixCommandsCog(commands.Cog):
             return
         
         if action.lower() == "on":
-            antiraid_cog.raid_protection_enabled = True
+            await self.bot.guild_config.update(ctx.guild.id, "antiraid", enabled=True)
             await ctx.send("✅ Anti-raid protection **enabled**.")
         elif action.lower() == "off":
-            antiraid_cog.raid_protection_enabled = False
+            await self.bot.guild_config.update(ctx.guild.id, "antiraid", enabled=False)
             await ctx.send("❌ Anti-raid protection **disabled**.")
         else:
             # Show status
-            status = "🟢 Enabled" if antiraid_cog.raid_protection_enabled else "🔴 Disabled"
+            enabled = self.bot.guild_config.get(ctx.guild.id).antiraid.enabled
+            status = "🟢 Enabled" if enabled else "🔴 Disabled"
             embed = discord.Embed(
                 title="🚨 Anti-Raid Status",
                 description=f"Protection: {status}",
-                color=0x2ecc71 if antiraid_cog.raid_protection_enabled else 0xe74c3c
+                color=0x2ecc71 if enabled else 0xe74c3c
             )
             await ctx.send(embed=embed)
     
@@ -495,14 +495,14 @@ class PrefixCommandsCog(commands.Cog):
             return
         
         if action.lower() == "on":
-            antinuke_cog.antinuke_enabled = True
+            await self.bot.guild_config.update(ctx.guild.id, "antinuke", enabled=True)
             await ctx.send("✅ Anti-nuke protection **enabled**.")
         elif action.lower() == "off":
-            antinuke_cog.antinuke_enabled = False
+            await self.bot.guild_config.update(ctx.guild.id, "antinuke", enabled=False)
             await ctx.send("❌ Anti-nuke protection **disabled**.")
         else:
             # Show status
-            status = "🟢 Active" if antinuke_cog.antinuke_enabled else "🔴 Disabled"
+            status = "🟢 Active" if self.bot.guild_config.get(ctx.guild.id).antinuke.enabled else "🔴 Disabled"
             panic_status = "🚨 ACTIVE" if antinuke_cog.panic_mode else "✅ Normal"
             
             embed = discord.Embed(
@@ -538,7 +538,7 @@ class PrefixCommandsCog(commands.Cog):
             backup_data = await backup_cog.create_backup(ctx.guild)
             
             if backup_data:
-                backup_id = self.db.store_backup(backup_data)
+                backup_id = await self.db.store_backup(backup_data)
                 
                 embed = discord.Embed(
                     title="✅ Backup Created",
@@ -560,7 +560,7 @@ class PrefixCommandsCog(commands.Cog):
                 await status_msg.edit(embed=embed)
         
         elif action.lower() == "list":
-            backups = self.db.get_backups(ctx.guild.id)
+            backups = await self.db.get_backups(ctx.guild.id)
             
             if not backups:
                 await ctx.send("💾 No backups found for this server.")
@@ -577,7 +577,7 @@ class PrefixCommandsCog(commands.Cog):
                 embed.add_field(
                     name=f"📁 {backup['id']}",
                     value=f"**Date:** {timestamp}\n"
-                          f"**Items:** {len(backup['channels'])} channels, {len(backup['roles'])} roles",
+                          f"**Items:** {backup['channel_count']} channels, {backup['role_count']} roles",
                     inline=True
                 )
             
@@ -791,6 +791,33 @@ class PrefixCommandsCog(commands.Cog):
         
         await status_msg.edit(embed=embed)
     
+    @commands.command(name="reloadconfig")
+    @commands.is_owner()
+    async def reload_config_command(self, ctx):
+        """Apply edited config files without restarting (bot owner only)"""
+        if await self.bot.reload_config():
+            stats = self.bot.config_reloader.stats()
+            await ctx.send(
+                f"✅ Config reloaded: generation **{stats['generation']}**, swapped in {stats['last_swap_ms']:.2f}ms."
+            )
+        else:
+            await ctx.send(
+                f"❌ Config not reloaded, still on generation {self.bot.guild_config.generation}: "
+                f"{self.bot.config_reloader.last_error}"
+            )
+    
+    @commands.command(name="adoptlegacy")
+    @commands.is_owner()
+    @commands.guild_only()
+    async def adopt_legacy_command(self, ctx):
+        """Move warnings and logs from before guild partitioning to this server (bot owner only)"""
+        if not await self.bot.db.has_legacy():
+            await ctx.send("❌ There are no legacy warnings or logs left to move.")
+            return
+        
+        warnings, logs = await self.bot.db.adopt_legacy(ctx.guild.id)
+        await ctx.send(f"✅ Moved **{warnings}** legacy warnings and **{logs}** log entries to this server.")
+    
     @commands.command(name="ping")
     async def ping_command(self, ctx):
         """Check bot latency"""
@@ -888,7 +915,7 @@ class PrefixCommandsCog(commands.Cog):
             # Configure anti-nuke
             antinuke_cog = self.bot.get_cog('AntiNukeCog')
             if antinuke_cog:
-                antinuke_cog.antinuke_enabled = True
+                await self.bot.guild_config.update(ctx.guild.id, "antinuke", enabled=True)
                 results['antinuke'] = True
             
             # Update status
@@ -898,7 +925,7 @@ class PrefixCommandsCog(commands.Cog):
             # Configure anti-raid
             antiraid_cog = self.bot.get_cog('AntiRaidCog')
             if antiraid_cog:
-                antiraid_cog.raid_protection_enabled = True
+                await self.bot.guild_config.update(ctx.guild.id, "antiraid", enabled=True)
                 results['antiraid'] = True
             
             # Update status
@@ -969,7 +996,7 @@ class PrefixCommandsCog(commands.Cog):
             if backup_cog:
                 backup_data = await backup_cog.create_backup(ctx.guild)
                 if backup_data:
-                    self.db.store_backup(backup_data)
+                    await self.db.store_backup(backup_data)
                     results['backup'] = True
             
             # Final results
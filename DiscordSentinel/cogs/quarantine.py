@@ -1,13 +1,12 @@
 import discord
 from discord.ext import commands
 from datetime import datetime
-from utils.database import Database
 from utils.permissions import has_permission, is_immune
 
 class QuarantineCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
         # Quarantine tracking
         self.quarantined_users = set()
@@ -76,11 +75,11 @@ class QuarantineCog(commands.Cog):
                 "original_roles": original_roles
             }
             
-            self.db.add_quarantine(quarantine_data)
+            await self.db.add_quarantine(quarantine_data)
             self.quarantined_users.add(user.id)
             
             # Log action
-            self.db.log_action("quarantine", moderator.id, user.id, reason)
+            await self.db.log_action("quarantine", moderator.id, user.id, reason, user.guild.id)
             
             # Try to DM user
             try:
@@ -111,7 +110,7 @@ class QuarantineCog(commands.Cog):
         """Remove a user from quarantine"""
         try:
             # Get quarantine data
-            quarantine_data = self.db.get_quarantine(user.id, user.guild.id)
+            quarantine_data = await self.db.get_quarantine(user.id, user.guild.id)
             if not quarantine_data:
                 return False
             
@@ -136,11 +135,11 @@ class QuarantineCog(commands.Cog):
                     pass
             
             # Remove from database
-            self.db.remove_quarantine(user.id, user.guild.id)
+            await self.db.remove_quarantine(user.id, user.guild.id)
             self.quarantined_users.discard(user.id)
             
             # Log action
-            self.db.log_action("unquarantine", moderator.id, user.id, reason)
+            await self.db.log_action("unquarantine", moderator.id, user.id, reason, user.guild.id)
             
             return True
             
@@ -240,7 +239,7 @@ class QuarantineCog(commands.Cog):
             await interaction.response.send_message("❌ You don't have permission to view quarantined users.", ephemeral=True)
             return
         
-        quarantined = self.db.get_all_quarantined(interaction.guild.id)
+        quarantined = await self.db.get_all_quarantined(interaction.guild.id)
         
         if not quarantined:
             embed = discord.Embed(
@@ -2,13 +2,12 @@ import discord
 from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta
-from utils.database import Database
 from utils.permissions import has_permission
 
 class UtilityCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
         # Active slowmodes
         self.active_slowmodes = {}
@@ -43,11 +42,12 @@ class UtilityCog(commands.Cog):
             )
             
             # Log action
-            self.db.log_action(
+            await self.db.log_action(
                 "slowmode", 
                 interaction.user.id, 
                 None, 
-                f"Slowmode set to {seconds}s in #{target_channel.name}"
+                f"Slowmode set to {seconds}s in #{target_channel.name}",
+                interaction.guild.id
             )
             
             if seconds == 0:
@@ -168,11 +168,12 @@ class UtilityCog(commands.Cog):
             await interaction.response.send_message(embed=embed)
             
             # Log action
-            self.db.log_action(
+            await self.db.log_action(
                 "lock_channel",
                 interaction.user.id,
                 None,
-                f"Locked #{target_channel.name} | {reason}"
+                f"Locked #{target_channel.name} | {reason}",
+                interaction.guild.id
             )
             
         except discord.Forbidden:
@@ -215,11 +216,12 @@ class UtilityCog(commands.Cog):
             await interaction.response.send_message(embed=embed)
             
             # Log action
-            self.db.log_action(
+            await self.db.log_action(
                 "unlock_channel",
                 interaction.user.id,
                 None,
-                f"Unlocked #{target_channel.name} | {reason}"
+                f"Unlocked #{target_channel.name} | {reason}",
+                interaction.guild.id
             )
             
         except discord.Forbidden:
@@ -247,11 +249,12 @@ class UtilityCog(commands.Cog):
             await channel.send(embed=embed, delete_after=10)
             
             # Log action
-            self.db.log_action(
+            await self.db.log_action(
                 "auto_unlock",
                 None,
                 None,
-                f"Temporary lock expired in #{channel.name}"
+                f"Temporary lock expired in #{channel.name}",
+                channel.guild.id
             )
             
         except discord.NotFound:
@@ -279,8 +282,8 @@ class UtilityCog(commands.Cog):
             limit = 1
         
         # Get user's moderation history
-        warnings = self.db.get_warnings(user.id)
-        logs = self.db.get_recent_logs(50, user.id)  # Get more logs to filter
+        warnings = await self.db.get_warnings(user.id, interaction.guild.id)
+        logs = await self.db.get_recent_logs(interaction.guild.id, 50, user.id)  # Get more logs to filter
         
         # Combine and sort by timestamp
         all_cases = []
@@ -416,13 +419,13 @@ class SetupView(discord.ui.View):
             # Configure anti-nuke
             antinuke_cog = self.cog.bot.get_cog('AntiNukeCog')
             if antinuke_cog:
-                antinuke_cog.antinuke_enabled = True
+                await self.cog.bot.guild_config.update(guild.id, "antinuke", enabled=True)
                 results['antinuke'] = True
             
             # Configure anti-raid
             antiraid_cog = self.cog.bot.get_cog('AntiRaidCog')
             if antiraid_cog:
-                antiraid_cog.raid_protection_enabled = True
+                await self.cog.bot.guild_config.update(guild.id, "antiraid", enabled=True)
                 results['antiraid'] = True
             
             # Set up quarantine role
@@ -436,7 +439,7 @@ class SetupView(discord.ui.View):
             if backup_cog:
                 backup_data = await backup_cog.create_backup(guild)
                 if backup_data:
-                    self.cog.db.store_backup(backup_data)
+                    await self.cog.db.store_backup(backup_data)
                     results['backup'] = True
             
             # Final results
@@ -472,11 +475,12 @@ class SetupView(discord.ui.View):
             await interaction.edit_original_response(embed=embed)
             
             # Log setup
-            self.cog.db.log_action(
+            await self.cog.db.log_action(
                 "setup_wizard",
                 interaction.user.id,
                 None,
-                f"Setup completed: {success_count}/5 features configured"
+                f"Setup completed: {success_count}/5 features configured",
+                interaction.guild.id
             )
             
         except Exception as e:
@@ -4,52 +4,47 @@ import asyncio
 import random
 import string
 from datetime import datetime, timedelta
-from utils.database import Database
 from utils.permissions import has_permission
 
 class VerificationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.db = Database()
+        self.db = bot.db
         
-        # Verification settings
-        self.verification_enabled = False
-        self.verification_channel = None
-        self.verified_role = None
-        self.unverified_role = None
-        
-        # Pending verifications
+        # Pending verifications; settings are per guild (see utils.guild_config)
         self.pending_verifications = {}
-        
-        # Verification methods
-        self.verification_methods = {
-            'reaction': True,
-            'captcha': False,
-            'button': True
-        }
     
     def generate_captcha(self) -> str:
         """Generate a simple captcha code"""
         return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
     
+    def get_settings(self, guild: discord.Guild):
+        """Return the guild's verification config with its channel and roles resolved"""
+        config = self.bot.guild_config.get(guild.id).verification
+        channel = guild.get_channel(config.channel_id) if config.channel_id else None
+        verified_role = guild.get_role(config.verified_role_id) if config.verified_role_id else None
+        unverified_role = guild.get_role(config.unverified_role_id) if config.unverified_role_id else None
+        return config, channel, verified_role, unverified_role
+    
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Handle new member verification"""
-        if not self.verification_enabled:
+        config, verification_channel, verified_role, unverified_role = self.get_settings(member.guild)
+        if not config.enabled:
             return
         
         # Add unverified role if configured
-        if self.unverified_role:
+        if unverified_role:
             try:
-                await member.add_roles(self.unverified_role, reason="New member - pending verification")
+                await member.add_roles(unverified_role, reason="New member - pending verification")
             except:
                 pass
         
         # Send verification message
-        if self.verification_channel:
-            await self.send_verification_message(member)
+        if verification_channel:
+            await self.send_verification_message(member, verification_channel, config.method)
     
-    async def send_verification_message(self, member: discord.Member):
+    async def send_verification_message(self, member: discord.Member, verification_channel: discord.TextChannel, method: str):
         """Send verification message to new member"""
         embed = discord.Embed(
             title="🛡️ Server Verification Required",
@@ -64,7 +59,7 @@ class VerificationCog(commands.Cog):
             inline=False
         )
         
-        if self.verification_methods['button']:
+        if method == 'button':
             embed.add_field(
                 name="✅ How to Verify",
                 value="Click the **Verify** button below to complete verification.",
@@ -74,11 +69,11 @@ class VerificationCog(commands.Cog):
             view = VerificationView(self)
             
             try:
-                await self.verification_channel.send(embed=embed, view=view)
+                await verification_channel.send(embed=embed, view=view)
             except:
                 pass
         
-        elif self.verification_methods['reaction']:
+        elif method == 'reaction':
             embed.add_field(
                 name="✅ How to Verify",
                 value="React with ✅ to verify yourself.",
@@ -86,7 +81,7 @@ class VerificationCog(commands.Cog):
             )
             
             try:
-                msg = await self.verification_channel.send(embed=embed)
+                msg = await verification_channel.send(embed=embed)
                 await msg.add_reaction("✅")
                 
                 # Store message for reaction handling
@@ -95,7 +90,7 @@ class VerificationCog(commands.Cog):
             except:
                 pass
         
-        elif self.verification_methods['captcha']:
+        elif method == 'captcha':
             captcha_code = self.generate_captcha()
             self.pending_verifications[member.id] = captcha_code
             
@@ -106,23 +101,25 @@ class VerificationCog(commands.Cog):
             )
             
             try:
-                await self.verification_channel.send(embed=embed)
+                await verification_channel.send(embed=embed)
             except:
                 pass
     
     async def verify_member(self, member: discord.Member) -> bool:
         """Verify a member and give them access"""
         try:
+            config, verification_channel, verified_role, unverified_role = self.get_settings(member.guild)
+            
             # Remove unverified role
-            if self.unverified_role and self.unverified_role in member.roles:
-                await member.remove_roles(self.unverified_role, reason="Verification completed")
+            if unverified_role and unverified_role in member.roles:
+                await member.remove_roles(unverified_role, reason="Verification completed")
             
             # Add verified role
-            if self.verified_role:
-                await member.add_roles(self.verified_role, reason="Verification completed")
+            if verified_role:
+                await member.add_roles(verified_role, reason="Verification completed")
             
             # Log verification
-            self.db.log_action("verification_success", None, member.id, "Member completed verification")
+            await self.db.log_action("verification_success", None, member.id, "Member completed verification", member.guild.id)
             
             # Send success message
             embed = discord.Embed(
@@ -131,8 +128,8 @@ class VerificationCog(commands.Cog):
                 color=0x2ecc71
             )
             
-            if self.verification_channel:
-                await self.verification_channel.send(embed=embed, delete_after=10)
+            if verification_channel:
+                await verification_channel.send(embed=embed, delete_after=10)
             
             return True
             
@@ -197,23 +194,25 @@ class VerificationCog(commands.Cog):
             return
         
         # Update settings
+        changes = {}
         if enabled is not None:
-            self.verification_enabled = enabled
+            changes['enabled'] = enabled
         
         if channel:
-            self.verification_channel = channel
+            changes['channel_id'] = channel.id
         
         if verified_role:
-            self.verified_role = verified_role
+            changes['verified_role_id'] = verified_role.id
         
         if unverified_role:
-            self.unverified_role = unverified_role
+            changes['unverified_role_id'] = unverified_role.id
         
         if method:
-            # Reset all methods
-            for m in self.verification_methods:
-                self.verification_methods[m] = False
-            self.verification_methods[method] = True
+            changes['method'] = method
+        
+        if changes:
+            await self.bot.guild_config.update(interaction.guild.id, "verification", **changes)
+        config, verification_channel, verified_role, unverified_role = self.get_settings(interaction.guild)
         
         # Show current configuration
         embed = discord.Embed(
@@ -221,20 +220,19 @@ class VerificationCog(commands.Cog):
             color=0x3498db
         )
         
-        status = "🟢 Enabled" if self.verification_enabled else "🔴 Disabled"
+        status = "🟢 Enabled" if config.enabled else "🔴 Disabled"
         embed.add_field(name="Status", value=status, inline=True)
         
-        channel_name = self.verification_channel.mention if self.verification_channel else "Not set"
+        channel_name = verification_channel.mention if verification_channel else "Not set"
         embed.add_field(name="Channel", value=channel_name, inline=True)
         
-        verified_role_name = self.verified_role.mention if self.verified_role else "Not set"
+        verified_role_name = verified_role.mention if verified_role else "Not set"
         embed.add_field(name="Verified Role", value=verified_role_name, inline=True)
         
-        unverified_role_name = self.unverified_role.mention if self.unverified_role else "Not set"
+        unverified_role_name = unverified_role.mention if unverified_role else "Not set"
         embed.add_field(name="Unverified Role", value=unverified_role_name, inline=True)
         
-        active_method = next((method for method, active in self.verification_methods.items() if active), "None")
-        embed.add_field(name="Method", value=active_method.title(), inline=True)
+        embed.add_field(name="Method", value=config.method.title(), inline=True)
         
         pending_count = len(self.pending_verifications)
         embed.add_field(name="Pending Verifications", value=str(pending_count), inline=True)
@@ -261,7 +259,7 @@ class VerificationCog(commands.Cog):
             await interaction.response.send_message(embed=embed)
             
             # Log action
-            self.db.log_action("manual_verification", interaction.user.id, user.id, "Manual verification by moderator")
+            await self.db.log_action("manual_verification", interaction.user.id, user.id, "Manual verification by moderator", interaction.guild.id)
         else:
             await interaction.response.send_message("❌ Failed to verify user.", ephemeral=True)
 
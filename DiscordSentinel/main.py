@@ -3,13 +3,23 @@ from discord.ext import commands
 import asyncio
 import json
 import os
+import signal
 from datetime import datetime
 import logging
+from utils.database import Database, AsyncDatabase
+from utils.guild_config import GuildConfigEngine, ConfigReloader
+from utils.metrics import LoopLagMonitor
+from utils.message_scanner import prefilter_stats
+from utils.permissions import load_config, role_index, permission_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds shutdown waits for queued auto-moderation actions (deletes, timeouts,
+# warnings, logs) to run before the rest are discarded
+ACTION_DRAIN_TIMEOUT = 10.0
+
 class SecurityBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -25,8 +35,25 @@ class SecurityBot(commands.Bot):
         
         self.start_time = datetime.utcnow()
         
+        # Shared storage for every cog; calls run off the event loop
+        self.db = AsyncDatabase(Database())
+        self.guild_config = GuildConfigEngine(self.db)
+        self.config_reloader = ConfigReloader(self.guild_config)
+        self.loop_lag = LoopLagMonitor()
+    
     async def setup_hook(self):
         """Load all cogs when the bot starts"""
+        self.loop_lag.start()
+        await self.guild_config.load()
+        
+        # `kill -HUP` applies edited config files without dropping the gateway session
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.ensure_future(self.reload_config())
+            )
+        except (AttributeError, NotImplementedError):
+            pass  # No SIGHUP on Windows
+        
         try:
             await self.load_extension('cogs.moderation')
             await self.load_extension('cogs.automod')
@@ -51,6 +78,31 @@ class SecurityBot(commands.Bot):
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
     
+    async def reload_config(self) -> bool:
+        """Reload config.json and data/config.json, keeping the current config if they are invalid"""
+        try:
+            stats = await self.config_reloader.reload()
+            logger.info(f"Config reloaded: generation {stats['generation']}, swapped in {stats['last_swap_ms']:.3f}ms")
+            return True
+        except Exception as e:
+            logger.error(f"Config reload failed, keeping generation {self.guild_config.generation}: {e}")
+            return False
+    
+    async def close(self):
+        """Run queued auto-moderation actions and flush pending database writes before shutting down"""
+        self.loop_lag.stop()
+        
+        # While still connected, so queued warnings and logs reach the database
+        automod = self.get_cog("AutoModerationCog")
+        if automod is not None:
+            try:
+                await asyncio.wait_for(automod.actions.join(), ACTION_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Shutting down with {automod.actions.pending} auto-moderation actions still queued")
+        
+        await super().close()
+        await self.db.close()
+    
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'{self.user} has logged in successfully!')
@@ -64,6 +116,27 @@ class SecurityBot(commands.Bot):
                 name="for security threats | !help"
             )
         )
+        
+        await self.adopt_legacy_data()
+    
+    async def adopt_legacy_data(self):
+        """Hand warnings and logs from before guild partitioning to their guild, once it is known"""
+        if not await self.db.has_legacy():
+            return
+        
+        # bot_settings.legacy_guild_id in config.json, or the only guild the bot is in
+        guild_id = load_config().get("bot_settings", {}).get("legacy_guild_id")
+        if guild_id is None and len(self.guilds) == 1:
+            guild_id = self.guilds[0].id
+        if guild_id is None:
+            logger.warning(
+                "Warnings and logs from before guild partitioning are still under guild 0; set "
+                "bot_settings.legacy_guild_id in config.json or run !adoptlegacy in the server they belong to"
+            )
+            return
+        
+        warnings, logs = await self.db.adopt_legacy(int(guild_id))
+        logger.info(f"Moved {warnings} legacy warnings and {logs} legacy log entries to guild {guild_id}")
     
     async def on_guild_join(self, guild):
         """Called when the bot joins a new guild"""
@@ -204,10 +277,37 @@ class SecurityBot(commands.Bot):
         
         logger.info(f'Sent welcome DMs to {members_messaged} members in {guild.name}')
     
+    async def on_guild_remove(self, guild):
+        """Forget cached permission data of guilds the bot left"""
+        role_index.discard_guild(guild.id)
+    
+    async def on_guild_update(self, before, after):
+        role_index.guild_updated(before, after)
+    
+    async def on_member_update(self, before, after):
+        """Drop cached permissions of members whose roles changed"""
+        permission_cache.member_updated(before, after)
+    
+    async def on_member_remove(self, member):
+        """Drop cached permissions of members who left, so a rejoin starts afresh"""
+        permission_cache.member_removed(member)
+    
+    async def on_guild_role_create(self, role):
+        """Keep the permission role index in step with the guild's roles"""
+        role_index.role_created(role)
+    
+    async def on_guild_role_update(self, before, after):
+        role_index.role_updated(before, after)
+    
+    async def on_guild_role_delete(self, role):
+        role_index.role_deleted(role)
+    
     async def on_command_error(self, ctx, error):
         """Global error handler"""
         if isinstance(error, commands.CommandNotFound):
             return
+        elif isinstance(error, commands.NotOwner):
+            await ctx.send("❌ Only the bot owner can use this command.")
         elif isinstance(error, commands.MissingPermissions):
             await ctx.send("❌ You don't have permission to use this command.")
         elif isinstance(error, commands.BotMissingPermissions):
@@ -283,6 +383,70 @@ def main():
         embed.add_field(name="Guilds", value=len(bot.guilds), inline=True)
         embed.add_field(name="Uptime", value=str(uptime).split('.')[0], inline=False)
         
+        lag = bot.loop_lag.snapshot()
+        embed.add_field(
+            name="Event Loop Lag",
+            value=f"p50 {lag['p50_ms']:.1f}ms | p99 {lag['p99_ms']:.1f}ms | max {lag['max_ms']:.1f}ms",
+            inline=False
+        )
+        
+        cache = permission_cache.stats()
+        embed.add_field(
+            name="Permission Cache",
+            value=f"{cache['entries']:,}/{cache['max_entries']:,} members | hit rate {cache['hit_rate']:.1%} | "
+                  f"{cache['evictions']:,} evictions",
+            inline=False
+        )
+        
+        automod = bot.get_cog("AutoModerationCog")
+        if automod:
+            prefilter = prefilter_stats.stats()
+            stages = ", ".join(f"{name} {count:,}" for name, count in prefilter["hits"].items() if count) or "none"
+            embed.add_field(
+                name="Prefilter",
+                value=f"{prefilter['fast_path']:,}/{prefilter['messages']:,} messages on the fast path | "
+                      f"stage hits: {stages}",
+                inline=False
+            )
+            spam = automod.spam_tracker.stats()
+            embed.add_field(
+                name="Spam Tracker",
+                value=f"{spam['keys']:,}/{spam['max_keys']:,} members | {spam['memory_bytes'] / 1024:,.0f} KiB | "
+                      f"{spam['evictions']:,} evictions",
+                inline=False
+            )
+            duplicates = automod.duplicates.stats()
+            embed.add_field(
+                name="Duplicate Detector",
+                value=f"{duplicates['messages']:,} messages in {duplicates['guilds']:,} guilds | "
+                      f"{duplicates['clusters']:,} clusters, {duplicates['flagged']:,} messages flagged",
+                inline=False
+            )
+            limiter = automod.rate_limiter.stats()
+            embed.add_field(
+                name="Action Rate Limiter",
+                value=f"{limiter['keys']:,}/{limiter['max_keys']:,} keys | {limiter['memory_bytes'] / 1024:,.0f} KiB | "
+                      f"{limiter['allowed']:,} allowed, {limiter['limited']:,} limited",
+                inline=False
+            )
+            actions = automod.actions.stats()
+            embed.add_field(
+                name="Action Queue",
+                value=f"{actions['pending']:,} pending in {actions['guilds']:,} guilds | "
+                      f"wait p50 {actions['wait_p50_ms']:.0f}ms, p99 {actions['wait_p99_ms']:.0f}ms | "
+                      f"{actions['coalesced']:,} coalesced, {actions['dropped'] + actions['shed']:,} dropped, "
+                      f"{actions['failed']:,} failed",
+                inline=False
+            )
+        
+        reload = bot.config_reloader.stats()
+        embed.add_field(
+            name="Config",
+            value=f"generation {reload['generation']} | {reload['reloads']} reloads "
+                  f"({reload['failures']} failed) | last swap {reload['last_swap_ms']:.2f}ms",
+            inline=False
+        )
+        
         await interaction.response.send_message(embed=embed)
     
     @bot.tree.command(name="ping", description="Check bot latency")
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+def legacy_database(data_dir: str) -> Database:
+    """A database upgraded from JSON files that never recorded a guild"""
+    os.makedirs(data_dir)
+    with open(os.path.join(data_dir, "warnings.json"), "w") as f:
+        json.dump({"warnings": [
+            {"id": 1, "user_id": 5, "moderator_id": 9, "reason": "first", "timestamp": "2024-01-01T00:00:00"},
+            {"id": 2, "user_id": 5, "moderator_id": 9, "reason": "second", "timestamp": "2024-02-01T00:00:00"},
+        ], "next_id": 3}, f)
+    with open(os.path.join(data_dir, "logs.json"), "w") as f:
+        json.dump({"logs": [
+            {"action": "ban", "moderator_id": 9, "target_id": 5, "reason": "old", "timestamp": "2024-01-02T00:00:00"},
+        ]}, f)
+    return Database(os.path.join(data_dir, "aegis.db"), data_dir)
+
+def test_legacy_history_moves_to_its_guild(tmp_path):
+    db = legacy_database(str(tmp_path / "data"))
+    assert db.has_legacy()
+    assert db.get_warnings(5, 77) == []
+    db.add_warning(5, 9, "third", 77)
+    db.log_action("kick", 9, 5, "new", 77)
+    db.flush()
+    
+    assert db.adopt_legacy(77) == (2, 1)
+    assert not db.has_legacy()
+    assert [warning["reason"] for warning in db.get_warnings(5, 77)] == ["first", "second", "third"]
+    assert db.get_warning_count(5, 77) == 3
+    assert [entry["action"] for entry in db.get_recent_logs(77)] == ["kick", "ban"]
+    db.close()
+    
+    # Kept across restarts, and a second run moves nothing
+    db = Database(str(tmp_path / "data" / "aegis.db"), str(tmp_path / "data"))
+    assert [warning["reason"] for warning in db.get_warnings(5, 77)] == ["first", "second", "third"]
+    assert db.adopt_legacy(77) == (0, 0)
+    db.close()
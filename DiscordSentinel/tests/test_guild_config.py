@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.guild_config import GuildConfigEngine
+from utils.permissions import ConfigCache
+
+def engine() -> GuildConfigEngine:
+    """An engine that ignores the config files in the working directory"""
+    return GuildConfigEngine(
+        global_config=ConfigCache(os.devnull, default={}), data_config=ConfigCache(os.devnull, default={})
+    )
+
+def test_toggles_set_one_after_another_are_all_kept():
+    config = engine()
+    asyncio.run(config.update(1, "antinuke", monitored_actions={"channel_delete": False, "channel_create": False}))
+    asyncio.run(config.update(1, "antinuke", monitored_actions={"role_delete": False, "role_create": False}))
+    
+    monitored = config.get(1).antinuke.monitored_actions
+    assert not monitored & {"channel_delete", "channel_create", "role_delete", "role_create"}
+    assert {"member_ban", "member_kick", "webhook_create", "webhook_delete"} <= monitored
+
+def test_toggle_turned_back_on():
+    config = engine()
+    asyncio.run(config.update(1, "antinuke", monitored_actions={"channel_delete": False}))
+    asyncio.run(config.update(1, "antinuke", monitored_actions={"role_delete": False}))
+    asyncio.run(config.update(1, "antinuke", monitored_actions={"channel_delete": True}))
+    
+    monitored = config.get(1).antinuke.monitored_actions
+    assert "channel_delete" in monitored
+    assert "role_delete" not in monitored
+
+def test_plain_values_are_replaced():
+    config = engine()
+    asyncio.run(config.update(1, "automod", forbidden_words=["one"]))
+    asyncio.run(config.update(1, "automod", forbidden_words=["two"]))
+    assert config.get(1).automod.forbidden_words == ("two",)
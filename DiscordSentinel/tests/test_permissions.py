@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import discord
+
+from bench_on_message import FakeGuild, FakeMember
+from utils.permissions import PermissionCache
+
+def test_roles_changed_without_an_update_event_are_seen():
+    cache = PermissionCache()
+    guild = FakeGuild(1000, ["Moderator", "Member"])
+    moderator, member = guild.roles[1], guild.roles[2]
+    
+    user = FakeMember(7, guild, [moderator])
+    assert cache.get(user)[0] == "moderator"
+    
+    # Left and rejoined, or demoted while the gateway was down: no member update event
+    user._roles = discord.utils.SnowflakeList([member.id])
+    assert cache.get(user)[0] == "member"
+    assert cache.stats()["entries"] == 1
+
+def test_member_removed_drops_their_entry():
+    cache = PermissionCache()
+    guild = FakeGuild(1000, ["Moderator"])
+    user = FakeMember(7, guild, [guild.roles[1]])
+    cache.get(user)
+    
+    cache.member_removed(user)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.spam_tracker import SpamTracker
+
+def test_running_counts_match_the_entries():
+    now = [0.0]
+    tracker = SpamTracker(max_keys=500, clock=lambda: now[0])
+    rng = random.Random(1)
+    for i in range(20_000):
+        now[0] += 0.01
+        guild_id, user_id = rng.randint(1, 3), rng.randint(1, 800)
+        # Changing thresholds replace a member's window
+        tracker.record(guild_id, user_id, rng.choice([5, 5, 6]), 10, 1, i + 1)
+        if i % 100 == 0:
+            tracker.take_recent(guild_id, user_id, 30)
+        if i % 5000 == 0:
+            tracker.sweep()
+    
+    entries = tracker._keys.values()
+    assert tracker.timestamps == sum(len(entry.times) for entry in entries)
+    assert tracker.remembered == sum(len(entry.recent) for entry in entries)
+    assert tracker.stats()["memory_bytes"] > 0
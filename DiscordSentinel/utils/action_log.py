@@ -0,0 +1,398 @@
+import gzip
+import json
+import os
+import threading
+from collections import deque
+from itertools import groupby, islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+def month_of(entry: Dict) -> str:
+    """Return the YYYY-MM partition an entry belongs to"""
+    return entry["timestamp"][:7]
+
+class Segment:
+    """One JSONL file of the action log plus its in-memory index.
+    
+    The index is sparse for time (every ``interval``-th entry's timestamp and
+    byte offset) and exact per target (byte offsets of every entry that names a
+    target), which is what ``get_recent_logs`` and ``get_user_stats`` need.
+    """
+    
+    def __init__(self, path: str, interval: int):
+        self.path = path
+        self.interval = interval
+        self.count = 0
+        self.size = 0
+        self.month: Optional[str] = None
+        self.sparse: List[list] = []  # [timestamp, offset] of entry 0, interval, 2*interval, ...
+        self.targets: Dict[int, List[int]] = {}
+    
+    @property
+    def number(self) -> int:
+        return int(os.path.basename(self.path)[4:10])
+    
+    def add(self, entry: Dict, offset: int, length: int):
+        """Record a newly appended entry in the index"""
+        if self.count == 0:
+            self.month = month_of(entry)
+        if self.count % self.interval == 0:
+            self.sparse.append([entry["timestamp"], offset])
+        
+        target_id = entry.get("target_id")
+        if target_id is not None:
+            self.targets.setdefault(target_id, []).append(offset)
+        
+        self.count += 1
+        self.size = offset + length
+    
+    def rebuild(self):
+        """Rebuild the index by scanning the segment file"""
+        self.count = 0
+        self.size = 0
+        self.month = None
+        self.sparse = []
+        self.targets = {}
+        
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn final write; it is truncated on the next append
+                self.add(json.loads(line), offset, len(line))
+                offset += len(line)
+    
+    def read_all(self) -> List[Dict]:
+        """Read every complete entry, oldest first"""
+        with open(self.path, 'rb') as f:
+            return [json.loads(line) for line in f.read(self.size).splitlines()]
+    
+    def read_at(self, offsets: Iterable[int]) -> Iterator[Dict]:
+        """Read the entries starting at the given byte offsets"""
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+    
+    def read_tail(self, limit: int) -> List[Dict]:
+        """Read the last ``limit`` entries, oldest first"""
+        if limit <= 0 or self.count == 0:
+            return []
+        
+        first = max(self.count - limit, 0)
+        start_point = first // self.interval
+        skip = first - start_point * self.interval
+        
+        entries = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.sparse[start_point][1])
+            for number, line in enumerate(f):
+                if number >= skip:
+                    entries.append(json.loads(line))
+                    if len(entries) == limit:
+                        break
+        return entries
+
+    def read_range(self, start: str, end: str) -> List[Dict]:
+        """Read the entries with start <= timestamp < end, oldest first"""
+        # Seek to the last sparse point at or before `start`
+        offset = 0
+        for timestamp, point in self.sparse:
+            if timestamp > start:
+                break
+            offset = point
+        
+        entries = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f.read(self.size - offset).splitlines():
+                entry = json.loads(line)
+                if entry["timestamp"] >= end:
+                    break
+                if entry["timestamp"] >= start:
+                    entries.append(entry)
+        return entries
+
+class MonthArchive:
+    """The cold tier for one calendar month: a gzip file plus a JSON index.
+    
+    Each archived segment is appended as a separate gzip member, which gzip
+    readers decompress as one stream. The index records the committed file size
+    (anything past it is a torn append and is cut off), the entry count, the
+    time span, which targets appear, and which segments have been archived so an
+    interrupted archival is not repeated.
+    """
+    
+    def __init__(self, log_dir: str, month: str):
+        self.month = month
+        self.path = os.path.join(log_dir, f"archive-{month}.jsonl.gz")
+        self.index_path = os.path.join(log_dir, f"archive-{month}.idx")
+        self.size = 0
+        self.count = 0
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+        self.targets: Dict[int, int] = {}
+        self.segments: List[int] = []
+        self.load_index()
+    
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except:
+            return
+        
+        self.size = data["size"]
+        self.count = data["count"]
+        self.first = data["first"]
+        self.last = data["last"]
+        self.targets = {int(target_id): count for target_id, count in data["targets"].items()}
+        self.segments = data["segments"]
+    
+    def save_index(self):
+        """Write the index atomically"""
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({
+                "size": self.size,
+                "count": self.count,
+                "first": self.first,
+                "last": self.last,
+                "targets": {str(target_id): count for target_id, count in self.targets.items()},
+                "segments": self.segments
+            }, f)
+        os.replace(temp_path, self.index_path)
+    
+    def append(self, entries: List[Dict], segment: int, fsync: bool = False):
+        """Compress entries from one segment onto the end of the archive"""
+        if segment in self.segments:
+            return
+        
+        data = gzip.compress(b"".join(
+            (json.dumps(entry, separators=(",", ":")) + "\n").encode() for entry in entries
+        ))
+        with open(self.path, 'ab') as f:
+            f.truncate(self.size)
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        
+        self.size += len(data)
+        self.count += len(entries)
+        if entries:
+            self.first = min(self.first or entries[0]["timestamp"], entries[0]["timestamp"])
+            self.last = max(self.last or entries[-1]["timestamp"], entries[-1]["timestamp"])
+        for entry in entries:
+            target_id = entry.get("target_id")
+            if target_id is not None:
+                self.targets[target_id] = self.targets.get(target_id, 0) + 1
+        self.segments.append(segment)
+        self.save_index()
+    
+    def read(self, target_id: Optional[int] = None) -> List[Dict]:
+        """Decompress every committed entry, oldest first, optionally for one target"""
+        if not self.size or (target_id is not None and target_id not in self.targets):
+            return []
+        with open(self.path, 'rb') as f:
+            lines = gzip.decompress(f.read(self.size)).splitlines()
+        
+        if target_id is None:
+            return [json.loads(line) for line in lines]
+        
+        # Only parse lines that can match; entries are written without spaces
+        needle = f'"target_id":{target_id}'.encode()
+        entries = []
+        for line in lines:
+            if needle in line:
+                entry = json.loads(line)
+                if entry.get("target_id") == target_id:
+                    entries.append(entry)
+        return entries
+
+class ActionLog:
+    """Tiered, append-only log of moderation actions for one guild.
+    
+    Entries are appended in O(1) to the active JSONL segment and never
+    rewritten. The newest ``hot_size`` entries are also kept in an in-memory
+    ring buffer, which serves the recent-entry queries behind ``/logs``,
+    ``/cases`` and ``/userinfo`` without touching disk. When the active segment
+    reaches ``segment_size`` bytes or a new calendar month starts, it is
+    compressed into that month's ``MonthArchive`` (the cold tier) and removed,
+    so years of history stay on disk in compact, time-partitioned files that
+    ``range`` can query.
+    """
+    
+    def __init__(self, log_dir: str = "data/actions", segment_size: int = 8 * 1024 * 1024,
+                 index_interval: int = 256, fsync: bool = False, hot_size: int = 1000):
+        self.log_dir = log_dir
+        self.segment_size = segment_size
+        self.index_interval = index_interval
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        
+        os.makedirs(log_dir, exist_ok=True)
+        self.archives: Dict[str, MonthArchive] = {}
+        segments = []
+        for name in sorted(os.listdir(log_dir)):
+            if name.startswith("seg-") and name.endswith(".jsonl"):
+                segments.append(Segment(os.path.join(log_dir, name), index_interval))
+            elif name.startswith("archive-") and name.endswith(".idx"):
+                month = name[len("archive-"):-len(".idx")]
+                self.archives[month] = MonthArchive(log_dir, month)
+        
+        # Only the newest segment stays active; anything older was sealed
+        # before an archival finished, so finish it now
+        for segment in segments[:-1]:
+            segment.rebuild()
+            self._archive(segment)
+        if segments:
+            self.active = segments[-1]
+            self.active.rebuild()
+        else:
+            self.active = self._new_segment(1)
+        self._file = self._open_active()
+        
+        self.hot: Deque[Dict] = deque(self._cold_recent(hot_size), maxlen=hot_size)
+        self.hot.reverse()
+    
+    def _new_segment(self, number: int) -> Segment:
+        path = os.path.join(self.log_dir, f"seg-{number:06d}.jsonl")
+        open(path, 'ab').close()
+        return Segment(path, self.index_interval)
+    
+    def _open_active(self):
+        """Open the active segment for appending, dropping any torn final line"""
+        f = open(self.active.path, 'r+b')
+        f.truncate(self.active.size)
+        f.seek(self.active.size)
+        return f
+    
+    def _archive(self, segment: Segment):
+        """Move a sealed segment into the month archives and delete it"""
+        by_month: Dict[str, List[Dict]] = {}
+        for entry in segment.read_all():
+            by_month.setdefault(month_of(entry), []).append(entry)
+        
+        for month, entries in by_month.items():
+            if month not in self.archives:
+                self.archives[month] = MonthArchive(self.log_dir, month)
+            self.archives[month].append(entries, segment.number, self.fsync)
+        os.remove(segment.path)
+        
+        # Segments sealed by older versions kept an index file beside them
+        index_path = segment.path[:-len(".jsonl")] + ".idx"
+        if os.path.exists(index_path):
+            os.remove(index_path)
+    
+    def _rotate(self):
+        """Archive the active segment and start a new one"""
+        self._file.close()
+        sealed = self.active
+        # Create the next segment first, so a crash mid-archival leaves the
+        # sealed one behind a newer segment and it is archived on reopen
+        self.active = self._new_segment(sealed.number + 1)
+        self._file = self._open_active()
+        self._archive(sealed)
+    
+    def __len__(self) -> int:
+        return sum(archive.count for archive in self.archives.values()) + self.active.count
+    
+    def append(self, entry: Dict):
+        """Append one entry to the log"""
+        self.extend([entry])
+    
+    def extend(self, entries: List[Dict]):
+        """Append several entries with one write per month they span"""
+        with self._lock:
+            for month, run in groupby(entries, key=month_of):
+                # A late entry from an earlier month stays in the active segment
+                if self.active.count and self.active.month < month:
+                    self._rotate()
+                
+                active = self.active
+                offset = active.size
+                chunk = bytearray()
+                for entry in run:
+                    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+                    active.add(entry, offset + len(chunk), len(line))
+                    chunk += line
+                    self.hot.append(entry)
+                
+                self._file.write(chunk)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                
+                if active.size >= self.segment_size:
+                    self._rotate()
+    
+    def _newest_archives(self) -> List[MonthArchive]:
+        return [self.archives[month] for month in sorted(self.archives, reverse=True)]
+    
+    def _cold_recent(self, limit: int, target_id: Optional[int] = None) -> List[Dict]:
+        """Read up to ``limit`` entries from disk, newest first"""
+        if target_id is None:
+            results = list(reversed(self.active.read_tail(limit)))
+        else:
+            offsets = self.active.targets.get(target_id, [])[-limit:]
+            results = list(reversed(list(self.active.read_at(offsets))))
+        
+        for archive in self._newest_archives():
+            remaining = limit - len(results)
+            if remaining <= 0:
+                break
+            entries = archive.read(target_id)
+            results.extend(reversed(entries[-remaining:]))
+        return results
+    
+    def recent(self, limit: int = 10, target_id: Optional[int] = None) -> List[Dict]:
+        """Return up to ``limit`` entries, newest first, optionally for one target"""
+        with self._lock:
+            complete = len(self.hot) == len(self)
+            if target_id is None:
+                if limit <= len(self.hot) or complete:
+                    return list(islice(reversed(self.hot), limit))
+            else:
+                results = list(islice(
+                    (entry for entry in reversed(self.hot) if entry.get("target_id") == target_id), limit
+                ))
+                if len(results) == limit or complete:
+                    return results
+            
+            self._file.flush()
+            return self._cold_recent(limit, target_id)
+    
+    def for_target(self, target_id: int) -> List[Dict]:
+        """Return every entry for a target, oldest first"""
+        with self._lock:
+            self._file.flush()
+            entries = []
+            for archive in reversed(self._newest_archives()):
+                entries.extend(archive.read(target_id))
+            
+            offsets = self.active.targets.get(target_id)
+            if offsets:
+                entries.extend(self.active.read_at(offsets))
+            return entries
+    
+    def range(self, start: str, end: str, target_id: Optional[int] = None) -> List[Dict]:
+        """Return entries with start <= timestamp < end (ISO strings), oldest first"""
+        with self._lock:
+            self._file.flush()
+            entries = []
+            for archive in reversed(self._newest_archives()):
+                if archive.last is None or archive.last < start or archive.first >= end:
+                    continue
+                entries.extend(entry for entry in archive.read(target_id) if start <= entry["timestamp"] < end)
+            
+            if self.active.count and self.active.sparse[0][0] < end:
+                active = self.active.read_range(start, end)
+                if target_id is not None:
+                    active = [entry for entry in active if entry.get("target_id") == target_id]
+                entries.extend(active)
+            return entries
+    
+    def close(self):
+        """Close the active segment"""
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priorities, most urgent first: removing content, then acting on members,
+# then telling people about it
+DELETE = 0
+ENFORCE = 1
+NOTIFY = 2
+PRIORITY_NAMES = ("delete", "enforce", "notify")
+
+class _Action:
+    """One queued side effect: `run(payload)` once a worker gets to it"""
+    __slots__ = ("priority", "key", "run", "payload", "queued_at")
+    
+    def __init__(self, priority: int, key: Optional[Hashable], run: Callable[[Any], Awaitable],
+                 payload: Any, queued_at: float):
+        self.priority = priority
+        self.key = key
+        self.run = run
+        self.payload = payload
+        self.queued_at = queued_at
+
+class _GuildQueue:
+    __slots__ = ("lanes", "keyed", "size")
+    
+    def __init__(self):
+        # One FIFO per priority
+        self.lanes = tuple(deque() for _ in PRIORITY_NAMES)
+        # Pending actions that later submissions can coalesce into, by key
+        self.keyed: Dict[Hashable, _Action] = {}
+        self.size = 0
+    
+    def pop(self) -> _Action:
+        for lane in self.lanes:
+            if lane:
+                self.size -= 1
+                return lane.popleft()
+        raise IndexError("pop from an empty guild queue")
+
+class ActionQueue:
+    """Per-guild bounded queues of moderation side effects, drained by a worker pool.
+    
+    Detection code calls ``submit`` and carries on; the REST calls, DMs and
+    log writes run later on one of ``workers`` tasks. Each guild's actions are
+    run one at a time, deletes before enforcement before notifications, and
+    guilds take turns so one guild under a raid cannot starve the rest.
+    
+    Actions submitted with a ``key`` coalesce with a pending action of the
+    same key: ``merge(old_payload, new_payload)`` combines them (say, message
+    IDs for one bulk delete), and without ``merge`` the later one is dropped
+    as a duplicate. Each guild holds at most ``max_pending`` actions; when it
+    is full a more urgent action pushes out the newest notification, and
+    anything else is dropped and counted.
+    """
+    
+    def __init__(self, workers: int = 4, max_pending: int = 500, window: int = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.clock = clock
+        # A guild is here while it has actions queued or running, and then it
+        # is either in `_ready` or held by exactly one worker
+        self._guilds: Dict[int, _GuildQueue] = {}
+        self._ready: "asyncio.Queue[int]" = asyncio.Queue()
+        self._tasks = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._unfinished = 0
+        
+        # Counters for monitoring
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.shed = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy = 0
+        self.high_water = 0
+        # Seconds actions waited in the queue, newest last
+        self.waits = deque(maxlen=window)
+    
+    def submit(self, guild_id: int, priority: int, run: Callable[[Any], Awaitable], payload: Any = None,
+               key: Optional[Hashable] = None, merge: Optional[Callable[[Any, Any], Any]] = None) -> bool:
+        """Queue `run(payload)` for the guild; returns False if it was dropped because the guild is backed up"""
+        queue = self._guilds.get(guild_id)
+        if queue is not None and key is not None:
+            pending = queue.keyed.get(key)
+            if pending is not None:
+                if merge is not None:
+                    pending.payload = merge(pending.payload, payload)
+                self.coalesced += 1
+                return True
+        
+        if queue is None:
+            queue = _GuildQueue()
+            self._guilds[guild_id] = queue
+            self._ready.put_nowait(guild_id)
+        elif queue.size >= self.max_pending and not self._shed(queue, priority):
+            self.dropped += 1
+            return False
+        
+        action = _Action(priority, key, run, payload, self.clock())
+        queue.lanes[priority].append(action)
+        queue.size += 1
+        if key is not None:
+            queue.keyed[key] = action
+        self.high_water = max(self.high_water, queue.size)
+        self.submitted += 1
+        self._unfinished += 1
+        self._idle.clear()
+        return True
+    
+    def _shed(self, queue: _GuildQueue, priority: int) -> bool:
+        """Make room for an action by dropping the newest less urgent one"""
+        for lane in reversed(queue.lanes[priority + 1:]):
+            if lane:
+                victim = lane.pop()
+                queue.size -= 1
+                if victim.key is not None and queue.keyed.get(victim.key) is victim:
+                    del queue.keyed[victim.key]
+                self.shed += 1
+                self._finish()
+                return True
+        return False
+    
+    def _finish(self):
+        self._unfinished -= 1
+        if not self._unfinished:
+            self._idle.set()
+    
+    async def _work(self):
+        while True:
+            guild_id = await self._ready.get()
+            queue = self._guilds[guild_id]
+            action = queue.pop()
+            if action.key is not None and queue.keyed.get(action.key) is action:
+                # Submissions from now on start a new action
+                del queue.keyed[action.key]
+            self.waits.append(self.clock() - action.queued_at)
+            
+            self.busy += 1
+            try:
+                await action.run(action.payload)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Auto-moderation {PRIORITY_NAMES[action.priority]} action failed in guild {guild_id}: {e}")
+            finally:
+                self.busy -= 1
+                # Unless stop() discarded the queue meanwhile
+                if self._guilds.get(guild_id) is queue:
+                    self._finish()
+                    if queue.size:
+                        self._ready.put_nowait(guild_id)
+                    else:
+                        del self._guilds[guild_id]
+    
+    def start(self):
+        """Start the workers on the running loop"""
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+    
+    def stop(self):
+        """Stop the workers; anything still queued is discarded"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self.dropped += sum(queue.size for queue in self._guilds.values())
+        self._guilds.clear()
+        self._ready = asyncio.Queue()
+        self._unfinished = 0
+        self._idle.set()
+    
+    async def join(self):
+        """Wait until every queued action has run"""
+        await self._idle.wait()
+    
+    @property
+    def pending(self) -> int:
+        """Actions waiting for a worker, across all guilds"""
+        return sum(queue.size for queue in self._guilds.values())
+    
+    def wait_percentile(self, percent: float) -> float:
+        """Queue wait in seconds at the given percentile of the recent window"""
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+    
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "guilds": len(self._guilds),
+            "busy": self.busy,
+            "workers": len(self._tasks),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "shed": self.shed,
+            "high_water": self.high_water,
+            "wait_p50_ms": self.wait_percentile(50) * 1000,
+            "wait_p99_ms": self.wait_percentile(99) * 1000
+        }
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Dict, Iterable, List, Optional, Set
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backup_blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS backup_manifest (
+    id TEXT PRIMARY KEY,
+    guild_id INTEGER NOT NULL,
+    guild_name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    channel_count INTEGER NOT NULL,
+    role_count INTEGER NOT NULL,
+    category_count INTEGER NOT NULL,
+    items BLOB NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_backup_manifest_guild ON backup_manifest (guild_id, timestamp);
+"""
+
+# Sections of a backup that are split into one blob per item
+SECTIONS = ("categories", "channels", "roles")
+
+# Item hashes per list blob; a change to one item only rewrites its chunk
+CHUNK_SIZE = 32
+
+# Columns returned when listing backups; never includes the snapshot itself
+MANIFEST_COLUMNS = "id, guild_id, guild_name, timestamp, channel_count, role_count, category_count, raw_size, stored_size"
+
+def encode(obj) -> bytes:
+    """Canonical JSON encoding, so equal content always hashes the same"""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+class BackupStore:
+    """Content-addressed, compressed storage for server backups.
+    
+    Each category, channel and role in a snapshot is stored as a zlib-compressed
+    blob keyed by the SHA-256 of its canonical JSON, and permission overwrites
+    are split into blobs of their own. The item hashes of each section are
+    grouped into chunks of ``CHUNK_SIZE``, which are blobs too, and a snapshot
+    is a manifest row listing its chunk hashes. Anything unchanged since an
+    earlier backup, in any guild, is therefore stored once. Listing reads only
+    the manifest columns.
+    
+    The store shares the Database's connection; callers hold its lock and, for
+    ``store``, an open transaction.
+    """
+    
+    def __init__(self, conn: sqlite3.Connection, level: int = 9):
+        self.conn = conn
+        self.level = level
+    
+    def _put(self, obj, blobs: Dict[str, bytes]) -> str:
+        """Queue an object for storage and return its hash"""
+        raw = encode(obj)
+        digest = hashlib.sha256(raw).hexdigest()
+        blobs.setdefault(digest, raw)
+        return digest
+    
+    def _put_item(self, item: Dict, blobs: Dict[str, bytes]) -> str:
+        """Queue one category, channel or role, with its overwrites as a separate blob"""
+        if "overwrites" in item:
+            item = dict(item, overwrites=self._put(item["overwrites"], blobs))
+        return self._put(item, blobs)
+    
+    def _existing(self, hashes: Iterable[str]) -> Set[str]:
+        """Return which of the given hashes are already stored"""
+        hashes = list(hashes)
+        found = set()
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT hash FROM backup_blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(row[0] for row in rows)
+        return found
+    
+    def _fetch(self, hashes: Iterable[str]) -> Dict[str, object]:
+        """Load and decode the blobs with the given hashes"""
+        hashes = list(set(hashes))
+        blobs = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT hash, data FROM backup_blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for row in rows:
+                blobs[row[0]] = json.loads(zlib.decompress(row[1]))
+        return blobs
+    
+    def store(self, backup_id: str, backup: Dict) -> int:
+        """Store a snapshot under ``backup_id`` and return the bytes newly written"""
+        blobs: Dict[str, bytes] = {}
+        items = {}
+        for section in SECTIONS:
+            hashes = [self._put_item(item, blobs) for item in backup[section]]
+            items[section] = [
+                self._put(hashes[start:start + CHUNK_SIZE], blobs) for start in range(0, len(hashes), CHUNK_SIZE)
+            ]
+        
+        stored_size = 0
+        existing = self._existing(blobs)
+        for digest, raw in blobs.items():
+            if digest in existing:
+                continue
+            data = zlib.compress(raw, self.level)
+            self.conn.execute("INSERT INTO backup_blobs (hash, data) VALUES (?, ?)", (digest, data))
+            stored_size += len(data)
+        
+        manifest = zlib.compress(encode(items), self.level)
+        stored_size += len(manifest)
+        self.conn.execute(
+            "INSERT INTO backup_manifest (id, guild_id, guild_name, timestamp, channel_count, role_count, "
+            "category_count, items, raw_size, stored_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (backup_id, backup["guild_id"], backup["guild_name"], backup["timestamp"],
+             len(backup["channels"]), len(backup["roles"]), len(backup["categories"]),
+             manifest, len(encode(backup)), stored_size)
+        )
+        return stored_size
+    
+    def load(self, backup_id: str) -> Optional[Dict]:
+        """Reassemble a snapshot, or return None if there is no such backup"""
+        row = self.conn.execute(
+            "SELECT id, guild_id, guild_name, timestamp, items FROM backup_manifest WHERE id = ?", (backup_id,)
+        ).fetchone()
+        if not row:
+            return None
+        
+        chunks = json.loads(zlib.decompress(row["items"]))
+        lists = self._fetch(digest for section in SECTIONS for digest in chunks[section])
+        items = {section: [digest for chunk in chunks[section] for digest in lists[chunk]] for section in SECTIONS}
+        blobs = self._fetch(digest for section in SECTIONS for digest in items[section])
+        overwrites = self._fetch(
+            blobs[digest]["overwrites"] for section in SECTIONS for digest in items[section]
+            if "overwrites" in blobs[digest]
+        )
+        
+        backup = {
+            "id": row["id"],
+            "guild_id": row["guild_id"],
+            "guild_name": row["guild_name"],
+            "timestamp": row["timestamp"]
+        }
+        for section in SECTIONS:
+            backup[section] = []
+            for digest in items[section]:
+                item = dict(blobs[digest])
+                if "overwrites" in item:
+                    item["overwrites"] = overwrites[item["overwrites"]]
+                backup[section].append(item)
+        return backup
+    
+    def list(self, guild_id: int) -> List[Dict]:
+        """Return the manifest entries for a guild's backups, oldest first"""
+        rows = self.conn.execute(
+            f"SELECT {MANIFEST_COLUMNS} FROM backup_manifest WHERE guild_id = ? ORDER BY timestamp", (guild_id,)
+        )
+        return [dict(row) for row in rows]
+    
+    def stats(self) -> Dict:
+        """Return blob and snapshot totals for the whole store"""
+        blobs = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM backup_blobs").fetchone()
+        manifest = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(items)), 0) FROM backup_manifest"
+        ).fetchone()
+        return {
+            "backups": manifest[0],
+            "blobs": blobs[0],
+            "raw_bytes": manifest[1],
+            "stored_bytes": blobs[1] + manifest[2]
+        }
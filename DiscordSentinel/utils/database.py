@@ -1,147 +1,595 @@
+import asyncio
 import json
+import logging
 import os
+import sqlite3
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from utils.action_log import ActionLog
+from utils.backup_store import BackupStore, SCHEMA as BACKUP_SCHEMA
+from utils.group_commit import GroupCommitWriter
+
+logger = logging.getLogger(__name__)
+
+# Legacy warnings and logs were never tagged with a guild; the migrator files
+# them under this ID so they stay in storage without leaking into real guilds,
+# until Database.adopt_legacy hands them to the guild they came from
+LEGACY_GUILD = 0
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER NOT NULL DEFAULT 0,
+    user_id INTEGER NOT NULL,
+    moderator_id INTEGER,
+    reason TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_guild ON warnings (guild_id, user_id, id);
+
+CREATE TABLE IF NOT EXISTS quarantine (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+class GuildPartition:
+    """Cached warnings and quarantine records for one guild.
+    
+    Records are held in hash indexes (warnings by ID and by user, quarantine
+    records by user) that every mutation keeps in step, so lookups cost O(1)
+    or O(k) in the number of matching records rather than a scan.
+    """
+    
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.warnings: Dict[int, Dict] = {}
+        self.warnings_by_user: Dict[int, List[Dict]] = {}
+        self.quarantined: Dict[int, Dict] = {}
+        # Future of the last change queued for this guild; the partition is
+        # only evicted once it has been committed
+        self.last_write: Optional[Future] = None
+    
+    @property
+    def evictable(self) -> bool:
+        return self.last_write is None or self.last_write.done()
+    
+    def add_warning(self, warning: Dict):
+        """Index a warning; warnings must be added in ID order"""
+        self.warnings[warning["id"]] = warning
+        self.warnings_by_user.setdefault(warning["user_id"], []).append(warning)
+    
+    def user_warnings(self, user_id: int) -> List[Dict]:
+        """Return a user's warnings, oldest first"""
+        return list(self.warnings_by_user.get(user_id, ()))
+    
+    def remove_warning(self, warning_id: int) -> Optional[Dict]:
+        """Remove a warning by ID, returning it if it existed"""
+        warning = self.warnings.pop(warning_id, None)
+        if warning is not None:
+            user_warnings = self.warnings_by_user[warning["user_id"]]
+            user_warnings.remove(warning)
+            if not user_warnings:
+                del self.warnings_by_user[warning["user_id"]]
+        return warning
+    
+    def remove_user_warnings(self, user_id: int) -> List[Dict]:
+        """Remove and return all of a user's warnings"""
+        removed = self.warnings_by_user.pop(user_id, [])
+        for warning in removed:
+            del self.warnings[warning["id"]]
+        return removed
 
 class Database:
-    def __init__(self):
-        self.warnings_file = "data/warnings.json"
-        self.logs_file = "data/logs.json"
-        self.quarantine_file = "data/quarantine.json"
-        self.backups_file = "data/backups.json"
-        self.config_file = "data/config.json"
-        self.ensure_data_files()
-    
-    def ensure_data_files(self):
-        """Ensure data directory and files exist"""
-        os.makedirs("data", exist_ok=True)
+    """Storage for warnings, logs, quarantine records, backups and settings.
+    
+    The bot owns a single instance (``bot.db``) that every cog shares. Data is
+    partitioned by guild: warnings and quarantine records are loaded into a
+    ``GuildPartition`` the first time a guild is used, and the least recently
+    used partitions beyond ``max_guilds`` are evicted, so memory and query cost
+    follow the active guilds rather than the whole fleet. Each guild also has
+    its own tiered ``ActionLog`` under ``data/actions/<guild_id>`` (recent
+    entries in memory, older months in compressed archives), opened on demand
+    and closed when more than ``max_open_logs`` are open.
+    
+    Mutations update memory immediately and are handed to a group-commit writer,
+    which writes them to SQLite in one transaction per batch; moderation logs go
+    through a second writer into the action logs. A batch is committed every
+    ``commit_delay`` seconds or ``commit_batch`` records, so an event storm costs
+    one write per batch instead of one per event.
+    """
+    
+    def __init__(self, db_file: str = "data/aegis.db", data_dir: str = "data",
+                 commit_delay: float = 0.005, commit_batch: int = 1000,
+                 max_guilds: int = 128, max_open_logs: int = 64):
+        self.data_dir = data_dir
+        self.db_file = db_file
+        self.log_dir = os.path.join(data_dir, "actions")
+        self.max_guilds = max_guilds
+        self.max_open_logs = max_open_logs
         
-        if not os.path.exists(self.warnings_file):
-            with open(self.warnings_file, 'w') as f:
-                json.dump({"warnings": [], "next_id": 1}, f)
+        # Legacy JSON files, only read by the one-shot migrator
+        self.warnings_file = os.path.join(data_dir, "warnings.json")
+        self.logs_file = os.path.join(data_dir, "logs.json")
+        self.quarantine_file = os.path.join(data_dir, "quarantine.json")
+        self.backups_file = os.path.join(data_dir, "backups.json")
+        self.config_file = os.path.join(data_dir, "config.json")
         
-        if not os.path.exists(self.logs_file):
-            with open(self.logs_file, 'w') as f:
-                json.dump({"logs": []}, f)
+        # One connection shared by every caller; the lock serialises access so
+        # the instance can be used from worker threads as well as the loop
+        self._lock = threading.RLock()
+        self.guilds: "OrderedDict[int, GuildPartition]" = OrderedDict()
         
-        if not os.path.exists(self.quarantine_file):
-            with open(self.quarantine_file, 'w') as f:
-                json.dump({"quarantined": []}, f)
+        # Open action logs, guarded separately so log commits never wait on SQLite
+        self._log_lock = threading.RLock()
+        self._logs: "OrderedDict[int, ActionLog]" = OrderedDict()
         
-        if not os.path.exists(self.backups_file):
-            with open(self.backups_file, 'w') as f:
-                json.dump({"backups": [], "next_id": 1}, f)
+        self.conn = self.connect()
+        self.backups = BackupStore(self.conn)
+        self.migrate_action_log()
+        self.migrate_from_json()
+        self.migrate_logs_table()
+        self.migrate_backups_table()
+        self.load()
         
-        if not os.path.exists(self.config_file):
-            with open(self.config_file, 'w') as f:
-                json.dump({"settings": {}}, f)
+        self.writer = GroupCommitWriter(self._commit, commit_delay, commit_batch, name="db-commit")
+        self.log_writer = GroupCommitWriter(self._commit_logs, commit_delay, commit_batch, name="log-commit")
     
-    def load_warnings(self) -> Dict:
-        """Load warnings from file"""
-        try:
-            with open(self.warnings_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {"warnings": [], "next_id": 1}
+    def connect(self) -> sqlite3.Connection:
+        """Open the SQLite database in WAL mode and create the schema"""
+        db_dir = os.path.dirname(self.db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Commits are batched, so a full sync per transaction is affordable
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        self.migrate_schema(conn)
+        conn.executescript(SCHEMA)
+        conn.executescript(BACKUP_SCHEMA)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return conn
     
-    def save_warnings(self, data: Dict):
-        """Save warnings to file"""
-        with open(self.warnings_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    def load(self):
+        """Load global state from SQLite and drop every cached guild partition"""
+        with self._lock:
+            self.guilds.clear()
+            self.settings = {
+                row["key"]: json.loads(row["value"]) for row in self.conn.execute("SELECT key, value FROM settings")
+            }
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_warning_id'").fetchone()
+            self.next_warning_id = row["value"] if row else 1
     
-    def load_logs(self) -> Dict:
-        """Load logs from file"""
-        try:
-            with open(self.logs_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {"logs": []}
+    def _guild(self, guild_id: int) -> GuildPartition:
+        """Return a guild's partition, loading it and evicting cold ones if needed"""
+        with self._lock:
+            partition = self.guilds.get(guild_id)
+            if partition is not None:
+                self.guilds.move_to_end(guild_id)
+                return partition
+            
+            partition = GuildPartition(guild_id)
+            for row in self.conn.execute(
+                "SELECT id, guild_id, user_id, moderator_id, reason, timestamp FROM warnings "
+                "WHERE guild_id = ? ORDER BY id",
+                (guild_id,)
+            ):
+                partition.add_warning(dict(row))
+            for row in self.conn.execute(
+                "SELECT user_id, data FROM quarantine WHERE guild_id = ? ORDER BY rowid", (guild_id,)
+            ):
+                partition.quarantined[row["user_id"]] = json.loads(row["data"])
+            self.guilds[guild_id] = partition
+            
+            # Evict the least recently used guilds that have nothing left to commit
+            excess = len(self.guilds) - self.max_guilds
+            for cold_id in list(self.guilds)[:-1]:
+                if excess <= 0:
+                    break
+                if self.guilds[cold_id].evictable:
+                    del self.guilds[cold_id]
+                    excess -= 1
+            return partition
     
-    def save_logs(self, data: Dict):
-        """Save logs to file"""
-        with open(self.logs_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    def action_log(self, guild_id: int) -> ActionLog:
+        """Return a guild's action log, opening it and closing cold ones if needed"""
+        with self._log_lock:
+            log = self._logs.get(guild_id)
+            if log is not None:
+                self._logs.move_to_end(guild_id)
+                return log
+            
+            log = ActionLog(os.path.join(self.log_dir, str(guild_id)), fsync=True)
+            self._logs[guild_id] = log
+            while len(self._logs) > self.max_open_logs:
+                _, cold = self._logs.popitem(last=False)
+                cold.close()
+            return log
     
-    def add_warning(self, user_id: int, moderator_id: int, reason: str) -> int:
-        """Add a warning for a user"""
-        data = self.load_warnings()
-        warning_id = data["next_id"]
+    def _commit_logs(self, records: List[tuple]):
+        """Append a batch of (guild_id, entry) records to the guilds' action logs"""
+        by_guild: Dict[int, List[Dict]] = {}
+        for guild_id, entry in records:
+            by_guild.setdefault(guild_id, []).append(entry)
         
-        warning = {
-            "id": warning_id,
-            "user_id": user_id,
-            "moderator_id": moderator_id,
-            "reason": reason,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        with self._log_lock:
+            for guild_id, entries in by_guild.items():
+                self.action_log(guild_id).extend(entries)
+    
+    def _commit(self, changes: List[tuple]):
+        """Write a batch of (section, key, value) changes in one transaction"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for section, key, value in changes:
+                    if section == "warnings":
+                        if value is None:
+                            self.conn.execute("DELETE FROM warnings WHERE id = ?", (key,))
+                        else:
+                            self.conn.execute(
+                                "INSERT OR REPLACE INTO warnings (id, guild_id, user_id, moderator_id, reason, timestamp) "
+                                "VALUES (:id, :guild_id, :user_id, :moderator_id, :reason, :timestamp)",
+                                value
+                            )
+                    elif section == "quarantine":
+                        if value is None:
+                            self.conn.execute("DELETE FROM quarantine WHERE guild_id = ? AND user_id = ?", key)
+                        else:
+                            self.conn.execute(
+                                "INSERT OR REPLACE INTO quarantine (guild_id, user_id, data) VALUES (?, ?, ?)",
+                                (*key, json.dumps(value))
+                            )
+                    elif section == "settings":
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value))
+                        )
+                    elif section == "meta":
+                        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
+    
+    def flush(self):
+        """Commit every queued change and wait until it is on disk"""
+        self.writer.flush()
+        self.log_writer.flush()
+    
+    def close(self):
+        """Commit queued changes and close the database"""
+        self.writer.close()
+        self.log_writer.close()
+        with self._lock:
+            self.conn.close()
+        with self._log_lock:
+            for log in self._logs.values():
+                log.close()
+            self._logs.clear()
+    
+    def _next_id(self, name: str) -> int:
+        """Reserve the next value of a named counter (caller holds a transaction)"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (name,)).fetchone()
+        next_id = row["value"] if row else 1
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (name, next_id + 1)
+        )
+        return next_id
+    
+    # Migrations
+    def migrate_schema(self, conn: sqlite3.Connection):
+        """Bring a database created by an older version up to SCHEMA_VERSION"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_warnings = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'warnings'"
+        ).fetchone()
+        
+        if version < 1 and has_warnings:
+            # Version 1 partitions warnings by guild
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(warnings)")]
+            if "guild_id" not in columns:
+                conn.execute(f"ALTER TABLE warnings ADD COLUMN guild_id INTEGER NOT NULL DEFAULT {LEGACY_GUILD}")
+            conn.execute("DROP INDEX IF EXISTS idx_warnings_user")
+    
+    def migrate_action_log(self) -> bool:
+        """Move a pre-partitioning action log into the legacy guild's directory"""
+        if not os.path.isdir(self.log_dir):
+            return False
+        
+        legacy = [name for name in os.listdir(self.log_dir) if name.startswith("seg-")]
+        if not legacy:
+            return False
         
-        data["warnings"].append(warning)
-        data["next_id"] += 1
+        legacy_dir = os.path.join(self.log_dir, str(LEGACY_GUILD))
+        os.makedirs(legacy_dir, exist_ok=True)
+        for name in legacy:
+            shutil.move(os.path.join(self.log_dir, name), os.path.join(legacy_dir, name))
+        return True
+    
+    def has_legacy(self) -> bool:
+        """Whether warnings or logs are still filed under LEGACY_GUILD"""
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM warnings WHERE guild_id = ? LIMIT 1", (LEGACY_GUILD,)).fetchone():
+                return True
+        return os.path.isdir(os.path.join(self.log_dir, str(LEGACY_GUILD))) and len(self.action_log(LEGACY_GUILD)) > 0
+    
+    def adopt_legacy(self, guild_id: int) -> Tuple[int, int]:
+        """File the warnings and logs kept under LEGACY_GUILD under a real guild; returns (warnings, logs) moved"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, guild_id, user_id, moderator_id, reason, timestamp FROM warnings "
+                "WHERE guild_id = ? ORDER BY id",
+                (LEGACY_GUILD,)
+            ).fetchall()
+            self.conn.execute("UPDATE warnings SET guild_id = ? WHERE guild_id = ?", (guild_id, LEGACY_GUILD))
+            self.guilds.pop(LEGACY_GUILD, None)
+            
+            # A loaded partition takes the warnings in too, keeping its indexes in ID order
+            partition = self.guilds.get(guild_id)
+            if partition is not None and rows:
+                merged = [{**dict(row), "guild_id": guild_id} for row in rows] + list(partition.warnings.values())
+                partition.warnings.clear()
+                partition.warnings_by_user.clear()
+                for warning in sorted(merged, key=lambda warning: warning["id"]):
+                    partition.add_warning(warning)
         
-        self.save_warnings(data)
+        legacy_dir = os.path.join(self.log_dir, str(LEGACY_GUILD))
+        if not os.path.isdir(legacy_dir):
+            return len(rows), 0
+        
+        # The log is append-only and ordered by time, so both guilds' entries are
+        # rewritten into a fresh log that replaces the guild's own
+        with self._log_lock:
+            legacy = self.action_log(LEGACY_GUILD).range("", "\uffff")
+            current = self.action_log(guild_id).range("", "\uffff")
+            for log_id in (LEGACY_GUILD, guild_id):
+                log = self._logs.pop(log_id, None)
+                if log is not None:
+                    log.close()
+            if not legacy:
+                shutil.rmtree(legacy_dir)
+                return len(rows), 0
+            
+            # Entries already present (from an interrupted earlier run) are not doubled
+            merged = {json.dumps(entry, sort_keys=True): entry for entry in legacy + current}
+            guild_dir = os.path.join(self.log_dir, str(guild_id))
+            fresh_dir = guild_dir + ".adopting"
+            shutil.rmtree(fresh_dir, ignore_errors=True)
+            fresh = ActionLog(fresh_dir, fsync=True)
+            fresh.extend(sorted(merged.values(), key=lambda entry: entry["timestamp"]))
+            fresh.close()
+            
+            old_dir = guild_dir + ".old"
+            os.replace(guild_dir, old_dir)
+            os.replace(fresh_dir, guild_dir)
+            shutil.rmtree(legacy_dir)
+            shutil.rmtree(old_dir)
+            return len(rows), len(legacy)
+    
+    # Migration from the legacy JSON files
+    def _read_json(self, path: str) -> Optional[Dict]:
+        """Read a legacy JSON file, returning None if it is missing or corrupt"""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except:
+            return None
+    
+    def migrate_from_json(self) -> bool:
+        """Import data/*.json into SQLite once; returns True if a migration ran"""
+        with self._lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return False
+            
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                warnings = self._read_json(self.warnings_file) or {}
+                for warning in warnings.get("warnings", []):
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO warnings (id, user_id, moderator_id, reason, timestamp) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (warning["id"], warning["user_id"], warning.get("moderator_id"),
+                         warning.get("reason", ""), warning["timestamp"])
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_warning_id', ?)",
+                    (warnings.get("next_id", 1),)
+                )
+                
+                # The action log is not transactional, so only import into an empty one
+                logs = self._read_json(self.logs_file) or {}
+                legacy_log = self.action_log(LEGACY_GUILD)
+                if not len(legacy_log):
+                    legacy_log.extend([
+                        {
+                            "action": log["action"],
+                            "moderator_id": log.get("moderator_id"),
+                            "target_id": log.get("target_id"),
+                            "reason": log.get("reason", ""),
+                            "timestamp": log["timestamp"]
+                        }
+                        for log in logs.get("logs", [])
+                    ])
+                
+                quarantine = self._read_json(self.quarantine_file) or {}
+                for record in quarantine.get("quarantined", []):
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO quarantine (guild_id, user_id, data) VALUES (?, ?, ?)",
+                        (record["guild_id"], record["user_id"], json.dumps(record))
+                    )
+                
+                backups = self._read_json(self.backups_file) or {}
+                for backup in backups.get("backups", []):
+                    if not self.conn.execute("SELECT 1 FROM backup_manifest WHERE id = ?", (backup["id"],)).fetchone():
+                        self.backups.store(backup["id"], backup)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_backup_id', ?)",
+                    (backups.get("next_id", 1),)
+                )
+                
+                config = self._read_json(self.config_file) or {}
+                for key, value in config.get("settings", {}).items():
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value))
+                    )
+                
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', 1)")
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
+            return True
+    
+    def migrate_logs_table(self) -> bool:
+        """Move logs from the old SQLite logs table into the action log"""
+        with self._lock:
+            if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'logs'").fetchone():
+                return False
+            
+            rows = self.conn.execute(
+                "SELECT action, moderator_id, target_id, reason, timestamp FROM logs ORDER BY id"
+            ).fetchall()
+            legacy_log = self.action_log(LEGACY_GUILD)
+            if not len(legacy_log):
+                legacy_log.extend([dict(row) for row in rows])
+            self.conn.execute("DROP TABLE logs")
+            return True
+    
+    def migrate_backups_table(self) -> bool:
+        """Move backups from the old SQLite backups table into the backup store"""
+        with self._lock:
+            if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'backups'").fetchone():
+                return False
+            
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in self.conn.execute("SELECT id, data FROM backups ORDER BY timestamp").fetchall():
+                    if not self.conn.execute("SELECT 1 FROM backup_manifest WHERE id = ?", (row["id"],)).fetchone():
+                        self.backups.store(row["id"], json.loads(row["data"]))
+                self.conn.execute("DROP TABLE backups")
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
+            return True
+    
+    # Warning methods
+    def add_warning(self, user_id: int, moderator_id: int, reason: str, guild_id: int) -> int:
+        """Add a warning for a user, returning its ID once it is on disk"""
+        warning_id, committed = self.submit_warning(user_id, moderator_id, reason, guild_id)
+        committed.result()
         return warning_id
     
-    def get_warnings(self, user_id: int) -> List[Dict]:
-        """Get all warnings for a user"""
-        data = self.load_warnings()
-        return [w for w in data["warnings"] if w["user_id"] == user_id]
+    def submit_warning(self, user_id: int, moderator_id: int, reason: str, guild_id: int) -> Tuple[int, Future]:
+        """Queue a warning, returning its ID and a Future that resolves once it is on disk"""
+        with self._lock:
+            partition = self._guild(guild_id)
+            warning_id = self.next_warning_id
+            self.next_warning_id += 1
+            
+            warning = {
+                "id": warning_id,
+                "guild_id": guild_id,
+                "user_id": user_id,
+                "moderator_id": moderator_id,
+                "reason": reason,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+            partition.add_warning(warning)
+            self.writer.submit(("meta", "next_warning_id", self.next_warning_id))
+            committed = partition.last_write = self.writer.submit(("warnings", warning_id, warning))
+        return warning_id, committed
     
-    def get_warning_count(self, user_id: int) -> int:
-        """Get the number of warnings for a user"""
-        return len(self.get_warnings(user_id))
+    def get_warnings(self, user_id: int, guild_id: int) -> List[Dict]:
+        """Get all warnings for a user in a guild"""
+        with self._lock:
+            return self._guild(guild_id).user_warnings(user_id)
     
-    def remove_warning(self, warning_id: int) -> bool:
+    def get_warning_count(self, user_id: int, guild_id: int) -> int:
+        """Get the number of warnings for a user in a guild"""
+        with self._lock:
+            return len(self._guild(guild_id).warnings_by_user.get(user_id, ()))
+    
+    def remove_warning(self, warning_id: int, guild_id: int) -> bool:
         """Remove a warning by ID"""
-        data = self.load_warnings()
-        original_count = len(data["warnings"])
-        data["warnings"] = [w for w in data["warnings"] if w["id"] != warning_id]
-        
-        if len(data["warnings"]) < original_count:
-            self.save_warnings(data)
-            return True
+        with self._lock:
+            partition = self._guild(guild_id)
+            if partition.remove_warning(warning_id):
+                partition.last_write = self.writer.submit(("warnings", warning_id, None))
+                return True
         return False
     
-    def log_action(self, action: str, moderator_id: Optional[int], target_id: Optional[int], reason: str):
-        """Log a moderation action"""
-        data = self.load_logs()
-        
-        log_entry = {
+    def clear_user_warnings(self, user_id: int, guild_id: int) -> int:
+        """Clear all warnings for a user in a guild and return count of removed warnings"""
+        with self._lock:
+            partition = self._guild(guild_id)
+            removed = partition.remove_user_warnings(user_id)
+            for warning in removed:
+                partition.last_write = self.writer.submit(("warnings", warning["id"], None))
+        return len(removed)
+    
+    # Log methods
+    def log_action(self, action: str, moderator_id: Optional[int], target_id: Optional[int], reason: str,
+                   guild_id: int):
+        """Queue a moderation action for the next log commit"""
+        self.log_writer.submit((guild_id, {
             "action": action,
             "moderator_id": moderator_id,
             "target_id": target_id,
             "reason": reason,
             "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        data["logs"].append(log_entry)
-        
-        # Keep only last 1000 logs to prevent file from growing too large
-        if len(data["logs"]) > 1000:
-            data["logs"] = data["logs"][-1000:]
-        
-        self.save_logs(data)
+        }))
     
-    def get_recent_logs(self, limit: int = 10, user_id: Optional[int] = None) -> List[Dict]:
-        """Get recent moderation logs"""
-        data = self.load_logs()
-        logs = data["logs"]
+    def get_recent_logs(self, guild_id: int, limit: int = 10, user_id: Optional[int] = None) -> List[Dict]:
+        """Get recent moderation logs for a guild"""
+        self.log_writer.flush()
         
-        if user_id:
-            logs = [log for log in logs if log.get("target_id") == user_id]
+        # Most recent logs first
+        with self._log_lock:
+            return self.action_log(guild_id).recent(limit, user_id if user_id else None)
+    
+    def get_logs_between(self, guild_id: int, start: str, end: str, user_id: Optional[int] = None) -> List[Dict]:
+        """Get a guild's logs with start <= timestamp < end (ISO 8601), oldest first"""
+        self.log_writer.flush()
         
-        # Return most recent logs first
-        return logs[-limit:][::-1]
+        with self._log_lock:
+            return self.action_log(guild_id).range(start, end, user_id)
     
-    def get_user_stats(self, user_id: int) -> Dict:
-        """Get statistics for a user"""
-        warnings = self.get_warnings(user_id)
+    def get_user_stats(self, user_id: int, guild_id: int) -> Dict:
+        """Get statistics for a user in a guild"""
+        warnings = self.get_warnings(user_id, guild_id)
+        self.log_writer.flush()
         
-        # Count different types of actions
-        data = self.load_logs()
-        user_logs = [log for log in data["logs"] if log.get("target_id") == user_id]
+        with self._log_lock:
+            logs = self.action_log(guild_id).for_target(user_id)
         
+        # Count different types of actions
         action_counts = {}
-        for log in user_logs:
+        for log in logs:
             action = log["action"]
             action_counts[action] = action_counts.get(action, 0) + 1
         
@@ -151,134 +599,189 @@ class Database:
             "last_warning": warnings[-1]["timestamp"] if warnings else None
         }
     
-    def clear_user_warnings(self, user_id: int) -> int:
-        """Clear all warnings for a user and return count of removed warnings"""
-        data = self.load_warnings()
-        original_count = len(data["warnings"])
-        data["warnings"] = [w for w in data["warnings"] if w["user_id"] != user_id]
-        removed_count = original_count - len(data["warnings"])
-        
-        if removed_count > 0:
-            self.save_warnings(data)
-        
-        return removed_count
-    
     # Quarantine methods
-    def load_quarantine(self) -> Dict:
-        """Load quarantine data from file"""
-        try:
-            with open(self.quarantine_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {"quarantined": []}
-    
-    def save_quarantine(self, data: Dict):
-        """Save quarantine data to file"""
-        with open(self.quarantine_file, 'w') as f:
-            json.dump(data, f, indent=2)
-    
     def add_quarantine(self, quarantine_data: Dict):
         """Add a quarantine record"""
-        data = self.load_quarantine()
-        data["quarantined"].append(quarantine_data)
-        self.save_quarantine(data)
+        with self._lock:
+            # The first record wins while a user is quarantined, so their
+            # original roles are not overwritten by a repeated quarantine
+            if self.get_quarantine(quarantine_data["user_id"], quarantine_data["guild_id"]):
+                return
+            
+            partition = self._guild(quarantine_data["guild_id"])
+            partition.quarantined[quarantine_data["user_id"]] = quarantine_data
+            partition.last_write = self.writer.submit(
+                ("quarantine", (quarantine_data["guild_id"], quarantine_data["user_id"]), quarantine_data)
+            )
     
     def get_quarantine(self, user_id: int, guild_id: int) -> Optional[Dict]:
         """Get quarantine data for a user"""
-        data = self.load_quarantine()
-        for record in data["quarantined"]:
-            if record["user_id"] == user_id and record["guild_id"] == guild_id:
-                return record
-        return None
+        with self._lock:
+            return self._guild(guild_id).quarantined.get(user_id)
     
     def remove_quarantine(self, user_id: int, guild_id: int) -> bool:
         """Remove a quarantine record"""
-        data = self.load_quarantine()
-        original_count = len(data["quarantined"])
-        data["quarantined"] = [
-            record for record in data["quarantined"]
-            if not (record["user_id"] == user_id and record["guild_id"] == guild_id)
-        ]
-        
-        if len(data["quarantined"]) < original_count:
-            self.save_quarantine(data)
-            return True
+        with self._lock:
+            partition = self._guild(guild_id)
+            if partition.quarantined.pop(user_id, None) is not None:
+                partition.last_write = self.writer.submit(("quarantine", (guild_id, user_id), None))
+                return True
         return False
     
     def get_all_quarantined(self, guild_id: int) -> List[Dict]:
         """Get all quarantined users in a guild"""
-        data = self.load_quarantine()
-        return [record for record in data["quarantined"] if record["guild_id"] == guild_id]
-    
-    # Backup methods
-    def load_backups(self) -> Dict:
-        """Load backup data from file"""
-        try:
-            with open(self.backups_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {"backups": [], "next_id": 1}
-    
-    def save_backups(self, data: Dict):
-        """Save backup data to file"""
-        with open(self.backups_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        with self._lock:
+            return list(self._guild(guild_id).quarantined.values())
     
+    # Backup methods (written through immediately to the content-addressed store)
     def store_backup(self, backup_data: Dict) -> str:
         """Store a backup and return its ID"""
-        data = self.load_backups()
-        backup_id = f"backup_{data['next_id']}"
-        
-        backup_record = {
-            "id": backup_id,
-            "guild_id": backup_data["guild_id"],
-            "guild_name": backup_data["guild_name"],
-            "timestamp": backup_data["timestamp"],
-            "channels": backup_data["channels"],
-            "roles": backup_data["roles"],
-            "categories": backup_data["categories"]
-        }
-        
-        data["backups"].append(backup_record)
-        data["next_id"] += 1
-        
-        self.save_backups(data)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                backup_id = f"backup_{self._next_id('next_backup_id')}"
+                self.backups.store(backup_id, backup_data)
+                self.conn.execute("COMMIT")
+            except:
+                self.conn.execute("ROLLBACK")
+                raise
         return backup_id
     
     def get_backup(self, backup_id: str) -> Optional[Dict]:
         """Get a specific backup by ID"""
-        data = self.load_backups()
-        for backup in data["backups"]:
-            if backup["id"] == backup_id:
-                return backup
-        return None
+        with self._lock:
+            return self.backups.load(backup_id)
     
     def get_backups(self, guild_id: int) -> List[Dict]:
-        """Get all backups for a guild"""
-        data = self.load_backups()
-        return [backup for backup in data["backups"] if backup["guild_id"] == guild_id]
+        """Get the manifest entries (IDs, dates and item counts) of a guild's backups"""
+        with self._lock:
+            return self.backups.list(guild_id)
     
     # Config methods
-    def load_config(self) -> Dict:
-        """Load configuration from file"""
-        try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {"settings": {}}
-    
-    def save_config(self, data: Dict):
-        """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(data, f, indent=2)
-    
     def get_setting(self, key: str, default=None):
         """Get a configuration setting"""
-        data = self.load_config()
-        return data["settings"].get(key, default)
+        with self._lock:
+            return self.settings.get(key, default)
     
     def set_setting(self, key: str, value):
         """Set a configuration setting"""
-        data = self.load_config()
-        data["settings"][key] = value
-        self.save_config(data)
+        with self._lock:
+            self.settings[key] = value
+            self.writer.submit(("settings", key, value))
+
+class AsyncDatabase:
+    """Awaitable facade over Database for use from coroutines.
+    
+    Every call runs on a bounded I/O thread pool so the event loop never waits
+    on disk. The default single worker also keeps writes in submission order.
+    """
+    
+    def __init__(self, db: Database, max_workers: int = 1):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-io")
+    
+    async def _run(self, func, *args):
+        """Run a Database method on the I/O pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def flush(self):
+        """Commit every queued change and wait until it is on disk"""
+        await self._run(self.db.flush)
+    
+    async def has_legacy(self) -> bool:
+        """Whether warnings or logs are still filed under LEGACY_GUILD"""
+        return await self._run(self.db.has_legacy)
+    
+    async def adopt_legacy(self, guild_id: int) -> Tuple[int, int]:
+        """File the warnings and logs kept under LEGACY_GUILD under a real guild; returns (warnings, logs) moved"""
+        return await self._run(self.db.adopt_legacy, guild_id)
+    
+    async def close(self):
+        """Flush, close the database and stop the I/O pool"""
+        await self._run(self.db.close)
+        self._executor.shutdown(wait=True)
+    
+    # Warning methods
+    async def add_warning(self, user_id: int, moderator_id: int, reason: str, guild_id: int) -> int:
+        """Add a warning for a user, returning its ID once it is on disk"""
+        # Wait for the commit on the loop rather than the I/O thread, so
+        # concurrent warnings can share one group commit
+        warning_id, committed = await self._run(self.db.submit_warning, user_id, moderator_id, reason, guild_id)
+        await asyncio.wrap_future(committed)
+        return warning_id
+    
+    async def get_warnings(self, user_id: int, guild_id: int) -> List[Dict]:
+        """Get all warnings for a user in a guild"""
+        return await self._run(self.db.get_warnings, user_id, guild_id)
+    
+    async def get_warning_count(self, user_id: int, guild_id: int) -> int:
+        """Get the number of warnings for a user in a guild"""
+        return await self._run(self.db.get_warning_count, user_id, guild_id)
+    
+    async def remove_warning(self, warning_id: int, guild_id: int) -> bool:
+        """Remove a warning by ID"""
+        return await self._run(self.db.remove_warning, warning_id, guild_id)
+    
+    async def clear_user_warnings(self, user_id: int, guild_id: int) -> int:
+        """Clear all warnings for a user in a guild and return count of removed warnings"""
+        return await self._run(self.db.clear_user_warnings, user_id, guild_id)
+    
+    # Log methods
+    async def log_action(self, action: str, moderator_id: Optional[int], target_id: Optional[int], reason: str,
+                         guild_id: int):
+        """Log a moderation action"""
+        # Only enqueues for the log writer thread, so it is safe on the loop
+        self.db.log_action(action, moderator_id, target_id, reason, guild_id)
+    
+    async def get_recent_logs(self, guild_id: int, limit: int = 10, user_id: Optional[int] = None) -> List[Dict]:
+        """Get recent moderation logs for a guild"""
+        return await self._run(self.db.get_recent_logs, guild_id, limit, user_id)
+    
+    async def get_logs_between(self, guild_id: int, start: str, end: str,
+                               user_id: Optional[int] = None) -> List[Dict]:
+        """Get a guild's logs with start <= timestamp < end (ISO 8601), oldest first"""
+        return await self._run(self.db.get_logs_between, guild_id, start, end, user_id)
+    
+    async def get_user_stats(self, user_id: int, guild_id: int) -> Dict:
+        """Get statistics for a user in a guild"""
+        return await self._run(self.db.get_user_stats, user_id, guild_id)
+    
+    # Quarantine methods
+    async def add_quarantine(self, quarantine_data: Dict):
+        """Add a quarantine record"""
+        await self._run(self.db.add_quarantine, quarantine_data)
+    
+    async def get_quarantine(self, user_id: int, guild_id: int) -> Optional[Dict]:
+        """Get quarantine data for a user"""
+        return await self._run(self.db.get_quarantine, user_id, guild_id)
+    
+    async def remove_quarantine(self, user_id: int, guild_id: int) -> bool:
+        """Remove a quarantine record"""
+        return await self._run(self.db.remove_quarantine, user_id, guild_id)
+    
+    async def get_all_quarantined(self, guild_id: int) -> List[Dict]:
+        """Get all quarantined users in a guild"""
+        return await self._run(self.db.get_all_quarantined, guild_id)
+    
+    # Backup methods
+    async def store_backup(self, backup_data: Dict) -> str:
+        """Store a backup and return its ID"""
+        return await self._run(self.db.store_backup, backup_data)
+    
+    async def get_backup(self, backup_id: str) -> Optional[Dict]:
+        """Get a specific backup by ID"""
+        return await self._run(self.db.get_backup, backup_id)
+    
+    async def get_backups(self, guild_id: int) -> List[Dict]:
+        """Get the manifest entries (IDs, dates and item counts) of a guild's backups"""
+        return await self._run(self.db.get_backups, guild_id)
+    
+    # Config methods
+    async def get_setting(self, key: str, default=None):
+        """Get a configuration setting"""
+        return await self._run(self.db.get_setting, key, default)
+    
+    async def set_setting(self, key: str, value):
+        """Set a configuration setting"""
+        await self._run(self.db.set_setting, key, value)
@@ -0,0 +1,131 @@
+import re
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Discord's own hosts; invites on them are left to the invite check
+DISCORD_DOMAINS = ("discord.gg", "discord.com", "discordapp.com", "discord.media", "discordapp.net")
+
+# What a link's host is classed as
+ALLOWED = "allowed"
+BLOCKED = "blocked"
+DISCORD = "discord"
+UNLISTED = "unlisted"
+
+# Scheme and authority (user info, host and port) of a link; browsers end it at a backslash too
+authority_re = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://([^/\\?#]*)')
+
+def normalize_host(host: str) -> str:
+    """Lowercase a host name, drop a trailing dot and encode international names as punycode"""
+    host = host.strip().lower().rstrip(".")
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    return host
+
+def normalize_domain(entry: str) -> str:
+    """Turn a list entry ("github.com", "*.github.com", "https://github.com/") into a bare domain"""
+    entry = entry.strip()
+    if "/" in entry or "\\" in entry:
+        entry = host_of(entry if "://" in entry else f"//{entry}") or ""
+    return normalize_host(entry.lstrip("*."))
+
+def host_of(link: str) -> Optional[str]:
+    """Return the host a link really points to (after any user info and without the port), or None"""
+    try:
+        # Browsers read a backslash in a web link as "/", so https://evil.xyz\@github.com goes to evil.xyz
+        host = urlsplit(link.replace("\\", "/")).hostname
+    except ValueError:
+        # Malformed, e.g. an unclosed IPv6 bracket
+        return None
+    return normalize_host(host) if host else None
+
+class DomainFilter:
+    """Classifies link hosts against a guild's allowed and blocked domains.
+    
+    A domain covers itself and every subdomain. Lists are hashed sets, and a
+    host is checked by looking up each of its label suffixes, longest first
+    ("a.github.com", then "github.com", then "com"), so the cost depends on
+    the number of labels and not on the size of the lists. The most specific
+    entry wins, which lets a blocked subdomain sit under an allowed domain;
+    a domain in both lists is blocked. Results are cached per host as
+    written in the link, so a repeated host is not even parsed again.
+    """
+    
+    # Hosts whose classification is kept
+    MAX_HOSTS = 10_000
+    
+    def __init__(self, allowed: Iterable[str] = (), blocked: Iterable[str] = ()):
+        self.allowed: FrozenSet[str] = frozenset(filter(None, map(normalize_domain, allowed)))
+        self.blocked: FrozenSet[str] = frozenset(filter(None, map(normalize_domain, blocked)))
+        self.discord: FrozenSet[str] = frozenset(DISCORD_DOMAINS)
+        self._hosts: "OrderedDict[str, str]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+    
+    def classify_host(self, host: str) -> str:
+        """Return ALLOWED, BLOCKED, DISCORD or UNLISTED for a normalized host"""
+        suffix = host
+        while True:
+            if suffix in self.blocked:
+                return BLOCKED
+            if suffix in self.allowed:
+                return ALLOWED
+            if suffix in self.discord:
+                return DISCORD
+            dot = suffix.find(".")
+            if dot < 0:
+                return UNLISTED
+            suffix = suffix[dot + 1:]
+    
+    def classify(self, link: str) -> str:
+        """Classify a link by its host; links without a readable host are UNLISTED"""
+        # Cached by the link's authority as written, so a repeated host is not parsed again
+        match = authority_re.match(link)
+        authority = match.group(1) if match else link
+        verdict = self._hosts.get(authority)
+        if verdict is not None:
+            self.hits += 1
+            self._hosts.move_to_end(authority)
+            return verdict
+        
+        self.misses += 1
+        host = host_of(link)
+        verdict = self.classify_host(host) if host else UNLISTED
+        self._hosts[authority] = verdict
+        if len(self._hosts) > self.MAX_HOSTS:
+            self._hosts.popitem(last=False)
+        return verdict
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "allowed": len(self.allowed),
+            "blocked": len(self.blocked),
+            "hosts": len(self._hosts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+# Keyed by the lists themselves, so changing any other automod setting keeps
+# the filter and its host cache
+_filters: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], DomainFilter]" = OrderedDict()
+MAX_FILTERS = 64
+
+def domain_filter_for(allowed: Tuple[str, ...], blocked: Tuple[str, ...]) -> DomainFilter:
+    """Return the filter for a pair of domain lists, building it on first use"""
+    key = (allowed, blocked)
+    domain_filter = _filters.get(key)
+    if domain_filter is None:
+        domain_filter = DomainFilter(allowed, blocked)
+        _filters[key] = domain_filter
+        if len(_filters) > MAX_FILTERS:
+            _filters.popitem(last=False)
+    else:
+        _filters.move_to_end(key)
+    return domain_filter
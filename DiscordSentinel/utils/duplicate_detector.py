@@ -0,0 +1,206 @@
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from utils.domain_filter import host_of
+from utils.word_filter import normalize
+
+# Characters per shingle, and how much of a message is fingerprinted
+SHINGLE = 4
+MAX_CHARS = 500
+# Hashes are folded to 64 bits and split into equal ranges, one per bin
+HASH_MASK = (1 << 64) - 1
+
+# A whole link; only its host counts towards a message's fingerprint
+link_re = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://\S+')
+
+Sketch = Tuple[Optional[int], ...]
+
+class RecentMessage:
+    """A fingerprinted message still inside its guild's window"""
+    __slots__ = ("message_id", "author_id", "channel_id", "time", "sketch", "bands", "flagged")
+    
+    def __init__(self, message_id: int, author_id: int, channel_id: int, time: float,
+                 sketch: Sketch, bands: List[tuple]):
+        self.message_id = message_id
+        self.author_id = author_id
+        self.channel_id = channel_id
+        self.time = time
+        self.sketch = sketch
+        self.bands = bands
+        # Part of a cluster that has already been acted on
+        self.flagged = False
+
+class _GuildIndex:
+    __slots__ = ("messages", "postings")
+    
+    def __init__(self):
+        # Oldest first, by message ID
+        self.messages: "OrderedDict[int, RecentMessage]" = OrderedDict()
+        # Band key -> IDs of the messages whose sketch holds that band
+        self.postings: Dict[tuple, Set[int]] = {}
+
+class DuplicateDetector:
+    """Finds near-identical messages posted by different members within a window.
+    
+    Each message is normalized like forbidden words are (so case, leetspeak,
+    look-alike letters and padding punctuation do not matter), cut into
+    character shingles, with each link reduced to one token for its host,
+    and fingerprinted with a one-permutation MinHash: the shingle hashes are
+    split into ``bins`` equal ranges and the smallest hash in each range is
+    kept. Two sketches agree on a bin with probability equal
+    to the Jaccard similarity of the messages, so near-duplicates agree on
+    most bins. Bins are grouped into bands of ``band_size`` and each band is a
+    key of an inverted index, so a lookup only touches messages that agree
+    with the new one on a whole band instead of every recent message. When
+    near-identical messages come from ``min_authors`` different members the
+    whole cluster is returned at once; later copies of a flagged cluster are
+    returned as soon as they arrive.
+    
+    Messages leave the index when they fall out of the window, each guild
+    holds at most ``max_messages`` and at most ``max_guilds`` guilds are
+    indexed, so memory is bounded.
+    """
+    
+    def __init__(self, bins: int = 24, band_size: int = 3, max_messages: int = 5000, max_guilds: int = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.bins = bins
+        self.band_size = band_size
+        self.max_messages = max_messages
+        self.max_guilds = max_guilds
+        self.clock = clock
+        self._bounds = [(j * (HASH_MASK + 1)) // bins for j in range(bins + 1)]
+        self._guilds: "OrderedDict[int, _GuildIndex]" = OrderedDict()
+        
+        # Counters for monitoring
+        self.checked = 0
+        self.candidates = 0
+        self.clusters = 0
+        self.flagged = 0
+    
+    def sketch(self, content: str, min_length: int) -> Optional[Sketch]:
+        """One-permutation MinHash of a message (None for empty bins), or None if it is too short to compare"""
+        content = content[:MAX_CHARS]
+        hosts = set()
+        if "://" in content:
+            # A link is one token, its host, and does not count towards the length,
+            # so members sharing links to one site are not copies of each other
+            hosts = {f"://{host}" for host in map(host_of, link_re.findall(content)) if host}
+            content = link_re.sub(" ", content)
+        # Spacing is padding here too, so copies that only differ in it still match
+        text = normalize(content).replace(" ", "")
+        if len(text) < max(min_length, SHINGLE):
+            return None
+        shingles = {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)} | hosts
+        hashes = sorted([hash(shingle) & HASH_MASK for shingle in shingles])
+        count = len(hashes)
+        bounds = self._bounds
+        sketch = []
+        for j in range(self.bins):
+            i = bisect_left(hashes, bounds[j])
+            sketch.append(hashes[i] if i < count and hashes[i] < bounds[j + 1] else None)
+        return tuple(sketch)
+    
+    def bands(self, sketch: Sketch) -> List[tuple]:
+        """Index keys of a sketch; bands with an empty bin are left out"""
+        size = self.band_size
+        keys = []
+        for start in range(0, self.bins, size):
+            band = sketch[start:start + size]
+            if None not in band:
+                keys.append((start,) + band)
+        return keys
+    
+    @staticmethod
+    def similarity(first: Sketch, second: Sketch) -> float:
+        """Estimated Jaccard similarity of the messages behind two sketches"""
+        same = used = 0
+        for a, b in zip(first, second):
+            if a is not None or b is not None:
+                used += 1
+                if a == b:
+                    same += 1
+        return same / used if used else 0.0
+    
+    def _index(self, guild_id: int) -> _GuildIndex:
+        index = self._guilds.get(guild_id)
+        if index is None:
+            index = _GuildIndex()
+            self._guilds[guild_id] = index
+            if len(self._guilds) > self.max_guilds:
+                self._guilds.popitem(last=False)
+        else:
+            self._guilds.move_to_end(guild_id)
+        return index
+    
+    def _remove(self, index: _GuildIndex, message: RecentMessage):
+        for key in message.bands:
+            ids = index.postings.get(key)
+            if ids is not None:
+                ids.discard(message.message_id)
+                if not ids:
+                    del index.postings[key]
+    
+    def _expire(self, index: _GuildIndex, cutoff: float):
+        messages = index.messages
+        while messages:
+            oldest = next(iter(messages.values()))
+            if oldest.time >= cutoff and len(messages) < self.max_messages:
+                break
+            del messages[oldest.message_id]
+            self._remove(index, oldest)
+    
+    def check(self, guild_id: int, author_id: int, channel_id: int, message_id: int, content: str,
+              window: float, min_authors: int, similarity: float, min_length: int) -> List[RecentMessage]:
+        """Index a message; returns the cluster to act on (this message included), or an empty list"""
+        sketch = self.sketch(content, min_length)
+        if sketch is None:
+            return []
+        self.checked += 1
+        
+        now = self.clock()
+        index = self._index(guild_id)
+        self._expire(index, now - window)
+        
+        bands = self.bands(sketch)
+        shared = Counter()
+        for key in bands:
+            ids = index.postings.get(key)
+            if ids:
+                shared.update(ids)
+        self.candidates += len(shared)
+        matches = [
+            other for other in map(index.messages.__getitem__, shared)
+            if self.similarity(sketch, other.sketch) >= similarity
+        ]
+        
+        message = RecentMessage(message_id, author_id, channel_id, now, sketch, bands)
+        if any(match.flagged for match in matches):
+            # Another copy of a cluster that was already dealt with. The copies
+            # already indexed keep matching, so this one is not indexed and
+            # posting lists stay short however long a raid goes on
+            cluster = [message] + [match for match in matches if not match.flagged]
+        else:
+            index.messages[message_id] = message
+            for key in bands:
+                index.postings.setdefault(key, set()).add(message_id)
+            if len({match.author_id for match in matches} | {author_id}) < min_authors:
+                return []
+            cluster = matches + [message]
+            self.clusters += 1
+        
+        for member in cluster:
+            member.flagged = True
+        self.flagged += len(cluster)
+        return cluster
+    
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._guilds),
+            "messages": sum(len(index.messages) for index in self._guilds.values()),
+            "checked": self.checked,
+            "candidates": self.candidates,
+            "clusters": self.clusters,
+            "flagged": self.flagged
+        }
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class GroupCommitWriter:
+    """Queue records and commit them in batches on a background thread.
+    
+    A batch is committed as soon as ``max_batch`` records are waiting, or
+    ``max_delay`` seconds after its first record arrived, whichever comes first.
+    ``submit`` returns a Future that resolves once the record's batch has been
+    committed, so callers that need durability can wait on it and everyone
+    else can fire and forget.
+    """
+    
+    def __init__(self, commit: Callable[[List[Any]], None], max_delay: float = 0.005,
+                 max_batch: int = 1000, name: str = "group-commit"):
+        self._commit = commit
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        
+        self._queue: List[Any] = []
+        self._futures: List[Future] = []
+        # Future of the newest record; batches commit in order, so once it
+        # resolves every earlier record is committed too, in flight or not
+        self._last: Optional[Future] = None
+        self._first_queued = 0.0
+        self._force = False
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Counters for monitoring
+        self.batches = 0
+        self.records = 0
+        self.failures = 0
+        
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def submit(self, record: Any) -> Future:
+        """Queue a record; the returned Future resolves when it is committed"""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("GroupCommitWriter is closed")
+            if not self._queue:
+                self._first_queued = time.monotonic()
+            self._queue.append(record)
+            self._futures.append(future)
+            self._last = future
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._cond.notify()
+        return future
+    
+    @property
+    def pending(self) -> int:
+        """Number of records waiting for the next commit"""
+        return len(self._queue)
+    
+    def flush(self):
+        """Commit everything submitted so far and wait for it, including a batch already being committed"""
+        with self._cond:
+            last = self._last
+            if last is None or last.done():
+                return
+            if self._futures:
+                self._force = True
+                self._cond.notify()
+        last.result()
+    
+    def close(self):
+        """Commit what is queued, wait for every batch to finish and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                
+                # Hold the batch open until it is full, due, or forced out
+                while not (self._force or self._closed or len(self._queue) >= self.max_batch):
+                    remaining = self._first_queued + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                
+                if not self._queue and self._closed:
+                    return
+                
+                batch, futures = self._queue[:self.max_batch], self._futures[:self.max_batch]
+                del self._queue[:self.max_batch], self._futures[:self.max_batch]
+                if self._queue:
+                    self._first_queued = time.monotonic()
+                else:
+                    self._force = False
+            
+            try:
+                self._commit(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Group commit of {len(batch)} records failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            
+            self.batches += 1
+            self.records += len(batch)
+            for future in futures:
+                future.set_result(None)
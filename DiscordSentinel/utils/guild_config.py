@@ -0,0 +1,399 @@
+import asyncio
+import copy
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from utils.permissions import ConfigCache, config_cache, freeze
+
+logger = logging.getLogger(__name__)
+
+DATA_CONFIG_FILE = os.path.join("data", "config.json")
+
+# Settings key holding the overrides made through commands, by guild ID
+SETTING_KEY = "guild_configs"
+
+# Built-in defaults live on the snapshot classes themselves; each field's
+# default also decides how values from the config layers are coerced
+
+@dataclass(frozen=True)
+class ModerationConfig:
+    max_warnings: int = 3
+    auto_ban_on_max_warnings: bool = False
+
+@dataclass(frozen=True)
+class AutoModConfig:
+    spam_detection: bool = True
+    spam_threshold: int = 5
+    spam_window: int = 10
+    invite_links: bool = True
+    excessive_caps: bool = True
+    caps_threshold: float = 0.7
+    caps_min_length: int = 10
+    forbidden_words: Tuple[str, ...] = ()
+    whitelisted_domains: Tuple[str, ...] = (
+        'youtube.com', 'youtu.be', 'twitter.com', 'github.com',
+        'stackoverflow.com', 'reddit.com', 'tenor.com', 'giphy.com'
+    )
+    blocked_domains: Tuple[str, ...] = ()
+    duplicate_detection: bool = True
+    duplicate_authors: int = 4
+    duplicate_window: int = 60
+    duplicate_similarity: float = 0.5
+    duplicate_min_length: int = 30
+
+@dataclass(frozen=True)
+class AntiRaidConfig:
+    enabled: bool = True
+    threshold: int = 5
+    window: int = 10
+    kick_new_members: bool = True
+    lock_channels: bool = True
+    notify_staff: bool = True
+
+@dataclass(frozen=True)
+class AntiNukeConfig:
+    enabled: bool = True
+    panic_threshold: int = 3
+    panic_window: int = 30
+    # Stored as {action: enabled} in the config layers
+    monitored_actions: FrozenSet[str] = frozenset({
+        'channel_delete', 'channel_create', 'role_delete', 'role_create',
+        'member_ban', 'member_kick', 'webhook_create', 'webhook_delete'
+    })
+
+@dataclass(frozen=True)
+class VerificationConfig:
+    enabled: bool = False
+    channel_id: Optional[int] = None
+    verified_role_id: Optional[int] = None
+    unverified_role_id: Optional[int] = None
+    method: str = "button"
+
+SECTIONS = {
+    "moderation": ModerationConfig,
+    "automod": AutoModConfig,
+    "antiraid": AntiRaidConfig,
+    "antinuke": AntiNukeConfig,
+    "verification": VerificationConfig,
+}
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """Effective configuration of one guild; read its attributes directly on hot paths"""
+    guild_id: int
+    version: int
+    # Config file generation this snapshot was built from (see GuildConfigEngine.generation)
+    generation: int
+    log_channel: Optional[int]
+    mute_role: Optional[int]
+    moderation: ModerationConfig
+    automod: AutoModConfig
+    antiraid: AntiRaidConfig
+    antinuke: AntiNukeConfig
+    verification: VerificationConfig
+
+# The global config.json nests automod features as {feature: {"enabled": ...}};
+# these paths map its keys onto the snapshot fields
+GLOBAL_KEYS = {
+    ("automod", "spam_detection", "enabled"): ("automod", "spam_detection"),
+    ("automod", "spam_detection", "max_messages"): ("automod", "spam_threshold"),
+    ("automod", "spam_detection", "time_window"): ("automod", "spam_window"),
+    ("automod", "invite_links", "enabled"): ("automod", "invite_links"),
+    ("automod", "excessive_caps", "enabled"): ("automod", "excessive_caps"),
+    ("automod", "excessive_caps", "threshold"): ("automod", "caps_threshold"),
+    ("automod", "excessive_caps", "min_length"): ("automod", "caps_min_length"),
+    ("moderation", "max_warnings"): ("moderation", "max_warnings"),
+    ("moderation", "auto_ban_on_max_warnings"): ("moderation", "auto_ban_on_max_warnings"),
+}
+
+def normalize_global(config) -> dict:
+    """Translate the global config.json into the layer format used by guild configs"""
+    layer = {}
+    for path, (section, key) in GLOBAL_KEYS.items():
+        value = config
+        for part in path:
+            if not hasattr(value, "get") or part not in value:
+                break
+            value = value[part]
+        else:
+            layer.setdefault(section, {})[key] = value
+    
+    # Sections without a legacy layout are taken as they are
+    for section in ("antiraid", "antinuke", "verification"):
+        if section in config:
+            layer.setdefault(section, {}).update(config[section])
+    return layer
+
+def coerce(default, value, previous):
+    """Convert a layer value to the type of the field's default, raising on mismatch"""
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise TypeError(f"expected true/false, got {value!r}")
+        return value
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"expected a number, got {value!r}")
+        return type(default)(value)
+    if isinstance(default, str):
+        return str(value)
+    if isinstance(default, tuple):
+        if isinstance(value, str) or not hasattr(value, "__iter__"):
+            raise TypeError(f"expected a list, got {value!r}")
+        return tuple(value)
+    if isinstance(default, frozenset):
+        if hasattr(value, "items"):
+            # {name: enabled} toggles individual entries of the layer below
+            names = set(previous)
+            for name, enabled in value.items():
+                if enabled:
+                    names.add(name)
+                else:
+                    names.discard(name)
+            return frozenset(names)
+        return frozenset(value)
+    # Optional IDs
+    return None if value is None else int(value)
+
+def report(errors: Optional[list], message: str):
+    """Collect a validation error, or log it when the value is simply being skipped"""
+    if errors is None:
+        logger.warning(f"Ignoring invalid config value {message}")
+    else:
+        errors.append(message)
+
+def build_section(cls, layers: list, guild_id: int, errors: Optional[list] = None):
+    """Apply each layer's values for a section over the class defaults"""
+    values = {field.name: field.default for field in fields(cls)}
+    defaults = dict(values)
+    for layer in layers:
+        if not hasattr(layer, "items"):
+            continue
+        for key, value in layer.items():
+            if key not in values:
+                continue
+            try:
+                values[key] = coerce(defaults[key], value, values[key])
+            except (TypeError, ValueError) as e:
+                report(errors, f"{cls.__name__}.{key} for guild {guild_id}: {e}")
+    return cls(**values)
+
+def file_layers(guild_id: int, data_config, global_layer: dict) -> list:
+    """The layers a guild inherits from the config files, lowest first"""
+    guild_file_layer = data_config.get("guild_configs", {}).get(str(guild_id), {})
+    return [data_config.get("default_config", {}), global_layer, guild_file_layer]
+
+def build_guild_config(guild_id: int, layers: list, version: int, generation: int,
+                       errors: Optional[list] = None) -> GuildConfig:
+    """Merge the layers into a snapshot; bad values are skipped (and collected in `errors`)"""
+    top_level = {"log_channel": None, "mute_role": None}
+    for layer in layers:
+        for key in top_level:
+            try:
+                if layer.get(key) is not None:
+                    top_level[key] = coerce(None, layer[key], top_level[key])
+            except (TypeError, ValueError) as e:
+                report(errors, f"{key} for guild {guild_id}: {e}")
+    
+    return GuildConfig(
+        guild_id=guild_id,
+        version=version,
+        generation=generation,
+        **top_level,
+        **{name: build_section(cls, [layer.get(name) for layer in layers], guild_id, errors)
+           for name, cls in SECTIONS.items()}
+    )
+
+class GuildConfigEngine:
+    """Per-guild configuration merged from layered sources into frozen snapshots.
+    
+    Layers, lowest first: the snapshot class defaults, ``default_config`` in
+    data/config.json, the global config.json, the guild's entry in
+    ``guild_configs`` of data/config.json, and overrides made through commands
+    (kept in the ``guild_configs`` setting). A guild's snapshot is built on
+    first use and reused until one of its layers changes. ``generation``
+    counts the config file versions seen so far.
+    """
+    
+    def __init__(self, db=None, global_config: ConfigCache = config_cache, data_config: Optional[ConfigCache] = None):
+        self.db = db
+        self.global_config = global_config
+        self.data_config = data_config or ConfigCache(DATA_CONFIG_FILE, default={})
+        self._overrides: Dict[int, dict] = {}
+        self._snapshots: Dict[int, GuildConfig] = {}
+        self._global = None
+        self._data = None
+        self._global_layer = {}
+        self._versions = itertools.count(1)
+        self.generation = 0
+        
+        # Counters for monitoring
+        self.builds = 0
+    
+    async def load(self):
+        """Load the overrides saved by earlier runs"""
+        stored = await self.db.get_setting(SETTING_KEY, {}) if self.db else {}
+        self._overrides = {int(guild_id): overrides for guild_id, overrides in (stored or {}).items()}
+        self._snapshots.clear()
+    
+    def sync(self):
+        """Switch to the config files' current snapshots if either of them changed"""
+        global_config = self.global_config.get()
+        data_config = self.data_config.get()
+        if global_config is not self._global or data_config is not self._data:
+            # A config file changed: every guild inherits from it
+            self._global = global_config
+            self._data = data_config
+            self._global_layer = normalize_global(global_config)
+            self._snapshots.clear()
+            self.generation += 1
+    
+    def get(self, guild_id: int) -> GuildConfig:
+        """Return the current snapshot of a guild's configuration"""
+        self.sync()
+        snapshot = self._snapshots.get(guild_id)
+        if snapshot is None:
+            snapshot = self._build(guild_id)
+            self._snapshots[guild_id] = snapshot
+        return snapshot
+    
+    def _build(self, guild_id: int) -> GuildConfig:
+        layers = file_layers(guild_id, self._data, self._global_layer) + [self._overrides.get(guild_id, {})]
+        self.builds += 1
+        return build_guild_config(guild_id, layers, next(self._versions), self.generation)
+    
+    def validate(self, global_config, data_config) -> List[str]:
+        """Check candidate config file contents, returning a list of problems.
+        
+        The defaults and every guild entry in data/config.json are built from
+        them, so a value that would be skipped anywhere is reported. Command
+        overrides were validated when they were made and are left out, which
+        also keeps this safe to run off the event loop.
+        """
+        errors = []
+        try:
+            permissions = global_config.get("permissions", {})
+            for key, names in permissions.items():
+                if isinstance(names, str) or not all(isinstance(name, str) for name in names):
+                    errors.append(f"permissions.{key}: expected a list of role names")
+            
+            global_layer = normalize_global(global_config)
+            guild_ids = [0] + [int(guild_id) for guild_id in data_config.get("guild_configs", {})]
+            for guild_id in guild_ids:
+                build_guild_config(guild_id, file_layers(guild_id, data_config, global_layer), 0, 0, errors)
+        except Exception as e:
+            # Wrong shapes, e.g. a list where a section should be
+            errors.append(f"malformed config: {e!r}")
+        return errors
+    
+    async def update(self, guild_id: int, section: str, **values) -> GuildConfig:
+        """Override settings of one section for a guild, save them and return the new snapshot"""
+        current = getattr(self.get(guild_id), section)
+        defaults = SECTIONS[section]()
+        for key, value in values.items():
+            # Validate before anything is stored
+            if not hasattr(defaults, key):
+                raise KeyError(f"Unknown {section} setting: {key}")
+            coerce(getattr(defaults, key), value, getattr(current, key))
+        
+        overrides = self._overrides.setdefault(guild_id, {}).setdefault(section, {})
+        for key, value in values.items():
+            previous = overrides.get(key)
+            if hasattr(value, "items") and hasattr(previous, "items"):
+                # {name: enabled} toggles add to the ones set before
+                overrides[key] = {**previous, **value}
+            else:
+                overrides[key] = value
+        self._snapshots.pop(guild_id, None)
+        
+        if self.db is not None:
+            stored = {str(key): overrides for key, overrides in self._overrides.items()}
+            await self.db.set_setting(SETTING_KEY, copy.deepcopy(stored))
+        return self.get(guild_id)
+    
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "guilds": len(self._snapshots),
+            "overridden": len(self._overrides),
+            "builds": self.builds
+        }
+
+class ConfigReloader:
+    """Apply edited config files without a restart.
+    
+    ``reload`` reads, parses and validates both files on a worker thread,
+    then installs them together in one step on the event loop, so handlers
+    never see one file new and the other old. Handlers that already hold a
+    GuildConfig keep using it; the next ``get`` returns the new generation.
+    A file that fails to parse or validate leaves the running config as is.
+    """
+    
+    def __init__(self, engine: GuildConfigEngine):
+        self.engine = engine
+        self.caches = (engine.global_config, engine.data_config)
+        # Changes are applied through reload only, never on a hot path
+        for cache in self.caches:
+            cache.watch = False
+        self._lock = asyncio.Lock()
+        
+        # Metrics
+        self.reloads = 0
+        self.failures = 0
+        self.last_swap_ms = 0.0
+        self.max_swap_ms = 0.0
+        self.last_reload: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+    
+    def _prepare(self) -> list:
+        prepared = []
+        for cache in self.caches:
+            try:
+                prepared.append(cache.read())
+            except FileNotFoundError:
+                # Same as a cache that never found its file
+                prepared.append((None, None, freeze(cache.default)))
+        
+        errors = self.engine.validate(prepared[0][2], prepared[1][2])
+        if errors:
+            more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+            raise ValueError("; ".join(errors[:5]) + more)
+        return prepared
+    
+    async def reload(self) -> dict:
+        """Load and swap in the current config files, raising if they are invalid"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            try:
+                prepared = await loop.run_in_executor(None, self._prepare)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            
+            start = time.perf_counter()
+            for cache, (signature, digest, snapshot) in zip(self.caches, prepared):
+                cache.install(signature, digest, snapshot)
+            self.engine.sync()
+            swap_ms = (time.perf_counter() - start) * 1000
+            
+            self.reloads += 1
+            self.last_swap_ms = swap_ms
+            self.max_swap_ms = max(self.max_swap_ms, swap_ms)
+            self.last_reload = datetime.utcnow()
+            self.last_error = None
+            return self.stats()
+    
+    def stats(self) -> dict:
+        return {
+            "generation": self.engine.generation,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_swap_ms": self.last_swap_ms,
+            "max_swap_ms": self.max_swap_ms,
+            "last_reload": self.last_reload.isoformat() if self.last_reload else None,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,190 @@
+import re
+from collections import Counter, OrderedDict
+from typing import List, Optional, Tuple
+from utils.domain_filter import BLOCKED, UNLISTED, domain_filter_for
+from utils.guild_config import AutoModConfig
+from utils.word_filter import matcher_for
+
+INVITE_PATTERN = r'discord\.gg/[a-zA-Z0-9]+|discordapp\.com/invite/[a-zA-Z0-9]+|discord\.com/invite/[a-zA-Z0-9]+'
+# The whole link, so the host is parsed from all of it: "https://github.com@evil.xyz" is evil.xyz
+LINK_PATTERN = r'https?://[^\s<>()\[\]"\']+'
+ZALGO_PATTERN = r'[\u0300-\u036F\u1AB0-\u1AFF\u1DC0-\u1DFF\u20D0-\u20FF\uFE20-\uFE2F]'
+REPEATED_PATTERN = r'(.)\1\1\1\1'  # 5+ repeated characters
+
+invite_re = re.compile(INVITE_PATTERN)
+link_re = re.compile(LINK_PATTERN)
+zalgo_re = re.compile(ZALGO_PATTERN)
+repeated_re = re.compile(REPEATED_PATTERN)
+
+# More combining marks than this is zalgo text
+ZALGO_LIMIT = 5
+
+# Every byte but A-Z, for counting capitals in ASCII text
+NOT_UPPER = bytes(b for b in range(256) if not 65 <= b <= 90)
+
+# Verdicts, in the order they are reported
+VERDICTS = ("invite", "forbidden_word", "suspicious_link", "caps", "zalgo", "repeated_chars")
+
+# Stages a message can be sent through, as bits of the mask prefilter() returns
+INVITE = 1
+LINK = 2
+WORDS = 4
+ZALGO = 8
+REPEATED = 16
+CAPS = 32
+DUPLICATES = 64
+STAGES = {
+    "invite": INVITE, "link": LINK, "words": WORDS, "zalgo": ZALGO,
+    "repeated_chars": REPEATED, "caps": CAPS, "duplicates": DUPLICATES,
+}
+CONTENT_STAGES = INVITE | LINK | WORDS | ZALGO | REPEATED | CAPS
+
+class PrefilterStats:
+    """How many messages each stage ran on, kept as a count per combination of stages"""
+    
+    def __init__(self):
+        self.masks = Counter()
+    
+    def stats(self) -> dict:
+        messages = sum(self.masks.values())
+        hits = {name: sum(count for mask, count in self.masks.items() if mask & bit) for name, bit in STAGES.items()}
+        return {
+            "messages": messages,
+            "fast_path": self.masks[0],
+            "hits": hits,
+            "skips": {name: messages - count for name, count in hits.items()}
+        }
+
+prefilter_stats = PrefilterStats()
+
+class ScanResult:
+    """Everything one scan of a message found, plus the verdicts drawn from it"""
+    __slots__ = ("verdicts", "caps_ratio", "invites", "links", "suspicious_links", "zalgo_count",
+                 "repeated", "words")
+    
+    def __init__(self):
+        self.verdicts: set = set()
+        self.caps_ratio = 0.0
+        self.invites: List[Tuple[int, int]] = []
+        self.links: List[str] = []
+        self.suspicious_links: List[str] = []
+        self.zalgo_count = 0
+        self.repeated: List[Tuple[int, int]] = []
+        self.words: List[str] = []
+
+class MessageScanner:
+    """Content scanner for one guild's automod settings.
+    
+    ``prefilter`` decides which stages a message needs with tests that run
+    in C: its length, substring probes, an ASCII check, a lowercase check
+    and capital count, the word list's ``might_match`` and the
+    repeated-character pattern. Most chat fires none of them and is done
+    there. ``scan`` then runs only the stages that fired, reusing the
+    repeated-character match the prefilter already found, gathers
+    everything their filters need and draws every verdict from it. Forbidden words are matched by the guild's
+    WordMatcher automaton and link hosts are classed by its DomainFilter.
+    """
+    
+    def __init__(self, config: AutoModConfig):
+        self.config = config
+        self.domains = domain_filter_for(config.whitelisted_domains, config.blocked_domains)
+        
+        self.words = matcher_for(config.forbidden_words) if config.forbidden_words else None
+    
+    def prefilter(self, content: str) -> Tuple[int, Optional[re.Match]]:
+        """Mask of the stages a message has to go through (0 means it is clean), and its repeated-character match"""
+        config = self.config
+        length = len(content)
+        stages = 0
+        # Every invite form contains "discord"
+        if config.invite_links and 'discord' in content:
+            stages |= INVITE
+        if '://' in content:
+            stages |= LINK
+        if self.words is not None and self.words.might_match(content):
+            stages |= WORDS
+        # Combining marks are never ASCII
+        if not content.isascii():
+            stages |= ZALGO
+        repeat = repeated_re.search(content)
+        if repeat:
+            stages |= REPEATED
+        if config.excessive_caps and length >= config.caps_min_length and not content.islower():
+            # Exact for ASCII, where counting capitals is one C call
+            if not content.isascii() or (
+                len(content.encode('ascii').translate(None, NOT_UPPER)) / length >= config.caps_threshold
+            ):
+                stages |= CAPS
+        # Normalizing only ever shortens a message
+        if config.duplicate_detection and length >= config.duplicate_min_length:
+            stages |= DUPLICATES
+        prefilter_stats.masks[stages] += 1
+        return stages, repeat
+    
+    def scan(self, content: str, stages: int = CONTENT_STAGES, repeat: Optional[re.Match] = None) -> ScanResult:
+        """Scan a message and return what it contains; only the stages in `stages` are run, and
+        `repeat` is the repeated-character match when the prefilter already found it"""
+        config = self.config
+        result = ScanResult()
+        verdicts = result.verdicts
+        is_ascii = content.isascii()
+        
+        # Every invite form contains "discord"
+        if stages & INVITE and 'discord' in content:
+            result.invites = [match.span() for match in invite_re.finditer(content)]
+            if result.invites:
+                verdicts.add("invite")
+        
+        if stages & LINK and '://' in content:
+            result.links = link_re.findall(content)
+            for link in result.links:
+                # Links to Discord itself are left to the invite check
+                if self.domains.classify(link) in (UNLISTED, BLOCKED):
+                    result.suspicious_links.append(link)
+            if result.suspicious_links:
+                verdicts.add("suspicious_link")
+        
+        if stages & WORDS and self.words is not None:
+            result.words = self.words.findall(content)
+            if result.words:
+                verdicts.add("forbidden_word")
+        
+        # Combining marks are never ASCII
+        if stages & ZALGO and not is_ascii:
+            result.zalgo_count = len(zalgo_re.findall(content))
+            if result.zalgo_count > ZALGO_LIMIT:
+                verdicts.add("zalgo")
+        
+        if stages & REPEATED and repeat is None:
+            repeat = repeated_re.search(content)
+        if repeat:
+            result.repeated.append(repeat.span())
+            verdicts.add("repeated_chars")
+        
+        if stages & CAPS and len(content) >= config.caps_min_length:
+            if is_ascii:
+                caps_count = len(content.encode('ascii').translate(None, NOT_UPPER))
+            else:
+                caps_count = sum(map(str.isupper, content))
+            result.caps_ratio = caps_count / len(content)
+            if result.caps_ratio >= config.caps_threshold:
+                verdicts.add("caps")
+        return result
+
+# Keyed by id(): hashing a config would hash all its word lists on every
+# message. The scanner keeps its config alive, so an ID is never reused
+# while its entry exists.
+_scanners: "OrderedDict[int, MessageScanner]" = OrderedDict()
+MAX_SCANNERS = 256
+
+def scanner_for(config: AutoModConfig) -> MessageScanner:
+    """Return the compiled scanner for a guild's automod settings, compiling it once"""
+    scanner = _scanners.get(id(config))
+    if scanner is None or scanner.config is not config:
+        scanner = MessageScanner(config)
+        _scanners[id(config)] = scanner
+        if len(_scanners) > MAX_SCANNERS:
+            _scanners.popitem(last=False)
+    else:
+        _scanners.move_to_end(id(config))
+    return scanner
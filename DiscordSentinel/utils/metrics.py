@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+from typing import Dict, Optional
+
+class LoopLagMonitor:
+    """Measure event loop lag by timing how late a periodic sleep wakes up.
+    
+    Anything that blocks the loop (synchronous disk I/O, heavy CPU work) shows
+    up directly as lag, which is also what delays gateway heartbeats.
+    """
+    
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start sampling on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+    
+    def stop(self):
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+    
+    def reset(self):
+        """Forget all samples"""
+        self.samples.clear()
+        self.max_lag = 0.0
+    
+    def percentile(self, percent: float) -> float:
+        """Lag in seconds at the given percentile of the current window"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Current lag statistics in milliseconds"""
+        return {
+            "current_ms": (self.samples[-1] if self.samples else 0.0) * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max_lag * 1000
+        }
@@ -1,22 +1,339 @@
 import discord
+import hashlib
+import itertools
 import json
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+CONFIG_FILE = 'config.json'
+
+DEFAULT_CONFIG = {
+    "permissions": {
+        "moderator_roles": ["Moderator", "Admin", "Staff"],
+        "admin_roles": ["Admin", "Owner"],
+        "immune_roles": ["Admin", "Owner", "Bot"]
+    }
+}
+
+def freeze(value):
+    """Return a read-only copy of parsed JSON: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class ConfigCache:
+    """Parsed, immutable snapshot of a JSON config file that is reloaded only when it changes.
+    
+    The file is stat()ed at most once every ``check_interval`` seconds. It is
+    only re-read when its mtime or size changed, and only re-parsed when the
+    content hash differs, so unchanged files cost nothing after the first load.
+    ``reload`` forces a re-read on the next access. ``default`` is served
+    when the file cannot be loaded and no earlier snapshot exists.
+    
+    With ``watch`` off the file is only checked on first use and after
+    ``reload``; new versions are installed from outside with ``read`` and
+    ``install`` (see utils.guild_config.ConfigReloader).
+    """
+    
+    def __init__(self, path: str = CONFIG_FILE, check_interval: float = 1.0, default: dict = DEFAULT_CONFIG):
+        self.path = path
+        self.check_interval = check_interval
+        self.default = default
+        self.watch = True
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stat = None
+        self._digest = None
+        self._next_check = 0.0
+        
+        # Counters for monitoring
+        self.loads = 0
+        self.stats = 0
+    
+    def get(self):
+        """Return the current snapshot, reloading it first if the file changed"""
+        if self._snapshot is not None and time.monotonic() < self._next_check:
+            return self._snapshot
+        
+        with self._lock:
+            self._refresh()
+            return self._snapshot
+    
+    def reload(self):
+        """Force the next access to re-read the file"""
+        with self._lock:
+            self._stat = None
+            self._next_check = 0.0
+    
+    def read(self) -> tuple:
+        """Read and parse the file without installing it, raising if it cannot be loaded.
+        
+        Returns ``(signature, digest, snapshot)`` for ``install``; the snapshot
+        is the current one when the content did not change.
+        """
+        stat = os.stat(self.path)
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        snapshot = self._snapshot
+        if digest != self._digest or snapshot is None:
+            snapshot = freeze(json.loads(raw))
+        return (stat.st_mtime_ns, stat.st_size), digest, snapshot
+    
+    def install(self, signature: tuple, digest: str, snapshot):
+        """Make a snapshot returned by ``read`` the current one"""
+        with self._lock:
+            self._install(signature, digest, snapshot)
+    
+    def _install(self, signature, digest, snapshot):
+        if snapshot is not self._snapshot:
+            self._snapshot = snapshot
+            self.loads += 1
+        self._digest = digest
+        self._stat = signature
+        self._next_check = time.monotonic() + self.check_interval if self.watch else math.inf
+    
+    def _refresh(self):
+        self._next_check = time.monotonic() + self.check_interval if self.watch else math.inf
+        self.stats += 1
+        try:
+            stat = os.stat(self.path)
+            if (stat.st_mtime_ns, stat.st_size) == self._stat and self._snapshot is not None:
+                return
+            self._install(*self.read())
+        except:
+            # Keep serving the last good snapshot; fall back to defaults if there is none
+            if self._snapshot is None:
+                self._snapshot = freeze(self.default)
+
+config_cache = ConfigCache()
 
 def load_config():
-    """Load configuration from config.json"""
-    try:
-        with open('config.json', 'r') as f:
-            return json.load(f)
-    except:
-        # Return default config if file doesn't exist
-        return {
-            "permissions": {
-                "moderator_roles": ["Moderator", "Admin", "Staff"],
-                "admin_roles": ["Admin", "Owner"],
-                "immune_roles": ["Admin", "Owner", "Bot"]
+    """Return the parsed configuration from config.json (read-only, cached)"""
+    return config_cache.get()
+
+def reload_config():
+    """Re-read config.json on the next access, even if it looks unchanged"""
+    config_cache.reload()
+
+# Permission level -> config keys whose role names grant it
+LEVEL_ROLE_KEYS = {
+    "moderator": ("moderator_roles", "admin_roles"),
+    "admin": ("admin_roles",),
+    "immune": ("immune_roles",),
+}
+
+class RoleIndex:
+    """Per-guild map of permission level -> frozenset of role IDs that grant it.
+    
+    Built lazily from the guild's roles and the configured role names, patched
+    in place by the role create/update/delete events and dropped whenever the
+    config snapshot changes. Checks become a single ``isdisjoint`` over the
+    member's role IDs instead of comparing role names.
+    
+    Every role event also moves the guild to a new version, so anything
+    derived from a guild's roles (see PermissionCache) can key on it.
+    """
+    
+    def __init__(self):
+        self._guilds = {}
+        self._config = None
+        self._names = {}
+        self._versions = {}
+        self._counter = itertools.count(1)
+        self._base_version = 0
+        
+        # Counters for monitoring
+        self.builds = 0
+        self.updates = 0
+    
+    def sync_config(self, config):
+        """Recompile the role names if the config snapshot changed"""
+        if config is self._config:
+            return
+        permissions = config.get("permissions", {})
+        self._names = {
+            level: frozenset(name for key in keys for name in permissions.get(key, ()))
+            for level, keys in LEVEL_ROLE_KEYS.items()
+        }
+        self._config = config
+        self._guilds.clear()
+        self._versions.clear()
+        self._base_version = next(self._counter)
+    
+    def version(self, guild_id: int) -> int:
+        """Version of the guild's roles; changes on every role event or config change"""
+        return self._versions.get(guild_id, self._base_version)
+    
+    def _bump(self, guild_id: int):
+        self._versions[guild_id] = next(self._counter)
+        self.updates += 1
+    
+    def get(self, guild: discord.Guild, config) -> dict:
+        """Return the level -> role IDs map of `guild`, building it on first use"""
+        self.sync_config(config)
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = {
+                level: frozenset(role.id for role in guild.roles if role.name in names)
+                for level, names in self._names.items()
             }
+            self._guilds[guild.id] = index
+            self.builds += 1
+        return index
+    
+    def role_created(self, role: discord.Role):
+        self._bump(role.guild.id)
+        index = self._guilds.get(role.guild.id)
+        if index is None:
+            return
+        for level, names in self._names.items():
+            if role.name in names:
+                index[level] = index[level] | {role.id}
+    
+    def role_deleted(self, role: discord.Role):
+        self._bump(role.guild.id)
+        index = self._guilds.get(role.guild.id)
+        if index is None:
+            return
+        for level, role_ids in index.items():
+            if role.id in role_ids:
+                index[level] = role_ids - {role.id}
+    
+    def role_updated(self, before: discord.Role, after: discord.Role):
+        # Only the name decides which levels a role grants, but a permission
+        # edit can still grant or revoke administrator
+        if before.name != after.name:
+            self.role_deleted(before)
+            self.role_created(after)
+        elif before.permissions != after.permissions:
+            self._bump(after.guild.id)
+    
+    def guild_updated(self, before: discord.Guild, after: discord.Guild):
+        # Ownership transfers change who counts as "owner"
+        if before.owner_id != after.owner_id:
+            self._bump(after.id)
+    
+    def discard_guild(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+        self._versions.pop(guild_id, None)
+
+role_index = RoleIndex()
+
+def role_ids(user: discord.Member) -> frozenset:
+    """IDs of the member's roles"""
+    return frozenset(role.id for role in user.roles)
+
+def has_role_level(user: discord.Member, level: str, roles: frozenset = None) -> bool:
+    """Check whether any of the member's roles grants `level` (see LEVEL_ROLE_KEYS)"""
+    index = role_index.get(user.guild, load_config())
+    return not index[level].isdisjoint(role_ids(user) if roles is None else roles)
+
+def compute_member_permissions(user: discord.Member, roles: frozenset = None) -> tuple:
+    """Return (permission level, owner or administrator, immune) for a member"""
+    if user.guild.owner_id == user.id:
+        return ("owner", True, True)
+    
+    if user.guild_permissions.administrator:
+        return ("admin", True, True)
+    
+    roles = role_ids(user) if roles is None else roles
+    if has_role_level(user, "admin", roles):
+        level = "admin"
+    elif has_role_level(user, "moderator", roles):
+        level = "moderator"
+    else:
+        level = "member"
+    return (level, False, has_role_level(user, "immune", roles))
+
+class PermissionCache:
+    """LRU of computed member permissions keyed by (guild_id, member_id, role version, role IDs).
+    
+    The role version comes from RoleIndex, so any role or config change makes a
+    guild's old entries unreachable; they age out of the LRU. The member's own
+    role IDs are part of the key too, so a result is never reused after their
+    roles changed, even when no member update event said so (they left and
+    rejoined, or the change happened while the gateway was down). Each member
+    keeps one entry: a new one replaces the last, and ``invalidate`` drops it.
+    """
+    
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # (guild_id, member_id) -> key of the member's latest entry
+        self._latest = {}
+        
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, user: discord.Member) -> tuple:
+        """Return the cached (level, privileged, immune) of `user`, computing it on a miss"""
+        role_index.sync_config(load_config())
+        guild_id = user.guild.id
+        roles = role_ids(user)
+        key = (guild_id, user.id, role_index.version(guild_id), roles)
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        
+        self.misses += 1
+        entry = compute_member_permissions(user, roles)
+        member = (guild_id, user.id)
+        stale = self._latest.get(member)
+        if stale is not None:
+            self._entries.pop(stale, None)
+        self._entries[key] = entry
+        self._latest[member] = key
+        if len(self._entries) > self.max_entries:
+            (evicted_guild, evicted_member, *_), _ = self._entries.popitem(last=False)
+            self._latest.pop((evicted_guild, evicted_member), None)
+            self.evictions += 1
+        return entry
+    
+    def invalidate(self, guild_id: int, member_id: int):
+        """Forget a member's entry, e.g. after their roles changed or they left"""
+        key = self._latest.pop((guild_id, member_id), None)
+        if key is not None and self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+    
+    def member_updated(self, before: discord.Member, after: discord.Member):
+        if role_ids(before) != role_ids(after):
+            self.invalidate(after.guild.id, after.id)
+    
+    def member_removed(self, member: discord.Member):
+        self.invalidate(member.guild.id, member.id)
+    
+    def clear(self):
+        self._entries.clear()
+        self._latest.clear()
+    
+    def stats(self) -> dict:
+        """Size and hit rate, for sizing ``max_entries``"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
         }
 
+permission_cache = PermissionCache()
+
 def has_permission(user: discord.Member | discord.User, permission_level: str) -> bool:
     """Check if a user has the required permission level"""
     if not isinstance(user, (discord.Member, discord.User)):
@@ -26,29 +343,19 @@ def has_permission(user: discord.Member | discord.User, permission_level: str) -
     if isinstance(user, discord.User):
         return False
     
-    config = load_config()
-    permissions = config.get("permissions", {})
+    level, privileged, immune = permission_cache.get(user)
     
-    # Server owner always has all permissions
-    if user.guild.owner_id == user.id:
-        return True
-    
-    # Check for administrator permission
-    if user.guild_permissions.administrator:
+    # Server owner and administrators always have all permissions
+    if privileged:
         return True
     
-    user_roles = [role.name for role in user.roles]
-    
     if permission_level == "moderator":
         # Moderators and admins can use moderator commands
-        moderator_roles = permissions.get("moderator_roles", [])
-        admin_roles = permissions.get("admin_roles", [])
-        return any(role in user_roles for role in moderator_roles + admin_roles)
+        return level in ("admin", "moderator")
     
     elif permission_level == "admin":
         # Only admins can use admin commands
-        admin_roles = permissions.get("admin_roles", [])
-        return any(role in user_roles for role in admin_roles)
+        return level == "admin"
     
     return False
 
@@ -61,22 +368,8 @@ def is_immune(user: discord.Member | discord.User) -> bool:
     if isinstance(user, discord.User):
         return False
     
-    config = load_config()
-    permissions = config.get("permissions", {})
-    
-    # Server owner is always immune
-    if user.guild.owner_id == user.id:
-        return True
-    
-    # Check for administrator permission
-    if user.guild_permissions.administrator:
-        return True
-    
-    # Check immune roles
-    immune_roles = permissions.get("immune_roles", [])
-    user_roles = [role.name for role in user.roles]
-    
-    return any(role in user_roles for role in immune_roles)
+    # Server owner, administrators and immune roles
+    return permission_cache.get(user)[2]
 
 def get_permission_level(user: discord.Member | discord.User) -> str:
     """Get the highest permission level for a user"""
@@ -87,19 +380,7 @@ def get_permission_level(user: discord.Member | discord.User) -> str:
     if isinstance(user, discord.User):
         return "member"
     
-    if user.guild.owner_id == user.id:
-        return "owner"
-    
-    if user.guild_permissions.administrator:
-        return "admin"
-    
-    if has_permission(user, "admin"):
-        return "admin"
-    
-    if has_permission(user, "moderator"):
-        return "moderator"
-    
-    return "member"
+    return permission_cache.get(user)[0]
 
 def can_moderate(moderator: discord.Member | discord.User, target: discord.Member | discord.User) -> bool:
     """Check if a moderator can take action against a target user"""
@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Bits of the packed key given to the action code and to the user ID
+ACTION_BITS = 8
+USER_BITS = 64
+
+# Approximate bytes per key: a packed key of two snowflakes and its arrival time
+KEY_BYTES = sys.getsizeof(((1 << 60) << (USER_BITS + ACTION_BITS)) | ((1 << 60) << ACTION_BITS)) + sys.getsizeof(0.0)
+
+class RateLimiter:
+    """Generic cell rate limiter per (guild, member, action) with bounded memory.
+    
+    Allows ``burst`` actions at once and one more every ``interval`` seconds.
+    Each key is packed into a single int and stores one float, its theoretical
+    arrival time: an action is allowed when that time is at most
+    ``interval * (burst - 1)`` seconds ahead, and each allowed action pushes
+    it ``interval`` further. A key whose time has passed behaves exactly like
+    one that was never seen, so the sweep drops it. Keys are kept in update
+    order, which is the order their times pass (exactly so with a burst of
+    one, roughly otherwise), so the sweep stops at the first live key;
+    ``max_keys`` caps the total. Every check is O(1).
+    """
+    
+    def __init__(self, interval: float = 60.0, burst: int = 1, max_keys: int = 100_000,
+                 sweep_interval: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.tolerance = interval * (max(burst, 1) - 1)
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._arrivals: "OrderedDict[int, float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Counters for monitoring
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+        self.sweeps = 0
+    
+    def allow(self, guild_id: int, user_id: int, action: int) -> bool:
+        """Record an action if the member is within the rate; returns whether it may go ahead"""
+        now = self.clock()
+        key = (guild_id << (USER_BITS + ACTION_BITS)) | (user_id << ACTION_BITS) | action
+        arrivals = self._arrivals
+        arrival = arrivals.get(key, now)
+        if arrival - now > self.tolerance:
+            self.limited += 1
+            return False
+        
+        arrivals[key] = max(arrival, now) + self.interval
+        arrivals.move_to_end(key)
+        if len(arrivals) > self.max_keys:
+            arrivals.popitem(last=False)
+            self.evictions += 1
+        self.allowed += 1
+        return True
+    
+    def sweep(self) -> int:
+        """Forget keys whose arrival time has passed; returns how many"""
+        now = self.clock()
+        arrivals = self._arrivals
+        evicted = 0
+        while arrivals:
+            key, arrival = next(iter(arrivals.items()))
+            if arrival > now:
+                break
+            del arrivals[key]
+            evicted += 1
+        self.evictions += evicted
+        self.sweeps += 1
+        return evicted
+    
+    def start(self):
+        """Start sweeping on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sweep_loop())
+    
+    def stop(self):
+        """Stop sweeping"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+    
+    def __len__(self) -> int:
+        return len(self._arrivals)
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the limiter, estimated from the key count in O(1)"""
+        return sys.getsizeof(self._arrivals) + len(self._arrivals) * KEY_BYTES
+    
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._arrivals),
+            "max_keys": self.max_keys,
+            "memory_bytes": self.memory_bytes(),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+            "sweeps": self.sweeps
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Message IDs remembered per member for cleanup once they are caught spamming
+RECENT_MESSAGES = 100
+
+class _Window:
+    """Recent message times of one member in one guild"""
+    __slots__ = ("times", "window", "recent")
+    
+    def __init__(self, threshold: int, window: float):
+        # Only the newest `threshold` times can decide whether the threshold is reached
+        self.times = deque(maxlen=threshold)
+        self.window = window
+        # (time, channel ID, message ID) of the member's latest messages
+        self.recent = deque(maxlen=RECENT_MESSAGES)
+
+# Approximate bytes held per key (the key, its window and both deques), per
+# timestamp and per remembered message, for memory_bytes
+SNOWFLAKE = 1 << 60
+KEY_BYTES = (sys.getsizeof((SNOWFLAKE, SNOWFLAKE)) + 2 * sys.getsizeof(SNOWFLAKE) + sys.getsizeof(_Window(1, 1.0))
+             + 2 * sys.getsizeof(deque()) + 100)
+TIMESTAMP_BYTES = sys.getsizeof(0.0) + 8
+RECENT_BYTES = sys.getsizeof((0.0, SNOWFLAKE, SNOWFLAKE)) + sys.getsizeof(0.0) + 2 * sys.getsizeof(SNOWFLAKE) + 8
+
+class SpamTracker:
+    """Sliding-window message counter per (guild, member) with bounded memory.
+    
+    Each key keeps at most ``threshold`` monotonic timestamps in a fixed-size
+    deque, so recording a message and checking the threshold is O(1). Keys are
+    kept in least recently active order: the sweep evicts keys from the idle
+    end until it reaches one that is still inside its window (its timestamps
+    can no longer matter once the window has passed), and ``max_keys`` caps the
+    total even under a flood of new members, so memory stays flat however
+    long the bot runs. The IDs of each member's latest messages, across
+    channels, are kept alongside so a spammer's messages can be removed
+    without reading channel history.
+    """
+    
+    def __init__(self, max_keys: int = 100_000, sweep_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._keys: "OrderedDict[Tuple[int, int], _Window]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        
+        # Timestamps and remembered messages held across all keys, kept as they change
+        self.timestamps = 0
+        self.remembered = 0
+        
+        # Counters for monitoring
+        self.evictions = 0
+        self.sweeps = 0
+    
+    def _forget(self, entry: _Window):
+        self.timestamps -= len(entry.times)
+        self.remembered -= len(entry.recent)
+    
+    def record(self, guild_id: int, user_id: int, threshold: int, window: float,
+               channel_id: int = 0, message_id: int = 0) -> bool:
+        """Record a message and return whether the member reached `threshold` messages within `window` seconds"""
+        now = self.clock()
+        key = (guild_id, user_id)
+        size = max(threshold, 1)
+        entry = self._keys.get(key)
+        if entry is None or entry.times.maxlen != size or entry.window != window:
+            # New member, or the guild's spam settings changed
+            if entry is not None:
+                self._forget(entry)
+            entry = _Window(size, window)
+            self._keys[key] = entry
+            if len(self._keys) > self.max_keys:
+                self._forget(self._keys.popitem(last=False)[1])
+                self.evictions += 1
+        self._keys.move_to_end(key)
+        
+        times = entry.times
+        if len(times) < size:
+            self.timestamps += 1
+        times.append(now)
+        if message_id:
+            if len(entry.recent) < RECENT_MESSAGES:
+                self.remembered += 1
+            entry.recent.append((now, channel_id, message_id))
+        return len(times) >= size and now - times[0] < window
+    
+    def take_recent(self, guild_id: int, user_id: int, within: float) -> Dict[int, List[int]]:
+        """Hand over a member's message IDs from the last `within` seconds, by channel ID, and forget them"""
+        entry = self._keys.get((guild_id, user_id))
+        if entry is None:
+            return {}
+        cutoff = self.clock() - within
+        by_channel: Dict[int, List[int]] = {}
+        for stamp, channel_id, message_id in entry.recent:
+            if stamp >= cutoff:
+                by_channel.setdefault(channel_id, []).append(message_id)
+        self.remembered -= len(entry.recent)
+        entry.recent.clear()
+        return by_channel
+    
+    def sweep(self) -> int:
+        """Evict keys whose window has passed since their last message; returns how many"""
+        now = self.clock()
+        keys = self._keys
+        evicted = 0
+        while keys:
+            key, entry = next(iter(keys.items()))
+            if now - entry.times[-1] < entry.window:
+                break
+            del keys[key]
+            self._forget(entry)
+            evicted += 1
+        self.evictions += evicted
+        self.sweeps += 1
+        return evicted
+    
+    def start(self):
+        """Start sweeping on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sweep_loop())
+    
+    def stop(self):
+        """Stop sweeping"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the tracker, estimated from the entry counts in O(1)"""
+        return (sys.getsizeof(self._keys) + len(self._keys) * KEY_BYTES
+                + self.timestamps * TIMESTAMP_BYTES + self.remembered * RECENT_BYTES)
+    
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "max_keys": self.max_keys,
+            "timestamps": self.timestamps,
+            "memory_bytes": self.memory_bytes(),
+            "evictions": self.evictions,
+            "sweeps": self.sweeps
+        }
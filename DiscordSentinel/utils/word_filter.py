@@ -0,0 +1,256 @@
+import asyncio
+import re
+import string
+import unicodedata
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Letters commonly swapped in to dodge word filters, mapped back to the
+# letter they stand for. Applied after casefolding, so only lowercase forms
+LEET = {
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b', '9': 'g',
+    '@': 'a', '$': 's', '!': 'i', '|': 'l', '+': 't', '\u20ac': 'e', '\u00a3': 'l',
+}
+
+# Cyrillic and Greek letters that look like Latin ones
+CONFUSABLES = {
+    'а': 'a', 'в': 'b', 'е': 'e', 'ё': 'e', 'к': 'k', 'м': 'm',
+    'н': 'h', 'о': 'o', 'р': 'p', 'с': 'c', 'т': 't', 'у': 'y',
+    'х': 'x', 'ѕ': 's', 'і': 'i', 'ї': 'i', 'ј': 'j', 'һ': 'h',
+    'ԁ': 'd', 'ԛ': 'q', 'ԝ': 'w',
+    'α': 'a', 'β': 'b', 'ε': 'e', 'η': 'n', 'ι': 'i', 'κ': 'k',
+    'ν': 'v', 'ο': 'o', 'ρ': 'p', 'τ': 't', 'υ': 'u', 'χ': 'x',
+    'ω': 'w',
+}
+
+# Word breaks, all read as one space
+SEPARATORS = string.whitespace + "".join(char for char in string.punctuation if char not in LEET)
+# Invisible characters slipped into a word to break it up, removed
+INVISIBLE = "\u00ad\u200b\u200c\u200d\u2060\ufeff"
+
+FOLD_TABLE = str.maketrans({
+    **LEET,
+    **CONFUSABLES,
+    **{char: " " for char in SEPARATORS},
+    **{char: None for char in INVISIBLE},
+    # Accents, once NFKD has split them off their letters
+    **{chr(mark): None for mark in range(0x0300, 0x0370)},
+})
+
+# The same folding for ASCII text, done on bytes, which is many times faster
+ASCII_LEET = {char: value for char, value in LEET.items() if char.isascii()}
+ASCII_SEPARATORS = "".join(char for char in SEPARATORS if char.isascii())
+ASCII_TABLE = bytes.maketrans(
+    ("".join(ASCII_LEET) + ASCII_SEPARATORS).encode(),
+    ("".join(ASCII_LEET.values()) + " " * len(ASCII_SEPARATORS)).encode()
+)
+
+# Leet punctuation ending a word is ordinary punctuation ("hell!"), not a letter
+closing_re = re.compile(r"[!|+]+(?!\S)")
+CLOSING = frozenset("!|+")
+
+# Two or more one-character words in a row: a word spelled out to dodge the filter
+spelled_out_re = re.compile(r"(?<!\S)\S(?: \S)+(?!\S)")
+
+# English letters from most to least common; a word's probe is its rarest letter
+LETTER_FREQUENCY = "etaoinshrdlcumwfgypbvkjxqz"
+
+def normalize(text: str) -> str:
+    """Fold text to the form words are matched in: casefolded, de-accented, leet and confusables mapped,
+    words separated by single spaces and spelled-out words ("b a d", "b.a.d") closed up"""
+    text = text.casefold()
+    if not CLOSING.isdisjoint(text):
+        text = closing_re.sub(" ", text)
+    if text.isascii():
+        text = text.encode().translate(ASCII_TABLE).decode()
+    else:
+        # Splits accents off letters and maps fullwidth and styled letters to plain ones
+        text = unicodedata.normalize("NFKD", text).translate(FOLD_TABLE)
+    text = " ".join(text.split())
+    if " " not in text:
+        return text
+    return spelled_out_re.sub(lambda match: match.group().replace(" ", ""), text)
+
+def whole_word(entry: str) -> bool:
+    """Whether a word list entry is quoted, so it only matches a whole word"""
+    entry = entry.strip()
+    return len(entry) > 2 and entry[0] == entry[-1] == '"'
+
+class WordMatcher:
+    """Aho-Corasick automaton over a normalized word list.
+    
+    Listed words match anywhere inside a word of the normalized text, so
+    "badwords" holds "badword", but never across a space between words, so
+    "its excellent" does not hold "sex". An entry written in double quotes
+    (``"ass"``) only matches a whole word, for short words that turn up
+    inside innocent ones ("pass", "class").
+    A message is normalized once and walked one character at a time, so the
+    cost depends on the message length and not on how many words are listed.
+    Transitions that need failure links are resolved on first use and kept,
+    turning the hot part of the automaton into a plain lookup table. Short
+    lists are matched with one compiled alternation instead, which runs in C
+    and beats the per-character walk until the list grows past a few dozen
+    words.
+    """
+    
+    # Lists up to this many words are matched with a regex alternation
+    REGEX_MAX_WORDS = 32
+    
+    # Resolved transitions kept at most; past this, failure links are followed each time
+    MAX_CACHED_TRANSITIONS = 1_000_000
+    
+    def __init__(self, words: Iterable[str]):
+        self.words: Tuple[str, ...] = tuple(words)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self._regex = None
+        self._by_key: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._probe = None
+        self.cached_transitions = 0
+        
+        # Text is matched padded with spaces; a whole-word entry's key starts
+        # with one, and must be followed by another
+        by_key: Dict[str, Tuple[str, ...]] = {}
+        for word in self.words:
+            key = normalize(word)
+            if key and whole_word(word):
+                key = f" {key}"
+            if key and word not in by_key.get(key, ()):
+                by_key[key] = by_key.get(key, ()) + (word,)
+        if len(by_key) <= self.REGEX_MAX_WORDS:
+            self._by_key = by_key
+            if by_key:
+                # Longest first so a word is reported rather than a prefix of it
+                keys = sorted(by_key, key=len, reverse=True)
+                self._regex = re.compile("|".join(
+                    re.escape(key) + "(?= )" if key.startswith(" ") else re.escape(key) for key in keys
+                ))
+            return
+        
+        self._probe = self._compile_probe(by_key)
+        for key, originals in by_key.items():
+            state = 0
+            for char in f"{key} " if key.startswith(" ") else key:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = nxt
+            self._output[state] = originals
+        
+        # Breadth first, so a state's failure target is always finished before it
+        self._depth_one = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._output[nxt] += self._output[self._fail[nxt]]
+    
+    @staticmethod
+    def _compile_probe(keys: Iterable[str]):
+        """Character class of everything ASCII text must contain to hold one of the words"""
+        chars = set()
+        for key in keys:
+            if not key.isascii():
+                continue  # Normalized ASCII text stays ASCII, so this word never matches it
+            # Digits and anything else unranked count as rarest; a space may be any separator
+            rarest = max(key.replace(" ", ""), key=lambda char: LETTER_FREQUENCY.find(char) % (len(LETTER_FREQUENCY) + 1))
+            chars.update({rarest, rarest.upper()} | {leet for leet, letter in ASCII_LEET.items() if letter == rarest})
+        return re.compile("[" + re.escape("".join(sorted(chars))) + "]") if chars else None
+    
+    def might_match(self, text: str) -> bool:
+        """Cheap test that rules out most text holding none of the words; False means findall would find nothing"""
+        if self._by_key is not None:
+            # A short list's alternation runs in C and is exact
+            return self._regex is not None and self._regex.search(f" {normalize(text)} ") is not None
+        if not text.isascii():
+            return True
+        return self._probe is not None and self._probe.search(text) is not None
+    
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+    
+    def _step(self, state: int, char: str) -> int:
+        """Follow failure links for a transition the trie does not have"""
+        start = state
+        while True:
+            state = self._fail[state]
+            nxt = self._goto[state].get(char)
+            if nxt is not None or not state:
+                break
+        nxt = nxt or 0
+        if self.cached_transitions < self.MAX_CACHED_TRANSITIONS:
+            self._goto[start][char] = nxt
+            self.cached_transitions += 1
+        return nxt
+    
+    def findall(self, text: str, first: bool = False) -> List[str]:
+        """Return the listed words found in the text, in the order they end; with `first`, stop at the first"""
+        text = f" {normalize(text)} "
+        if self._by_key is not None:
+            if self._regex is None:
+                return []
+            if first:
+                match = self._regex.search(text)
+                return list(self._by_key[match.group()]) if match else []
+            return [word for key in self._regex.findall(text) for word in self._by_key[key]]
+        
+        goto = self._goto
+        output = self._output
+        root = self._depth_one
+        found = []
+        state = 0
+        for char in text:
+            if state:
+                nxt = goto[state].get(char)
+                state = self._step(state, char) if nxt is None else nxt
+            else:
+                state = root.get(char, 0)
+            if output[state]:
+                found.extend(output[state])
+                if first:
+                    break
+        return found
+    
+    def search(self, text: str) -> Optional[str]:
+        """Return the first listed word found in the text, or None"""
+        found = self.findall(text, first=True)
+        return found[0] if found else None
+
+# Keyed by the word list itself, so changing any other automod setting reuses
+# the automaton and only an edited list is compiled again
+_matchers: "OrderedDict[Tuple[str, ...], WordMatcher]" = OrderedDict()
+MAX_MATCHERS = 64
+
+def matcher_for(words: Tuple[str, ...]) -> WordMatcher:
+    """Return the compiled matcher for a word list, compiling it on first use"""
+    matcher = _matchers.get(words)
+    if matcher is None:
+        matcher = WordMatcher(words)
+        _matchers[words] = matcher
+        if len(_matchers) > MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    else:
+        _matchers.move_to_end(words)
+    return matcher
+
+async def warm_matcher(words: Tuple[str, ...]) -> WordMatcher:
+    """Compile a word list's matcher on a worker thread, so a long list never stalls the event loop"""
+    matcher = _matchers.get(words)
+    if matcher is None:
+        matcher = await asyncio.to_thread(WordMatcher, words)
+        # Installed from the event loop, like every other cache change
+        _matchers[words] = matcher
+        if len(_matchers) > MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher